@@ -0,0 +1,142 @@
+import logging
+import threading
+
+from django.conf import settings
+
+from .offline import offline_enabled
+
+logger = logging.getLogger(__name__)
+
+# langchain / langchain_openai 는 import와 객체 생성 비용이 커서 첫 에이전트 호출 때 만든다.
+# (URLconf를 불러오는 모든 프로세스 - 관리 명령, 약국 갱신 cron 등 - 가 이 비용을 내지 않도록)
+
+DEFAULT_MODEL = "gpt-4o"
+SUMMARY_MODEL = "gpt-4o-mini"
+
+SYSTEM_PROMPT = """당신은 의료 서비스 도우미입니다.
+
+        이전 대화 내용을 고려하여 응답해주세요. 예를 들어:
+        - 사용자가 "내과로 알려줘", "지금 연 곳만"처럼 이전 결과를 좁히거나 다시 정렬해달라고 하면
+          refine_previous_results를 호출하세요. (이전 결과 목록은 서버가 보관하고 있습니다)
+        - 새로운 검색이 필요한 경우에만 search_hospital이나 search_pharmacy를 호출하세요.
+
+        모든 응답은 반드시 다음과 같은 JSON 형식으로 반환해주세요.
+        검색된 병원/약국 목록(data)은 서버가 도구 결과에서 직접 붙이므로 절대 다시 작성하지 마세요.
+        병원/약국 검색 결과:
+        {{
+            "type": "hospital_list" 또는 "pharmacy_list",
+            "start_message": "검색 결과 소개 메시지",
+            "end_message": "마무리 메시지"
+        }}
+
+        일반 대화:
+        {{
+            "type": "chat",
+            "start_message": "대화 메시지 앞부분",
+            "end_message": "대화 메시지 뒷부분이나 추가 안내"
+        }}
+
+        검색 결과 없음:
+        {{
+            "type": "no_results",
+            "start_message": "결과가 없다는 안내",
+            "end_message": "대안 추천"
+        }}
+
+        예시:
+        - 약국 검색: search_pharmacy(latitude=latitude, longitude=longitude)
+        - 병원 검색: search_hospital(query="이비인후과", latitude=latitude, longitude=longitude)
+
+        위치 정보를 사용자에게 직접 물어보지 말고, 제공된 정보를 사용하세요."""
+
+HUMAN_TEMPLATE = "사용자 위치: 위도 {latitude}, 경도 {longitude}\n메시지: {input}"
+
+_lock = threading.Lock()
+_tools = None
+_executors = {}  # model -> AgentExecutor
+_history_manager = None
+
+
+def make_chat_model(model: str, **kwargs):
+    """ChatOpenAI 생성 (settings.CHAT_OFFLINE 이 켜져 있으면 로컬 가짜 모델)"""
+    if offline_enabled():
+        from .fake_llm import FakeChatModel
+
+        return FakeChatModel(model=model)
+    from langchain_openai import ChatOpenAI
+
+    return ChatOpenAI(model=model, **kwargs)
+
+
+def get_tools():
+    """에이전트 도구 리스트 (동기 실행은 func, ainvoke 실행은 coroutine 사용)"""
+    global _tools
+    if _tools is None:
+        from langchain_core.tools import StructuredTool
+
+        from .refine import arefine_previous_results, refine_previous_results
+        from .views import asearch_hospital, asearch_pharmacy, search_hospital, search_pharmacy
+
+        _tools = [
+            StructuredTool.from_function(func=search_hospital, coroutine=asearch_hospital, name="search_hospital",
+                                         description=search_hospital.__doc__),
+            StructuredTool.from_function(func=search_pharmacy, coroutine=asearch_pharmacy, name="search_pharmacy",
+                                         description=search_pharmacy.__doc__),
+            StructuredTool.from_function(func=refine_previous_results, coroutine=arefine_previous_results,
+                                         name="refine_previous_results",
+                                         description=refine_previous_results.__doc__),
+        ]
+    return _tools
+
+
+def get_agent_executor(model: str = DEFAULT_MODEL):
+    """모델별 에이전트 실행기 (처음 요청될 때 생성)"""
+    executor = _executors.get(model)
+    if executor is not None:
+        return executor
+
+    with _lock:
+        if model not in _executors:
+            from langchain.agents import AgentExecutor, create_tool_calling_agent
+            from langchain_core.prompts import ChatPromptTemplate
+
+            prompt = ChatPromptTemplate.from_messages([
+                ("system", SYSTEM_PROMPT),
+                ("placeholder", "{chat_history}"),
+                ("human", HUMAN_TEMPLATE),
+                ("placeholder", "{agent_scratchpad}"),
+            ])
+            tools = get_tools()
+            llm = make_chat_model(model, temperature=0, streaming=True)
+            _executors[model] = AgentExecutor(
+                agent=create_tool_calling_agent(llm, tools, prompt),
+                tools=tools,
+                verbose=settings.DEBUG,  # 단계별 소요 시간은 chat.metrics로 기록
+                max_iterations=3,
+                handle_parsing_errors=True,
+                return_intermediate_steps=True,  # 도구 결과(data)를 서버에서 직접 병합하기 위해 반환
+            )
+            logger.info(f"Chat agent created: model={model}")
+    return _executors[model]
+
+
+def token_usage():
+    """OpenAI 토큰 사용량 집계 컨텍스트 (with token_usage() as usage: ...)"""
+    from langchain_community.callbacks import get_openai_callback
+
+    return get_openai_callback()
+
+
+def get_history_manager():
+    """대화 기록 관리자 (토큰 예산 + 요약)"""
+    global _history_manager
+    if _history_manager is None:
+        with _lock:
+            if _history_manager is None:
+                from .history import ChatHistoryManager
+
+                _history_manager = ChatHistoryManager(
+                    summarizer=make_chat_model(SUMMARY_MODEL, temperature=0),
+                    max_tokens=getattr(settings, "CHAT_HISTORY_MAX_TOKENS", 1500),
+                )
+    return _history_manager
@@ -0,0 +1,219 @@
+import asyncio
+import logging
+import time
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from .agent import get_agent_executor, get_history_manager, token_usage
+from .metrics import Timings, current_timings, record, span, wants_timings
+from .prefetch import astart_prefetch
+from .refine import current_session, match_session_intent
+from .router import classify, route_stats
+from .speech import atranscribe_speech, read_upload
+from .views import (
+    ASYNC_TOOL_FUNCTIONS,
+    QUICK_REPLY_ACK,
+    QUICK_REPLY_MESSAGES,
+    UnifiedChatAPIView,
+    get_session_history,
+)
+
+logger = logging.getLogger(__name__)
+
+# UnifiedChatAPIView의 응답 포맷/음성 변환 메서드 재사용
+base_view = UnifiedChatAPIView()
+
+
+def _parse_request(request):
+    """DRF 인증/파서로 요청을 해석 (DB 조회가 있으므로 스레드에서 실행)"""
+    drf_request = Request(
+        request,
+        parsers=[MultiPartParser(), FormParser(), JSONParser()],
+        authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES],
+    )
+    user = drf_request.user
+    if not (user and user.is_authenticated):
+        return None, None, None, None
+
+    profile = user.profile
+    data = {key: drf_request.data.get(key) for key in ("message", "session_id", "need_voice", "audio_format")}
+    audio = None
+    if 'audio' in drf_request.FILES:
+        audio = read_upload(drf_request.FILES['audio'])
+    return user, profile, data, audio
+
+
+def _error(start_message, status_code, **extra):
+    return JsonResponse({
+        "type": "error",
+        "start_message": start_message,
+        "end_message": "다시 시도해주세요.",
+        "data": [],
+        **extra,
+    }, status=status_code, json_dumps_params={"ensure_ascii": False})
+
+
+async def arespond(chat_history, input_text, user_profile):
+    """UnifiedChatAPIView.respond의 비동기 버전"""
+    token = current_session.set(chat_history)
+    try:
+        return await _arespond(chat_history, input_text, user_profile)
+    finally:
+        current_session.reset(token)
+
+
+async def _arespond(chat_history, input_text, user_profile):
+    with span("intent"):
+        intent = match_session_intent(input_text, chat_history)
+    if intent is None:
+        return await arun_agent(chat_history, input_text, user_profile)
+
+    formatted_response = await ASYNC_TOOL_FUNCTIONS[intent.tool](**base_view.tool_kwargs(intent, user_profile))
+    if intent.note:
+        formatted_response = base_view.add_note(formatted_response, intent.note)
+    logger.info(f"Chat fast path: session={chat_history.session_id} tool={intent.tool} args={intent.kwargs}")
+    with span("history.record"):
+        await sync_to_async(get_history_manager().record_turn)(chat_history, input_text, formatted_response)
+    return formatted_response
+
+
+async def arun_agent(chat_history, input_text, user_profile):
+    """UnifiedChatAPIView.run_agent의 비동기 버전"""
+    from .callbacks import TimingCallbackHandler
+    from .history import count_tokens
+
+    prefetch = await astart_prefetch(
+        input_text, float(user_profile.latitude), float(user_profile.longitude), ASYNC_TOOL_FUNCTIONS
+    )
+
+    history_manager = get_history_manager()
+    with span("history.prepare"):
+        history_messages = await history_manager.aprepare(chat_history)
+    context = {
+        "input": input_text,
+        "latitude": float(user_profile.latitude),
+        "longitude": float(user_profile.longitude),
+        "chat_history": history_messages,
+    }
+
+    with span("route"):
+        route = await asyncio.to_thread(classify, input_text)  # 분류 모델 사용 시 네트워크 호출
+    started = time.perf_counter()
+    callbacks = [TimingCallbackHandler(current_timings.get())]
+    with token_usage() as usage:
+        response = await get_agent_executor(route.model).ainvoke(context, config={"callbacks": callbacks})
+    latency = time.perf_counter() - started
+    record("agent", latency)
+    route_stats.record(route, latency, usage)
+    if prefetch is not None:
+        prefetch.finish(response.get("intermediate_steps"))
+    logger.info(
+        f"Chat prompt tokens: session={chat_history.session_id} "
+        f"history={count_tokens(history_messages)} prompt={usage.prompt_tokens} "
+        f"completion={usage.completion_tokens} llm_calls={usage.successful_requests}"
+    )
+
+    response_data = response.get("output", "응답을 생성하지 못했습니다.")
+    with span("format"):
+        formatted_response = base_view.merge_tool_data(
+            base_view.format_response(response_data),
+            response.get("intermediate_steps"),
+        )
+    with span("history.record"):
+        await sync_to_async(history_manager.record_turn)(chat_history, input_text, formatted_response)
+    return formatted_response
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class AsyncUnifiedChatView(View):
+    """음성/텍스트 통합 대화 API (ASGI 비동기 버전)
+
+    LLM/STT/TTS 네트워크 대기 중에 워커 스레드를 점유하지 않음. uvicorn 등 ASGI 서버로 실행해야 효과가 있음.
+    """
+
+    async def post(self, request):
+        """단계별 소요 시간을 기록 (X-Chat-Timings 헤더가 있으면 응답에 timings 포함)"""
+        timings = Timings()
+        token = current_timings.set(timings)
+        try:
+            with span("total"):
+                return await self._post(request, wants_timings(request))
+        finally:
+            current_timings.reset(token)
+
+    async def _post(self, request, include_timings):
+        try:
+            user, user_profile, data, audio = await sync_to_async(_parse_request)(request)
+            if user is None:
+                return JsonResponse({"detail": "자격 인증데이터(authentication credentials)가 제공되지 않았습니다."},
+                                    status=401, json_dumps_params={"ensure_ascii": False})
+            if not (user_profile.latitude and user_profile.longitude):
+                return JsonResponse({"error": "위치 정보가 설정되어 있지 않습니다."},
+                                    status=400, json_dumps_params={"ensure_ascii": False})
+
+            # 1. 입력 처리 (음성 또는 텍스트)
+            if audio is not None:
+                input_text = await atranscribe_speech(audio)
+                if not input_text:
+                    return _error("음성을 텍스트로 변환하지 못했습니다.", 400)
+            else:
+                input_text = data.get("message")
+                if not input_text:
+                    return JsonResponse({"error": "메시지가 제공되지 않았습니다."},
+                                        status=400, json_dumps_params={"ensure_ascii": False})
+
+            # 2. 챗봇 처리
+            session_id = data.get("session_id") or str(uuid.uuid4())
+            chat_history = await sync_to_async(get_session_history)(session_id)
+            formatted_response = await arespond(chat_history, input_text, user_profile)
+
+            location = {
+                "latitude": float(user_profile.latitude),
+                "longitude": float(user_profile.longitude)
+            }
+
+            if input_text in QUICK_REPLY_MESSAGES:
+                result = {
+                    "input_text": input_text,
+                    "type": "multi",
+                    "responses": [QUICK_REPLY_ACK, formatted_response],
+                    "session_id": session_id,
+                    "location": location,
+                }
+                if include_timings:
+                    result["timings"] = current_timings.get().as_dict()
+                return JsonResponse(result, json_dumps_params={"ensure_ascii": False})
+
+            result = {
+                "input_text": input_text,
+                "type": formatted_response["type"],
+                "start_message": formatted_response["start_message"],
+                "end_message": formatted_response["end_message"],
+                "data": formatted_response["data"],
+                "session_id": session_id,
+                "location": location,
+            }
+
+            # 3. 음성 응답 생성 (gTTS/파일 캐시는 동기 코드이므로 스레드에서 실행)
+            if data.get("need_voice"):
+                audio_result = await asyncio.to_thread(
+                    base_view.synthesize_voice, formatted_response, data.get("audio_format")
+                )
+                if audio_result:
+                    result.update(audio_result)
+
+            if include_timings:
+                result["timings"] = current_timings.get().as_dict()
+            return JsonResponse(result, json_dumps_params={"ensure_ascii": False})
+
+        except Exception as e:
+            logger.error(f"ChatBot error: {str(e)}")
+            return _error("처리 중 오류가 발생했습니다.", 500, error=str(e))
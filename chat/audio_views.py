@@ -0,0 +1,78 @@
+import os
+import re
+
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified
+from django.views import View
+
+from .tts_cache import get_tts_cache
+
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+# 내용 기반 주소이므로 같은 URL의 내용은 바뀌지 않음
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class TtsAudioView(View):
+    """TTS 음성 파일 제공 (GET /chat/audio/<key>.<extension>)
+
+    키가 (텍스트, 언어, 음성)의 sha256이라 추측할 수 없으므로 인증 없이 제공해 오디오 플레이어가 바로 재생할 수 있게 함.
+    ETag/If-None-Match와 Range 요청(재생 위치 이동, 이어받기)을 지원.
+    """
+
+    def get(self, request, key, extension):
+        cache = get_tts_cache()
+        if extension != cache.backend.extension:
+            raise Http404
+        try:
+            path = cache.path(key)
+        except ValueError:
+            raise Http404
+        if not os.path.exists(path):
+            raise Http404
+
+        etag = f'"{key}"'
+        if etag in [tag.strip() for tag in request.headers.get("If-None-Match", "").split(",")]:
+            response = HttpResponseNotModified()
+            response["ETag"] = etag
+            return response
+
+        size = os.path.getsize(path)
+        byte_range = self.parse_range(request.headers.get("Range"), size)
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+
+        f = open(path, "rb")
+        if byte_range is None:
+            response = FileResponse(f, content_type=cache.backend.content_type)
+        else:
+            start, end = byte_range
+            f.seek(start)
+            response = HttpResponse(f.read(end - start + 1), status=206, content_type=cache.backend.content_type)
+            f.close()
+            response["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+        response["Accept-Ranges"] = "bytes"
+        response["ETag"] = etag
+        response["Cache-Control"] = CACHE_CONTROL
+        return response
+
+    def parse_range(self, header, size):
+        """Range 헤더 해석: 없으면 None, 만족할 수 없으면 False, 아니면 (start, end)"""
+        if not header:
+            return None
+        match = RANGE_PATTERN.match(header.strip())
+        if not match or match.groups() == ("", ""):
+            return None  # 지원하지 않는 형식(다중 범위 등)은 전체 응답
+        start, end = match.groups()
+        if start == "":
+            # 마지막 N바이트
+            length = int(end)
+            if length == 0:
+                return False
+            return max(size - length, 0), size - 1
+        start = int(start)
+        end = min(int(end), size - 1) if end else size - 1
+        if start >= size or start > end:
+            return False
+        return start, end
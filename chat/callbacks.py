@@ -0,0 +1,115 @@
+import json
+import queue
+import re
+import time
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from .metrics import record
+
+
+class JsonFieldStream:
+    """토큰 단위로 들어오는 JSON 응답에서 문자열 필드 하나의 값만 디코딩해 돌려줌
+
+    이스케이프(\\n, \\", \\uXXXX)가 토큰 경계에서 잘리면 다음 토큰이 올 때까지 보류한다.
+    """
+
+    def __init__(self, field: str):
+        self._start = re.compile(rf'"{re.escape(field)}"\s*:\s*"')
+        self._buffer = ""  # 필드 값이 시작되기 전까지 받은 텍스트
+        self._raw = None   # 필드 값 원문 (이스케이프 포함)
+        self._pos = 0      # _raw에서 이미 디코딩한 위치
+        self.done = False
+
+    def feed(self, token: str) -> str:
+        """토큰을 받아 새로 디코딩된 필드 값 조각 반환 (없으면 빈 문자열)"""
+        if self.done or not token:
+            return ""
+        if self._raw is None:
+            self._buffer += token
+            match = self._start.search(self._buffer)
+            if match is None:
+                return ""
+            self._raw, self._buffer = self._buffer[match.end():], ""
+        else:
+            self._raw += token
+
+        try:
+            start, end = self._pos, self._scan()
+            self._pos = end
+            return json.loads(f'"{self._raw[start:end]}"', strict=False) if end > start else ""
+        except ValueError:  # 잘못된 이스케이프 - 나머지는 최종 message 이벤트로 전달됨
+            self.done = True
+            return ""
+
+    def _scan(self) -> int:
+        """완전히 받은 부분의 끝 위치 (닫는 따옴표를 만나면 done)"""
+        raw, i = self._raw, self._pos
+        while i < len(raw):
+            if raw[i] == '"':
+                self.done = True
+                break
+            if raw[i] != "\\":
+                i += 1
+                continue
+            if i + 1 >= len(raw):
+                break
+            if raw[i + 1] != "u":
+                i += 2
+                continue
+            if i + 6 > len(raw):
+                break
+            step = 12 if 0xD800 <= int(raw[i + 2:i + 6], 16) <= 0xDBFF else 6  # 서로게이트 쌍은 함께 디코딩
+            if i + step > len(raw):
+                break
+            i += step
+        return i
+
+
+class QueueCallbackHandler(BaseCallbackHandler):
+    """에이전트 실행 중 발생한 도구 결과와 최종 응답의 start_message 텍스트를 큐로 전달
+
+    에이전트 응답은 JSON이므로 토큰을 그대로 보내지 않고 start_message 값만 디코딩해 token 이벤트로 보낸다.
+    """
+
+    def __init__(self, events: queue.Queue):
+        self.events = events
+        self._streams = {}  # LLM run_id -> JsonFieldStream
+
+    def on_llm_new_token(self, token: str, **kwargs) -> None:
+        stream = self._streams.setdefault(kwargs.get("run_id"), JsonFieldStream("start_message"))
+        text = stream.feed(token)
+        if text:
+            self.events.put(("token", {"token": text}))
+
+    def on_llm_end(self, response, **kwargs) -> None:
+        self._streams.pop(kwargs.get("run_id"), None)
+
+    def on_llm_error(self, error, **kwargs) -> None:
+        self._streams.pop(kwargs.get("run_id"), None)
+
+    def on_tool_end(self, output, **kwargs) -> None:
+        if isinstance(output, dict):
+            self.events.put(("tool_result", {"tool": kwargs.get("name"), **output}))
+
+
+class TimingCallbackHandler(BaseCallbackHandler):
+    """에이전트의 LLM 호출(단계)마다 걸린 시간을 metrics에 기록"""
+
+    def __init__(self, timings=None):
+        self.timings = timings
+        self._started = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs) -> None:
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs) -> None:
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_end(self, response, *, run_id, **kwargs) -> None:
+        started = self._started.pop(run_id, None)
+        if started is not None:
+            record("llm", time.perf_counter() - started, self.timings)
+
+    def on_llm_error(self, error, *, run_id, **kwargs) -> None:
+        self._started.pop(run_id, None)
@@ -0,0 +1,100 @@
+import asyncio
+import json
+import re
+import time
+import uuid
+from typing import List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from .offline import offline_config, script_tool_calls
+
+# agent.HUMAN_TEMPLATE 로 만든 사용자 메시지
+HUMAN_MESSAGE = re.compile(r"사용자 위치: 위도 (?P<latitude>[-\d.]+), 경도 (?P<longitude>[-\d.]+)\n메시지: (?P<message>.*)", re.S)
+TOOL_RESULT_TYPE = re.compile(r"""["']type["']\s*:\s*["'](\w+)["']""")
+TOOL_RESULT_MESSAGE = re.compile(r"""["']start_message["']\s*:\s*["']([^"']*)["']""")
+
+
+class FakeChatModel(BaseChatModel):
+    """ChatOpenAI 대신 쓰는 결정적(deterministic) 로컬 모델 (settings.CHAT_OFFLINE)
+
+    도구가 연결되어 있으면 offline.script_tool_calls가 정한 도구를 차례로 호출하고,
+    도구 결과를 받은 뒤에는 시스템 프롬프트 형식의 JSON 응답을 만든다.
+    도구 없이 호출되면(대화 요약 등) 마지막 메시지를 줄여서 돌려준다. 호출마다 설정된 지연만큼 기다린다.
+    """
+    model: str = "fake"
+    tool_names: List[str] = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def bind_tools(self, tools, **kwargs):
+        return self.model_copy(update={"tool_names": [getattr(tool, "name", str(tool)) for tool in tools]})
+
+    def _latency(self, messages):
+        config = offline_config()
+        return config["LLM_LATENCY"] + config["LLM_LATENCY_PER_TOKEN"] * self._count_tokens(messages)
+
+    def _count_tokens(self, messages):
+        return sum(len(str(message.content)) for message in messages) // 2
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self._latency(messages))
+        return self._respond(messages)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        await asyncio.sleep(self._latency(messages))
+        return self._respond(messages)
+
+    def _respond(self, messages) -> ChatResult:
+        message = self._next_message(messages)
+        prompt_tokens = self._count_tokens(messages)
+        completion_tokens = len(str(message.content)) // 2 + 10 * len(message.tool_calls)
+        return ChatResult(
+            generations=[ChatGeneration(message=message)],
+            llm_output={
+                "model_name": self.model,
+                "token_usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                },
+            },
+        )
+
+    def _next_message(self, messages) -> AIMessage:
+        human_index = max((i for i, m in enumerate(messages) if m.type == "human"), default=None)
+        match = HUMAN_MESSAGE.match(str(messages[human_index].content)) if human_index is not None else None
+        if not self.tool_names or match is None:
+            return AIMessage(content=str(messages[-1].content)[:200] if messages else "")
+
+        tool_results = [m for m in messages[human_index + 1:] if m.type == "tool"]
+        calls = [
+            call for call in script_tool_calls(
+                match.group("message"), float(match.group("latitude")), float(match.group("longitude"))
+            )
+            if call.tool in self.tool_names
+        ]
+        if len(tool_results) < len(calls):
+            call = calls[len(tool_results)]
+            return AIMessage(content="", tool_calls=[
+                {"name": call.tool, "args": call.args, "id": f"call_{uuid.uuid4().hex[:16]}"}
+            ])
+        return AIMessage(content=json.dumps(self._answer(tool_results[-1] if tool_results else None),
+                                            ensure_ascii=False))
+
+    def _answer(self, tool_result: Optional[object]):
+        if tool_result is None:
+            return {"type": "chat", "start_message": "네, 무엇을 도와드릴까요?",
+                    "end_message": "근처 병원이나 약국을 찾아드릴 수 있어요."}
+        content = str(tool_result.content)
+        result_type = TOOL_RESULT_TYPE.search(content)
+        start_message = TOOL_RESULT_MESSAGE.search(content)
+        return {
+            "type": result_type.group(1) if result_type else "chat",
+            "start_message": start_message.group(1) if start_message else "검색 결과입니다.",
+            "end_message": "더 궁금한 점이 있으면 말씀해주세요.",
+        }
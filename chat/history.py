@@ -0,0 +1,150 @@
+import logging
+from typing import Dict, List, Optional
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage, get_buffer_string
+
+logger = logging.getLogger(__name__)
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("o200k_base")  # gpt-4o 계열 토크나이저
+except Exception:  # tiktoken 미설치 또는 인코딩 로드 실패
+    _encoding = None
+
+SUMMARY_PROMPT = """다음은 의료 서비스 챗봇과 사용자의 이전 대화입니다.
+이후 대화에 필요한 정보(찾던 진료과목, 시간 조건, 추천된 병원/약국 이름 등)만 남겨
+3문장 이내의 한국어로 요약해주세요.
+
+기존 요약:
+{summary}
+
+대화:
+{conversation}"""
+
+# 목록 응답의 각 항목을 참조 문자열로 줄일 때 사용하는 키
+LIST_REF_KEYS = {
+    "hospital_list": ("name", "hospital_type", "distance"),
+    "pharmacy_list": ("약국명", "영업 상태", "거리"),
+}
+
+
+def count_tokens(messages: List[BaseMessage]) -> int:
+    """메시지 목록의 토큰 수 (메시지당 오버헤드 포함 근사값)"""
+    total = 0
+    for message in messages:
+        content = message.content if isinstance(message.content, str) else str(message.content)
+        if _encoding is not None:
+            total += len(_encoding.encode(content)) + 4
+        else:
+            total += len(content) // 2 + 4
+    return total
+
+
+def compact_response(response: Dict) -> str:
+    """응답을 대화 기록용 문자열로 축약 (검색 결과는 원본 JSON 대신 이름 참조만 저장)"""
+    text = " ".join(filter(None, [response.get("start_message"), response.get("end_message")]))
+    response_type = response.get("type")
+    data = response.get("data") or []
+    if response_type in LIST_REF_KEYS and data:
+        keys = LIST_REF_KEYS[response_type]
+        refs = []
+        for item in data:
+            name, *attrs = [item.get(key) for key in keys]
+            attrs = ", ".join(str(attr) for attr in attrs if attr)
+            refs.append(f"{name}({attrs})" if attrs else str(name))
+        text += f"\n[{response_type} {len(data)}건: {'; '.join(refs)}]"
+    return text
+
+
+class ChatHistoryManager:
+    """토큰 예산 내로 대화 기록을 유지하고, 오래된 턴은 요약 메시지로 합치는 관리자"""
+
+    def __init__(self, summarizer=None, max_tokens: int = 1500, keep_ratio: float = 0.5):
+        self.summarizer = summarizer
+        self.max_tokens = max_tokens
+        self.keep_tokens = int(max_tokens * keep_ratio)
+
+    def prepare(self, history) -> List[BaseMessage]:
+        """프롬프트에 넣을 대화 기록 (요약 메시지 + 최근 메시지)"""
+        summary, collapsed, keep = self._split(history)
+        if collapsed:
+            summary = self._apply(history, self._summarize(summary, collapsed), collapsed, keep)
+        return self._with_summary(summary, keep)
+
+    async def aprepare(self, history) -> List[BaseMessage]:
+        """prepare의 비동기 버전 (요약 LLM 호출을 ainvoke로 수행)"""
+        summary, collapsed, keep = self._split(history)
+        if collapsed:
+            summary = self._apply(history, await self._asummarize(summary, collapsed), collapsed, keep)
+        return self._with_summary(summary, keep)
+
+    def _split(self, history):
+        """(요약, 요약으로 합칠 메시지, 유지할 메시지)로 분리"""
+        messages = list(history.messages)
+        summary = history.state.get("summary")
+
+        if count_tokens(self._with_summary(summary, messages)) <= self.max_tokens:
+            return summary, [], messages
+
+        # 최근 메시지를 keep_tokens 안에서 유지하고 나머지는 요약으로 합침
+        keep, used = [], 0
+        for message in reversed(messages):
+            tokens = count_tokens([message])
+            if used + tokens > self.keep_tokens:
+                break
+            keep.insert(0, message)
+            used += tokens
+        while keep and not isinstance(keep[0], HumanMessage):
+            keep.pop(0)  # 턴 중간에서 잘리지 않도록 사용자 메시지부터 시작
+
+        return summary, messages[:len(messages) - len(keep)], keep
+
+    def _apply(self, history, summary, collapsed, keep):
+        logger.info(
+            f"Chat history collapsed: session={history.session_id} "
+            f"collapsed={len(collapsed)} kept={len(keep)}"
+        )
+        history.messages = keep
+        if summary:
+            history.state["summary"] = summary
+        history.save()
+        return summary
+
+    @staticmethod
+    def _with_summary(summary, messages):
+        summary_messages = [SystemMessage(content=f"이전 대화 요약: {summary}")] if summary else []
+        return summary_messages + list(messages)
+
+    def record_turn(self, history, input_text: str, response: Dict) -> None:
+        """사용자 메시지와 축약된 응답을 대화 기록에 추가"""
+        history.add_messages([
+            HumanMessage(content=input_text),
+            AIMessage(content=compact_response(response)),
+        ])
+
+    def _summary_prompt(self, summary, messages):
+        return SUMMARY_PROMPT.format(
+            summary=summary or "없음",
+            conversation=get_buffer_string(messages, human_prefix="사용자", ai_prefix="챗봇"),
+        )
+
+    def _summarize(self, summary: Optional[str], messages: List[BaseMessage]) -> Optional[str]:
+        if not messages or self.summarizer is None:
+            return summary
+        try:
+            result = self.summarizer.invoke(self._summary_prompt(summary, messages))
+            return result.content.strip()
+        except Exception as e:
+            # 요약 실패 시 기존 요약을 유지하고 오래된 메시지는 버림
+            logger.error(f"Chat history summarization error: {str(e)}")
+            return summary
+
+    async def _asummarize(self, summary: Optional[str], messages: List[BaseMessage]) -> Optional[str]:
+        if not messages or self.summarizer is None:
+            return summary
+        try:
+            result = await self.summarizer.ainvoke(self._summary_prompt(summary, messages))
+            return result.content.strip()
+        except Exception as e:
+            logger.error(f"Chat history summarization error: {str(e)}")
+            return summary
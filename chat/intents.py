@@ -0,0 +1,138 @@
+import re
+from typing import Dict, NamedTuple, Optional
+
+from searchHospital.symptoms import EMERGENCY_SPECIALTY, best_specialty
+
+# 사용자가 부르는 진료과목 이름 → DB hospital_type 값 (searchHospital.data_processor.normalize_hospital_type 기준)
+DEPARTMENT_ALIASES = {
+    "종합병원": "종합병원",
+    "내과": "내과",
+    "소아과": "소아청소년과",
+    "소아청소년과": "소아청소년과",
+    "가정의학과": "가정의학과",
+    "이비인후과": "이비인후과",
+    "정형외과": "정형외과",
+    "피부과": "피부과",
+    "안과": "안과",
+    "치과": "치과",
+    "한의원": "한방병원",
+    "한방병원": "한방병원",
+    "산부인과": "산부인과",
+    "정신건강의학과": "정신건강의학과",
+    "성형외과": "성형외과",
+    "신경외과": "신경외과",
+}
+
+
+def normalize_department(query: str) -> str:
+    """사용자/LLM이 쓴 진료과목 이름을 DB hospital_type 값으로 변환 ("소아과" → "소아청소년과")"""
+    query = (query or "").strip()
+    return DEPARTMENT_ALIASES.get(query, query)
+
+
+class Intent(NamedTuple):
+    """LLM 없이 바로 처리할 수 있는 요청 (호출할 도구와 인자)"""
+    tool: str
+    kwargs: Dict
+    note: str = ""  # 도구 결과의 start_message 앞에 붙일 안내 (증상 → 진료과목 추천 등)
+
+
+# 빠른 응답 버튼 메시지
+FIXED_INTENTS = {
+    "근처 약국 찾아줘": Intent("search_pharmacy", {}),
+    "근처 병원 찾아줘": Intent("search_hospital", {"query": ""}),
+}
+
+# "지금 근처 문 연", "주변", "가까운" 등 위치/영업 수식어
+_PREFIX = r"(?:지금\s*)?(?:(?:내\s*)?(?:근처|주변)(?:에)?|가까운)?\s*(?:(?:문\s*)?(?:연|열린|여는)|영업\s*중인?)?\s*"
+# "찾아줘", "알려줘" 등 요청 표현
+_SUFFIX = r"\s*(?:좀\s*)?(?:찾아\s*줘|알려\s*줘|추천해\s*줘|보여\s*줘|어디\s*있어)?(?:요)?\s*[?.!~]*"
+
+PHARMACY_PATTERN = re.compile(rf"^{_PREFIX}약국{_SUFFIX}$")
+_DEPARTMENTS = "|".join(sorted(DEPARTMENT_ALIASES, key=len, reverse=True))
+HOSPITAL_PATTERN = re.compile(rf"^{_PREFIX}(?P<department>{_DEPARTMENTS})?\s*(?P<hospital>병원|의원)?{_SUFFIX}$")
+# 이전 결과 필터: "내과로 알려줘", "소아과만 보여줘", "지금 연 곳만"
+REFINE_DEPARTMENT_PATTERN = re.compile(rf"^(?P<department>{_DEPARTMENTS})\s*(?:으로|로|만)\s*(?:다시\s*)?{_SUFFIX}$")
+REFINE_OPEN_PATTERN = re.compile(rf"^(?:지금\s*)?(?:문\s*)?(?:연|열린|여는|영업\s*중인)\s*(?:곳|데)\s*만{_SUFFIX}$")
+# 시간/정렬 조건 - 에이전트가 target_time/sort_by를 붙여 검색해야 하는 요청
+CONDITION_PATTERN = re.compile(
+    r"내일|모레|오늘\s*밤|오전|오후|새벽|아침|저녁|밤|\d+\s*시|주말|토요일|일요일|공휴일|"
+    r"늦게|일찍|빨리|먼저|가장|제일"
+)
+# 병원 찾기가 아니라 약/처치에 대한 질문 (증상이 있어도 에이전트가 답함)
+CARE_QUESTION_PATTERN = re.compile(r"먹여도|먹어도|먹이면|복용|해열제|진통제|연고|처방|대처|응급\s*처치|집에서|괜찮을까|괜찮아\?")
+# 정보를 묻는 질문 ("이유식 언제 시작해요?", "교정 비용이 얼마야?") - 병원 찾기 표현이 없으면 에이전트가 답함
+QUESTION_PATTERN = re.compile(r"어떻게|어떡|언제|얼마|왜|뭐|무엇|무슨|몇|\?")
+# 병원을 찾는 표현 ("어디로 가야 해?", "병원 가봐야 할까")
+HOSPITAL_CUE_PATTERN = re.compile(r"병원|의원|진료|어디\s*(?:로|에|를)?\s*가|가\s*봐야|가야|데려가|찾아\s*줘|알려\s*줘")
+# 지금 겪는 증상을 말하는 표현 (키워드만 있는 "스트레스 받아", "요즘 너무 피곤해"는 증상 검색으로 보지 않음)
+SYMPTOM_PREDICATE_PATTERN = re.compile(
+    r"아파|아프|아픈|아퍼|아팠|통증|쓰려|쑤셔|열이\s*(?:나|났|있|올라)|열나|고열|부었|부어|붓|가려|간지러|"
+    r"토(?:하|해|했)|설사|기침|콧물|코가\s*막|막혀|흔들|다쳤|부러|삐었|접질|빨개|저려|저림|피가|피나|멍이|"
+    r"물집|두드러기|발진|못\s*(?:자|먹|쉬)|안\s*(?:자|먹)|심해|심하|걸린|걸렸"
+)
+MIN_SYMPTOM_SCORE = 1.5
+_DEPARTMENT_PATTERN = re.compile(_DEPARTMENTS)
+
+SYMPTOM_NOTE = "말씀하신 증상으로는 {department} 진료를 추천드려요."
+EMERGENCY_NOTE = "응급 상황일 수 있어요. 바로 119에 연락하거나 가까운 응급실로 가세요."
+
+
+def match_intent(message: str) -> Optional[Intent]:
+    """템플릿으로 처리 가능한 메시지면 Intent 반환, 아니면 None (에이전트가 처리)
+
+    시간 조건("내일 오전"), 정렬("가장 늦게") 등이 붙은 메시지는 정규식에 맞지 않으므로 에이전트로 넘어간다.
+    이전 결과 필터("내과로 알려줘")는 refine_previous_results 의도로 반환되며,
+    세션에 이전 검색 결과가 없으면 호출하는 쪽에서 에이전트로 넘긴다.
+    템플릿에 맞지 않으면 증상 사전(match_symptom_intent)으로 진료과목을 찾아본다.
+    """
+    if not message:
+        return None
+    text = message.strip()
+
+    if text in FIXED_INTENTS:
+        return FIXED_INTENTS[text]
+
+    if PHARMACY_PATTERN.match(text):
+        return Intent("search_pharmacy", {})
+
+    match = HOSPITAL_PATTERN.match(text)
+    if match:
+        department = match.group("department")
+        if department:
+            return Intent("search_hospital", {"query": DEPARTMENT_ALIASES[department]})
+        if match.group("hospital"):
+            return Intent("search_hospital", {"query": ""})
+
+    match = REFINE_DEPARTMENT_PATTERN.match(text)
+    if match:
+        return Intent("refine_previous_results", {"department": match.group("department")})
+
+    if REFINE_OPEN_PATTERN.match(text):
+        return Intent("refine_previous_results", {"open_only": True})
+
+    return match_symptom_intent(text)
+
+
+def match_symptom_intent(text: str) -> Optional[Intent]:
+    """증상 문장("아이가 귀가 아파요")을 로컬 증상 사전으로 진료과목 검색 의도로 변환
+
+    증상 표현(아파요, 열이 나요 등)이 있거나 병원을 찾는 표현이 있어야 검색하고, 키워드만 스친 정보 질문
+    ("이유식 언제 시작해요?", "접종 후 열이 나면 어떻게 해?")이나 진료과목/시간 조건/약국/약·처치 질문이
+    섞인 메시지는 에이전트에 맡긴다. 응급 증상은 조건과 상관없이 바로 큰 병원 검색과 119 안내를 반환한다.
+    """
+    # 아이 관련 표현이 있을 때만 내과/가정의학과 증상을 소아청소년과로 안내
+    match = best_specialty(text, child=False)
+    if match is None:
+        return None
+    if match.emergency:
+        return Intent("search_hospital", {"query": EMERGENCY_SPECIALTY}, note=EMERGENCY_NOTE)
+    if (_DEPARTMENT_PATTERN.search(text) or "약국" in text or CONDITION_PATTERN.search(text)
+            or CARE_QUESTION_PATTERN.search(text)):
+        return None
+    if not HOSPITAL_CUE_PATTERN.search(text) and (
+            QUESTION_PATTERN.search(text) or match.score < MIN_SYMPTOM_SCORE
+            or not SYMPTOM_PREDICATE_PATTERN.search(text)):
+        return None
+    return Intent("search_hospital", {"query": match.hospital_type},
+                  note=SYMPTOM_NOTE.format(department=match.hospital_type))
@@ -0,0 +1,226 @@
+import json
+import random
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.test import Client, override_settings
+
+from chat.management.commands.chat_loadtest import percentile
+from searchHospital.models import Hospital
+from searchPharmacy.models import Pharmacy
+from users.models import UserProfile
+
+# 벤치마크 사용자 위치 (시설은 이 주변에 생성)
+CENTER = (37.5665, 126.9780)
+
+# 세션마다 순서를 바꿔 가며 보내는 발화 (템플릿/증상 빠른 경로, 에이전트 검색, 이전 결과 필터, 일반 대화)
+MESSAGES = [
+    "근처 소아과 알려줘",
+    "아이가 귀가 아파요",
+    "내일 오전에 여는 소아과 있어?",
+    "지금 문 연 약국 알려줘",
+    "내과로 알려줘",
+    "안녕 반가워",
+    "주말에 여는 이비인후과 찾아줘",
+    "아이 열이 나요 해열제 먹여도 돼?",
+]
+HOSPITAL_TYPES = ["소아청소년과", "내과", "이비인후과", "가정의학과", "피부과", "안과", "치과", "정형외과"]
+
+
+class Command(BaseCommand):
+    help = (
+        '오프라인 채팅 처리량 벤치마크. 가짜 LLM/STT/TTS(settings.CHAT_OFFLINE)와 '
+        '임시 테스트 DB의 가상 병원/약국으로 동시 세션 N개를 실행하고, '
+        'p50/p95 지연시간, 처리량, 단계별(stt, llm, tool.*, tts 등) 소요 시간을 보고합니다. '
+        'OpenAI/Google 할당량을 사용하지 않습니다.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sessions', nargs='+', type=int, default=[1, 10, 25], help='동시 세션 수 목록')
+        parser.add_argument('--turns', type=int, default=4, help='세션당 대화 턴 수')
+        parser.add_argument('--endpoint', default='/chat/unified/',
+                            help='대상 경로 (/chat/unified/ 또는 /chat/unified/async/)')
+        parser.add_argument('--hospitals', type=int, default=300, help='생성할 병원 수')
+        parser.add_argument('--pharmacies', type=int, default=100, help='생성할 약국 수')
+        parser.add_argument('--llm-latency', type=float, default=0.6, help='가짜 LLM 호출 1회 지연(초)')
+        parser.add_argument('--stt-latency', type=float, default=0.4, help='가짜 음성 인식 지연(초)')
+        parser.add_argument('--voice-ratio', type=float, default=0.0,
+                            help='음성 입력 + 음성 응답으로 보낼 턴 비율 (0~1)')
+        parser.add_argument('--seed', type=int, default=0, help='시설 배치/음성 턴 선택 시드')
+        parser.add_argument('--keepdb', action='store_true', help='테스트 DB를 지우지 않고 재사용')
+
+    def handle(self, *args, **options):
+        offline = {
+            **getattr(settings, 'CHAT_OFFLINE', {}),
+            'ENABLED': True,
+            'LLM_LATENCY': options['llm_latency'],
+            'STT_LATENCY': options['stt_latency'],
+        }
+        tts_directory = tempfile.mkdtemp(prefix='chat-benchmark-tts-')
+        overrides = {
+            'CHAT_OFFLINE': offline,
+            'CHAT_TTS_CACHE': {**getattr(settings, 'CHAT_TTS_CACHE', {}), 'DIRECTORY': tts_directory},
+            'ALLOWED_HOSTS': [*settings.ALLOWED_HOSTS, 'testserver'],
+        }
+
+        with override_settings(**overrides):
+            old_name = connection.settings_dict['NAME']
+            connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False,
+                                               keepdb=options['keepdb'])
+            try:
+                token = self.create_fixture(options)
+                self.stdout.write(
+                    f"{'sessions':>8} {'turns':>6} {'ok':>5} {'err':>5} {'turns/s':>8} "
+                    f"{'p50(s)':>8} {'p95(s)':>8} {'max(s)':>8}"
+                )
+                levels = []
+                for sessions in options['sessions']:
+                    result = self.run_level(token, sessions, options)
+                    levels.append((sessions, result))
+                    self.stdout.write(
+                        f"{sessions:>8} {result['turns']:>6} {result['ok']:>5} {result['errors']:>5} "
+                        f"{result['throughput']:>8.2f} {result['p50']:>8.2f} {result['p95']:>8.2f} "
+                        f"{result['max']:>8.2f}"
+                    )
+                for sessions, result in levels:
+                    self.write_stages(sessions, result)
+            finally:
+                connections.close_all()
+                connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options['keepdb'])
+                shutil.rmtree(tts_directory, ignore_errors=True)
+
+    def create_fixture(self, options):
+        """가상 병원/약국과 벤치마크 사용자 생성, 인증 토큰 반환"""
+        from rest_framework_simplejwt.tokens import RefreshToken
+
+        rng = random.Random(options['seed'])
+        latitude, longitude = CENTER
+
+        def nearby():
+            # 반경 약 3km 안의 임의 좌표
+            return latitude + rng.uniform(-0.025, 0.025), longitude + rng.uniform(-0.03, 0.03)
+
+        Hospital.objects.filter(ykiho__startswith='BENCH').delete()
+        hospitals = []
+        for i in range(options['hospitals']):
+            hospital_lat, hospital_lon = nearby()
+            closes = rng.choice(['18:00', '19:00', '21:00'])
+            hospitals.append(Hospital(
+                ykiho=f'BENCH{i:06d}',
+                name=f'벤치마크{HOSPITAL_TYPES[i % len(HOSPITAL_TYPES)]}의원{i}',
+                address=f'서울특별시 중구 벤치로 {i}',
+                phone='02-000-0000',
+                department=HOSPITAL_TYPES[i % len(HOSPITAL_TYPES)],
+                hospital_type=HOSPITAL_TYPES[i % len(HOSPITAL_TYPES)],
+                latitude=hospital_lat,
+                longitude=hospital_lon,
+                weekday_hours={day: {'start': '09:00', 'end': closes} for day in ('mon', 'tue', 'wed', 'thu', 'fri')},
+                saturday_hours={'start': '09:00', 'end': '13:00'} if i % 2 else None,
+                sunday_hours={'start': '10:00', 'end': '14:00'} if i % 7 == 0 else None,
+                sunday_closed=i % 7 != 0,
+                lunch_time={'weekday': {'start': '13:00', 'end': '14:00'}},
+            ))
+        Hospital.objects.bulk_create(hospitals, batch_size=500)
+
+        Pharmacy.objects.filter(name__startswith='벤치마크').delete()
+        pharmacies = []
+        for i in range(options['pharmacies']):
+            pharmacy_lat, pharmacy_lon = nearby()
+            weekday = {f'{day}_start': '0900' for day in ('mon', 'tue', 'wed', 'thu', 'fri')}
+            weekday.update({f'{day}_end': rng.choice(['1900', '2100', '2200']) for day in ('mon', 'tue', 'wed', 'thu', 'fri')})
+            pharmacies.append(Pharmacy(
+                name=f'벤치마크약국{i}',
+                address=f'서울특별시 중구 벤치로 {i}',
+                tel='02-000-0000',
+                latitude=pharmacy_lat,
+                longitude=pharmacy_lon,
+                sat_start='0900' if i % 2 else '',
+                sat_end='1500' if i % 2 else '',
+                **weekday,
+            ))
+        Pharmacy.objects.bulk_create(pharmacies, batch_size=500)
+
+        user, _ = User.objects.get_or_create(username='chat-benchmark')
+        UserProfile.objects.update_or_create(
+            user=user, defaults={'latitude': latitude, 'longitude': longitude, 'term_agreed': True}
+        )
+        return str(RefreshToken.for_user(user).access_token)
+
+    def run_level(self, token, sessions, options):
+        """동시 세션 수 하나에 대한 실행"""
+        latencies, errors, stage_samples = [], [], defaultdict(list)
+        lock = threading.Lock()
+        rng = random.Random(options['seed'])
+        voice_turns = {
+            (session, turn)
+            for session in range(sessions) for turn in range(options['turns'])
+            if rng.random() < options['voice_ratio']
+        }
+
+        def session_worker(session):
+            client = Client(HTTP_AUTHORIZATION=f'Bearer {token}', HTTP_X_CHAT_TIMINGS='1')
+            session_id = f'benchmark-{uuid.uuid4().hex}'
+            for turn in range(options['turns']):
+                message = MESSAGES[(session + turn) % len(MESSAGES)]
+                started = time.perf_counter()
+                if (session, turn) in voice_turns:
+                    # 가짜 STT는 업로드 내용(UTF-8)을 인식 결과로 돌려줌
+                    response = client.post(options['endpoint'], {
+                        'audio': SimpleUploadedFile('turn.wav', message.encode('utf-8'), content_type='audio/wav'),
+                        'session_id': session_id,
+                        'need_voice': 'true',
+                    })
+                else:
+                    response = client.post(options['endpoint'], json.dumps({
+                        'message': message, 'session_id': session_id,
+                    }), content_type='application/json')
+                elapsed = time.perf_counter() - started
+
+                ok = response.status_code == 200
+                timings = response.json().get('timings', {}) if ok else {}
+                with lock:
+                    (latencies if ok else errors).append(elapsed)
+                    for stage, ms in timings.get('stages_ms', {}).items():
+                        if stage != 'total':
+                            stage_samples[stage].append(ms)
+                    if timings:
+                        stage_samples['total'].append(timings['total_ms'])
+            connections.close_all()  # 이 스레드에서 연 DB 연결 정리
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=sessions) as executor:
+            list(executor.map(session_worker, range(sessions)))
+        wall_time = time.perf_counter() - started
+
+        return {
+            'turns': sessions * options['turns'],
+            'ok': len(latencies),
+            'errors': len(errors),
+            'throughput': len(latencies) / wall_time if wall_time else 0.0,
+            'p50': statistics.median(latencies) if latencies else 0.0,
+            'p95': percentile(latencies, 95),
+            'max': max(latencies, default=0.0),
+            'stages': stage_samples,
+        }
+
+    def write_stages(self, sessions, result):
+        """단계별 소요 시간 (agent는 llm/tool.* 을 포함하므로 비율 합이 100%가 아님)"""
+        total = sum(result['stages'].get('total', [])) or 1
+        self.stdout.write(f"\n[{sessions} sessions]")
+        self.stdout.write(f"{'stage':<28} {'count':>6} {'mean(ms)':>9} {'p50(ms)':>9} {'p95(ms)':>9} {'of total':>9}")
+        for stage, samples in sorted(result['stages'].items(), key=lambda item: sum(item[1]), reverse=True):
+            self.stdout.write(
+                f"{stage:<28} {len(samples):>6} {statistics.mean(samples):>9.1f} "
+                f"{statistics.median(samples):>9.1f} {percentile(samples, 95):>9.1f} {sum(samples) / total:>9.0%}"
+            )
@@ -0,0 +1,139 @@
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.core.management.base import BaseCommand
+
+from chat.intents import match_intent
+
+
+def percentile(values, pct):
+    """정렬된 값 목록의 백분위수"""
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+class Command(BaseCommand):
+    help = (
+        '채팅 API 동시 처리량 부하 테스트 (동기 chat/unified/ vs 비동기 chat/unified/async/). '
+        '같은 프로세스 수로 띄운 서버에 대해 동시 접속 수별 처리량과 지연시간, '
+        '부하 중 가벼운 검색 API의 응답 지연을 비교합니다.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://localhost:8000', help='서버 주소')
+        parser.add_argument('--token', required=True, help='인증 토큰 (Authorization 헤더 값, 예: "Bearer xxx")')
+        parser.add_argument(
+            '--endpoints',
+            nargs='+',
+            default=['sync=/chat/unified/', 'async=/chat/unified/async/'],
+            help='비교할 엔드포인트 목록 (이름=경로)'
+        )
+        parser.add_argument(
+            '--concurrency',
+            nargs='+',
+            type=int,
+            default=[1, 5, 10, 20, 40],
+            help='동시 접속 수 목록'
+        )
+        parser.add_argument('--requests-per-worker', type=int, default=3, help='동시 접속당 요청 수')
+        parser.add_argument('--message', default='내일 오전에 여는 소아과 있어?',
+                            help='전송할 채팅 메시지 (기본값은 템플릿 빠른 경로가 아닌 에이전트/LLM 경로를 거치는 메시지)')
+        parser.add_argument('--probe-path', default='/hospital/nearby/',
+                            help='부하 중 지연을 측정할 가벼운 API 경로 (빈 값이면 측정 안 함)')
+        parser.add_argument('--timeout', type=float, default=60, help='요청 타임아웃(초)')
+
+    def handle(self, *args, **options):
+        if match_intent(options['message']) is not None:
+            self.stderr.write(self.style.WARNING(
+                '이 메시지는 템플릿/증상 빠른 경로로 처리되어 LLM/에이전트를 호출하지 않습니다. '
+                '비동기 뷰의 효과를 보려면 에이전트를 거치는 메시지를 사용하세요.'
+            ))
+        headers = {"Authorization": options['token']}
+        endpoints = [item.split('=', 1) for item in options['endpoints']]
+
+        self.stdout.write(
+            f"{'endpoint':<10} {'conc':>5} {'ok':>5} {'err':>5} {'req/s':>8} "
+            f"{'p50(s)':>8} {'p95(s)':>8} {'probe p95(s)':>13}"
+        )
+        for name, path in endpoints:
+            for concurrency in options['concurrency']:
+                result = self.run_level(
+                    options['base_url'] + path,
+                    headers,
+                    concurrency,
+                    options['requests_per_worker'],
+                    options['message'],
+                    options['base_url'] + options['probe_path'] if options['probe_path'] else None,
+                    options['timeout'],
+                )
+                self.stdout.write(
+                    f"{name:<10} {concurrency:>5} {result['ok']:>5} {result['errors']:>5} "
+                    f"{result['throughput']:>8.2f} {result['p50']:>8.2f} {result['p95']:>8.2f} "
+                    f"{result['probe_p95']:>13.3f}"
+                )
+
+    def run_level(self, url, headers, concurrency, requests_per_worker, message, probe_url, timeout):
+        """동시 접속 수 하나에 대한 부하 실행"""
+        latencies, errors = [], []
+        lock = threading.Lock()
+
+        def worker(worker_id):
+            session = requests.Session()
+            for i in range(requests_per_worker):
+                started = time.perf_counter()
+                try:
+                    response = session.post(
+                        url,
+                        headers=headers,
+                        json={"message": message, "session_id": f"loadtest-{worker_id}-{i}"},
+                        timeout=timeout,
+                    )
+                    ok = response.status_code == 200
+                except requests.RequestException:
+                    ok = False
+                elapsed = time.perf_counter() - started
+                with lock:
+                    (latencies if ok else errors).append(elapsed)
+
+        # 부하 중 가벼운 API의 응답 지연 측정
+        probe_latencies = []
+        stop_probe = threading.Event()
+
+        def probe():
+            while not stop_probe.is_set():
+                started = time.perf_counter()
+                try:
+                    requests.get(probe_url, headers=headers, timeout=timeout)
+                except requests.RequestException:
+                    pass
+                probe_latencies.append(time.perf_counter() - started)
+                stop_probe.wait(0.5)
+
+        probe_thread = None
+        if probe_url:
+            probe_thread = threading.Thread(target=probe, daemon=True)
+            probe_thread.start()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(worker, range(concurrency)))
+        wall_time = time.perf_counter() - started
+
+        stop_probe.set()
+        if probe_thread:
+            probe_thread.join()
+
+        return {
+            "ok": len(latencies),
+            "errors": len(errors),
+            "throughput": len(latencies) / wall_time if wall_time else 0.0,
+            "p50": statistics.median(latencies) if latencies else 0.0,
+            "p95": percentile(latencies, 95),
+            "probe_p95": percentile(probe_latencies, 95),
+        }
@@ -0,0 +1,83 @@
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# python -X importtime 출력: "import time:  self [us] | cumulative | imported package"
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s+)(\S+)$")
+
+SCRIPT = """
+import django
+django.setup()
+from django.urls import get_resolver
+get_resolver().url_patterns
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        '프로세스 시작 import 시간 보고서 (python -X importtime). '
+        'django.setup()과 URLconf 로드까지 새 프로세스에서 실행하고, '
+        '시간이 많이 드는 모듈과 최상위 패키지별 합계를 보여줍니다.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=20, help='출력할 모듈 수')
+        parser.add_argument('--repeat', type=int, default=3, help='실행 횟수 (전체 시간은 중앙값)')
+        parser.add_argument('--import', dest='extra_imports', action='append', default=[],
+                            help='URLconf 로드 후 추가로 import할 모듈 (여러 번 지정 가능)')
+
+    def handle(self, *args, **options):
+        script = SCRIPT + "".join(f"import {module}\n" for module in options['extra_imports'])
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": os.environ.get("DJANGO_SETTINGS_MODULE", "icare.settings")}
+
+        wall_times, entries = [], None
+        for _ in range(options['repeat']):
+            started = time.perf_counter()
+            result = subprocess.run(
+                [sys.executable, "-X", "importtime", "-c", script],
+                env=env, cwd=settings.BASE_DIR, capture_output=True, text=True,
+            )
+            wall_times.append(time.perf_counter() - started)
+            if result.returncode != 0:
+                self.stderr.write(result.stderr.strip().splitlines()[-1])
+                return
+            entries = self.parse(result.stderr)
+
+        total_self = sum(entry["self"] for entry in entries)
+        self.stdout.write(
+            f"process wall time (median of {options['repeat']}): {statistics.median(wall_times):.3f}s, "
+            f"import time: {total_self / 1e6:.3f}s, modules: {len(entries)}"
+        )
+
+        self.stdout.write(f"\n{'cumulative(ms)':>15} {'self(ms)':>10}  module")
+        top_level = [entry for entry in entries if entry["depth"] == 0]
+        for entry in sorted(top_level, key=lambda e: e["cumulative"], reverse=True)[:options['top']]:
+            self.stdout.write(f"{entry['cumulative'] / 1000:>15.1f} {entry['self'] / 1000:>10.1f}  {entry['module']}")
+
+        packages = defaultdict(int)
+        for entry in entries:
+            packages[entry["module"].split(".")[0]] += entry["self"]
+        self.stdout.write(f"\n{'self total(ms)':>15}  package")
+        for package, self_time in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:options['top']]:
+            self.stdout.write(f"{self_time / 1000:>15.1f}  {package}")
+
+    def parse(self, output):
+        entries = []
+        for line in output.splitlines():
+            match = IMPORTTIME_LINE.match(line)
+            if match:
+                self_us, cumulative_us, indent, module = match.groups()
+                entries.append({
+                    "module": module,
+                    "self": int(self_us),
+                    "cumulative": int(cumulative_us),
+                    "depth": (len(indent) - 1) // 2,
+                })
+        return entries
@@ -0,0 +1,71 @@
+import statistics
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils.module_loading import import_string
+
+from chat.tts import split_sentences, synthesize_sentences
+from chat.tts_cache import TtsCache
+
+DEFAULT_TEXTS = [
+    "현재 영업 중인 소아청소년과 병원들입니다: 방문 전 전화로 확인하시는 것이 좋습니다.",
+    "죄송합니다. 현재 영업 중인 약국을 찾을 수 없습니다. 다른 시간대를 확인해보시거나, 직접 전화로 문의해보세요.",
+    "안녕하세요! 저는 아이케어봇이에요. 😊 아이의 건강과 관련된 정보를 도와드릴게요. 궁금한 점을 말씀해주세요.",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'TTS 첫 음성까지의 시간(time-to-first-audio) 벤치마크. '
+        '응답 전체를 한 번에 합성하는 방식과 문장별 동시 합성 방식을 캐시가 빈 상태에서 비교합니다.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--backend', default='chat.tts.GttsBackend',
+                            help='TTS 엔진 클래스 경로 (예: chat.tts.OfflineToneBackend)')
+        parser.add_argument('--latency', type=float, default=0.0,
+                            help='OfflineToneBackend 요청당 지연(초)')
+        parser.add_argument('--latency-per-char', type=float, default=0.0,
+                            help='OfflineToneBackend 글자당 지연(초)')
+        parser.add_argument('--repeat', type=int, default=3, help='문장별 반복 횟수')
+        parser.add_argument('--text', action='append', help='측정할 응답 문장 (여러 번 지정 가능)')
+
+    def handle(self, *args, **options):
+        backend_class = import_string(options['backend'])
+        backend_options = {}
+        if options['latency'] or options['latency_per_char']:
+            backend_options = {"latency": options['latency'], "latency_per_char": options['latency_per_char']}
+        backend = backend_class(**backend_options)
+        texts = options['text'] or DEFAULT_TEXTS
+
+        whole_first, chunked_first, whole_total, chunked_total = [], [], [], []
+        for _ in range(options['repeat']):
+            for text in texts:
+                # 매 측정마다 빈 캐시 사용
+                with tempfile.TemporaryDirectory() as directory:
+                    cache = TtsCache(directory, max_bytes=100 * 1024 * 1024, backend=backend)
+                    started = time.perf_counter()
+                    cache.get_or_create(text)
+                    elapsed = time.perf_counter() - started
+                    whole_first.append(elapsed)
+                    whole_total.append(elapsed)
+
+                with tempfile.TemporaryDirectory() as directory:
+                    cache = TtsCache(directory, max_bytes=100 * 1024 * 1024, backend=backend)
+                    started = time.perf_counter()
+                    first = None
+                    for _ in synthesize_sentences(text, cache=cache):
+                        if first is None:
+                            first = time.perf_counter() - started
+                    chunked_first.append(first or 0.0)
+                    chunked_total.append(time.perf_counter() - started)
+
+        sentences = statistics.mean(len(split_sentences(text)) for text in texts)
+        self.stdout.write(f"backend={backend.name} texts={len(texts)} repeat={options['repeat']} "
+                          f"sentences/text={sentences:.1f}")
+        self.stdout.write(f"{'mode':<10} {'first p50(s)':>13} {'first max(s)':>13} {'total p50(s)':>13}")
+        for name, first, total in (("whole", whole_first, whole_total), ("chunked", chunked_first, chunked_total)):
+            self.stdout.write(
+                f"{name:<10} {statistics.median(first):>13.3f} {max(first):>13.3f} {statistics.median(total):>13.3f}"
+            )
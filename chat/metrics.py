@@ -0,0 +1,156 @@
+import asyncio
+import contextvars
+import functools
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# 단계별 지연시간 히스토그램 버킷 상한(초)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# 요청 헤더 "X-Chat-Timings: 1" 이 있으면 응답에 timings 블록을 포함
+TIMINGS_HEADER = "HTTP_X_CHAT_TIMINGS"
+
+
+class Histogram:
+    """고정 버킷 지연시간 히스토그램 (백분위수는 버킷 안에서 선형 보간한 추정값)"""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # 마지막 칸은 최대 버킷 초과
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, pct):
+        if not self.count:
+            return 0.0
+        rank = pct / 100 * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = self.buckets[index - 1] if index else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else self.max
+                return min(lower + (upper - lower) * (rank - seen) / count, self.max)
+            seen += count
+        return self.max
+
+    def snapshot(self):
+        cumulative, buckets = 0, {}
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            buckets[f"le_{bound}"] = cumulative
+        buckets["le_inf"] = self.count
+        return {
+            "count": self.count,
+            "sum": round(self.total, 4),
+            "avg": round(self.total / self.count, 4) if self.count else 0.0,
+            "p50": round(self.percentile(50), 4),
+            "p95": round(self.percentile(95), 4),
+            "p99": round(self.percentile(99), 4),
+            "max": round(self.max, 4),
+            "buckets": buckets,
+        }
+
+
+class StageMetrics:
+    """채팅 파이프라인 단계(stt, llm, tool.*, format, tts 등)별 히스토그램 모음 (프로세스 단위)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = Histogram()
+            histogram.observe(seconds)
+
+    def snapshot(self):
+        with self._lock:
+            return {stage: histogram.snapshot() for stage, histogram in sorted(self._histograms.items())}
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+
+stage_metrics = StageMetrics()
+
+
+class Timings:
+    """한 요청에서 기록된 구간 목록 (디버그 헤더가 있을 때 응답에 포함)"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+        self._spans = []
+
+    def add(self, stage, seconds):
+        with self._lock:
+            self._spans.append((stage, seconds))
+
+    def as_dict(self):
+        with self._lock:
+            spans = list(self._spans)
+        stages = {}
+        for stage, seconds in spans:
+            stages[stage] = stages.get(stage, 0.0) + seconds
+        return {
+            "total_ms": round((time.perf_counter() - self.started) * 1000, 1),
+            "stages_ms": {stage: round(seconds * 1000, 1) for stage, seconds in stages.items()},
+            "spans": [{"stage": stage, "ms": round(seconds * 1000, 1)} for stage, seconds in spans],
+        }
+
+
+# 현재 요청의 Timings (없으면 히스토그램에만 기록)
+current_timings = contextvars.ContextVar("chat_timings", default=None)
+
+
+def record(stage, seconds, timings=None):
+    stage_metrics.observe(stage, seconds)
+    timings = timings or current_timings.get()
+    if timings is not None:
+        timings.add(stage, seconds)
+
+
+@contextmanager
+def span(stage):
+    """with span("format"): ... 구간 시간을 히스토그램과 현재 요청 Timings에 기록"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(stage, time.perf_counter() - started)
+
+
+def timed(stage):
+    """함수 전체를 span으로 감싸는 데코레이터 (동기/비동기 함수 모두 지원)"""
+
+    def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(stage):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+def wants_timings(request) -> bool:
+    return request.META.get(TIMINGS_HEADER, "").lower() in ("1", "true", "yes")
@@ -0,0 +1,35 @@
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .metrics import stage_metrics
+from .prefetch import prefetch_stats
+from .router import route_stats
+from .search_cache import get_search_cache
+from .tts_cache import get_tts_cache
+
+
+class ChatMetricsView(APIView):
+    """채팅 파이프라인 지표 (GET /chat/metrics/, 관리자 전용)
+
+    단계별(stt, intent, history.*, route, agent, llm, tool.*, format, tts, total) 지연시간 히스토그램과
+    모델 경로, 선행 검색, 캐시 통계를 이 프로세스 기준으로 반환. DELETE는 단계 히스토그램을 초기화.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        # session_store는 langchain_core를 불러오므로 URLconf 로드 시점이 아니라 처음 조회할 때 import
+        from .session_store import get_session_store
+
+        return Response({
+            "stages": stage_metrics.snapshot(),
+            "routes": route_stats.snapshot(),
+            "prefetch": prefetch_stats.snapshot(),
+            "search_cache": get_search_cache().stats(),
+            "session_store": get_session_store().stats(),
+            "tts_cache": get_tts_cache().stats(),
+        })
+
+    def delete(self, request):
+        stage_metrics.reset()
+        return Response(status=204)
@@ -0,0 +1,95 @@
+import asyncio
+import logging
+import re
+import time
+from typing import Dict, List, NamedTuple
+
+from django.conf import settings
+
+from .intents import CONDITION_PATTERN, match_intent
+from .prefetch import predict_tool_call
+
+logger = logging.getLogger(__name__)
+
+# 오프라인(가짜 LLM/STT/TTS) 기본 설정 (settings.CHAT_OFFLINE 으로 덮어쓸 수 있음)
+# 부하 테스트/개발에서 OpenAI, Google 할당량을 쓰지 않고 채팅 파이프라인 전체를 실행하기 위한 것
+DEFAULT_OFFLINE = {
+    "ENABLED": False,
+    "LLM_LATENCY": 0.6,             # LLM 호출 1회 지연(초)
+    "LLM_LATENCY_PER_TOKEN": 0.0,   # 프롬프트 토큰당 추가 지연(초)
+    "STT_LATENCY": 0.4,             # 음성 인식 지연(초)
+    "TRANSCRIPT": "근처 소아과 알려줘",  # 업로드 내용이 텍스트가 아닐 때 돌려줄 인식 결과
+    "TTS_OPTIONS": {"latency": 0.15, "latency_per_char": 0.004},  # OfflineToneBackend 인자
+    # 메시지별 도구 호출 시나리오 {"메시지": [{"tool": "search_pharmacy", "args": {}}, ...]}
+    # 없는 메시지는 로컬 규칙(템플릿 의도/증상 사전/선행 검색 예측)으로 정함
+    "SCRIPTS": {},
+}
+
+# "내일 오전 10시", "새벽", "주말" 등 target_time으로 넘길 표현
+TIME_PHRASE = re.compile(
+    r"(?:(?:오늘|내일|모레)\s*)?(?:(?:오전|오후|새벽|아침|저녁|밤)\s*)?\d+\s*시|"
+    r"(?:오늘|내일|모레)\s*(?:오전|오후|새벽|아침|저녁|밤)?|오전|오후|새벽|아침|저녁|밤|주말|토요일|일요일|공휴일|늦게|일찍"
+)
+LOCATION_TOOLS = ("search_hospital", "search_pharmacy")
+
+
+def offline_config():
+    return {**DEFAULT_OFFLINE, **getattr(settings, "CHAT_OFFLINE", {})}
+
+
+def offline_enabled() -> bool:
+    return bool(offline_config()["ENABLED"])
+
+
+class ScriptedCall(NamedTuple):
+    tool: str
+    args: Dict
+
+
+def script_tool_calls(message: str, latitude: float, longitude: float) -> List[ScriptedCall]:
+    """가짜 LLM이 이 메시지에 대해 차례로 호출할 도구 목록 (같은 입력이면 항상 같은 결과)"""
+    text = (message or "").strip()
+    location = {"latitude": latitude, "longitude": longitude}
+    scripts = offline_config()["SCRIPTS"]
+    if text in scripts:
+        return [
+            ScriptedCall(step["tool"], {**(location if step["tool"] in LOCATION_TOOLS else {}), **step.get("args", {})})
+            for step in scripts[text]
+        ]
+
+    intent = match_intent(text)
+    if intent is not None:
+        return [ScriptedCall(intent.tool, {**intent.kwargs, **(location if intent.tool in LOCATION_TOOLS else {})})]
+
+    prediction = predict_tool_call(text, latitude, longitude)
+    if prediction is not None:
+        return [ScriptedCall(prediction.tool, prediction.kwargs)]
+
+    # 시간 조건이 붙은 검색 ("내일 오전에 여는 소아과")
+    if CONDITION_PATTERN.search(text):
+        conditionless = CONDITION_PATTERN.sub(" ", text)
+        prediction = predict_tool_call(conditionless, latitude, longitude)
+        phrase = TIME_PHRASE.search(text)
+        if prediction is not None and phrase:
+            return [ScriptedCall(prediction.tool, {**prediction.kwargs, "target_time": phrase.group().strip()})]
+    return []
+
+
+def _transcript(content: bytes) -> str:
+    """업로드 내용이 UTF-8 텍스트면 그 문장을, 아니면 설정된 문장을 인식 결과로 사용 (벤치마크에서 발화 지정용)"""
+    try:
+        text = content.decode("utf-8").strip()
+    except UnicodeDecodeError:
+        text = ""
+    return text if text and text.isprintable() else offline_config()["TRANSCRIPT"]
+
+
+def fake_transcribe(content: bytes):
+    """transcribe_speech의 오프라인 버전 (Speech API 호출 없이 지연만 흉내냄)"""
+    time.sleep(offline_config()["STT_LATENCY"])
+    return _transcript(content) if content else None
+
+
+async def afake_transcribe(content: bytes):
+    await asyncio.sleep(offline_config()["STT_LATENCY"])
+    return _transcript(content) if content else None
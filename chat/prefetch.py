@@ -0,0 +1,153 @@
+import asyncio
+import logging
+import re
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, NamedTuple, Optional
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from .intents import CONDITION_PATTERN, DEPARTMENT_ALIASES, normalize_department
+from .refine import current_session
+
+logger = logging.getLogger(__name__)
+
+_DEPARTMENTS = "|".join(sorted(DEPARTMENT_ALIASES, key=len, reverse=True))
+DEPARTMENT_PATTERN = re.compile(_DEPARTMENTS)
+HOSPITAL_PATTERN = re.compile(r"병원|의원")
+# 이전 결과를 좁히는 요청은 refine_previous_results가 처리
+REFINE_PATTERN = re.compile(r"(?:으로|로|만)\s*(?:다시\s*)?(?:알려|찾아|보여)|곳만|이내")
+
+
+class Prediction(NamedTuple):
+    """에이전트가 호출할 것으로 예상되는 검색 도구와 인자"""
+    tool: str
+    kwargs: Dict
+
+
+def predict_tool_call(message: str, latitude: float, longitude: float) -> Optional[Prediction]:
+    """메시지가 시설(진료과목/병원/약국)을 분명히 언급하면 예상 도구 호출 반환"""
+    text = (message or "").strip()
+    # 시간/정렬 조건이 있으면 LLM이 target_time/sort_by를 붙여 호출하므로 예측하지 않음
+    if not text or CONDITION_PATTERN.search(text) or REFINE_PATTERN.search(text):
+        return None
+
+    location = {"latitude": latitude, "longitude": longitude}
+    department = DEPARTMENT_PATTERN.search(text)
+    mentions_hospital = department or HOSPITAL_PATTERN.search(text)
+    if "약국" in text and not mentions_hospital:
+        return Prediction("search_pharmacy", location)
+    if "약국" in text:
+        return None  # 두 도구를 모두 부를 수 있는 요청
+    if department:
+        return Prediction("search_hospital", {"query": normalize_department(department.group()), **location})
+    if mentions_hospital:
+        return Prediction("search_hospital", {"query": "", **location})
+    return None
+
+
+def _enabled():
+    return getattr(settings, "CHAT_TOOL_PREFETCH", True)
+
+
+class PrefetchStats:
+    def __init__(self):
+        self._stats = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, outcome):
+        with self._lock:
+            self._stats[outcome] += 1
+
+    def snapshot(self):
+        with self._lock:
+            stats = dict(self._stats)
+        started = stats.get("used", 0) + stats.get("unused", 0)
+        stats["hit_rate"] = round(stats.get("used", 0) / started, 4) if started else 0.0
+        return stats
+
+
+prefetch_stats = PrefetchStats()
+
+
+class Prefetch:
+    """첫 LLM 호출과 동시에 실행한 검색
+
+    결과는 검색 캐시(single-flight)에 들어가므로, 에이전트가 같은 인자로 도구를 호출하면
+    DB를 다시 조회하지 않고 이 결과를 받는다. 호출되지 않으면 finish()에서 버린다.
+    """
+
+    def __init__(self, prediction: Prediction, future):
+        self.prediction = prediction
+        self.future = future
+
+    def matches(self, intermediate_steps) -> bool:
+        for action, _ in intermediate_steps or []:
+            if getattr(action, "tool", None) != self.prediction.tool:
+                continue
+            args = dict(getattr(action, "tool_input", None) or {})
+            if "query" in args:
+                args["query"] = normalize_department(args["query"])
+            expected = {k: v for k, v in self.prediction.kwargs.items() if k not in ("latitude", "longitude")}
+            if all(args.get(k) == v for k, v in expected.items()) and not args.get("target_time") \
+                    and not args.get("sort_by"):
+                return True
+        return False
+
+    def finish(self, intermediate_steps):
+        """에이전트 실행 후 호출 - 사용 여부 기록, 아직 시작 전이면 취소"""
+        used = self.matches(intermediate_steps)
+        if not used:
+            self.future.cancel()
+        prefetch_stats.record("used" if used else "unused")
+        logger.info(f"Chat prefetch: tool={self.prediction.tool} args={self.prediction.kwargs} used={used}")
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="chat-prefetch")
+    return _executor
+
+
+def _run(tool_function, kwargs):
+    close_old_connections()
+    try:
+        return tool_function(**kwargs)
+    finally:
+        close_old_connections()
+
+
+def start_prefetch(message, latitude, longitude, tool_functions) -> Optional[Prefetch]:
+    """예상 검색을 백그라운드 스레드에서 시작 (스레드에는 세션이 없으므로 세션 상태는 바뀌지 않음)"""
+    if not _enabled():
+        return None
+    prediction = predict_tool_call(message, latitude, longitude)
+    if prediction is None:
+        return None
+    future = _get_executor().submit(_run, tool_functions[prediction.tool], prediction.kwargs)
+    return Prefetch(prediction, future)
+
+
+async def astart_prefetch(message, latitude, longitude, async_tool_functions) -> Optional[Prefetch]:
+    """start_prefetch의 비동기 버전 (이벤트 루프의 태스크로 실행)"""
+    if not _enabled():
+        return None
+    prediction = predict_tool_call(message, latitude, longitude)
+    if prediction is None:
+        return None
+
+    async def run():
+        # 태스크는 현재 컨텍스트를 복사하므로 세션을 비워 이전 결과가 덮어써지지 않게 함
+        current_session.set(None)
+        return await async_tool_functions[prediction.tool](**prediction.kwargs)
+
+    return Prefetch(prediction, asyncio.ensure_future(run()))
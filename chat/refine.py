@@ -0,0 +1,140 @@
+import contextvars
+import logging
+from typing import Dict
+
+from asgiref.sync import sync_to_async
+
+from .intents import match_intent, normalize_department
+from .metrics import timed
+
+logger = logging.getLogger(__name__)
+
+# 현재 요청의 세션 기록 (검색 도구가 결과를 세션에 남길 때 사용)
+current_session = contextvars.ContextVar("chat_current_session", default=None)
+
+# 세션에 남길 이전 검색 후보 수
+MAX_CANDIDATES = 30
+
+OPEN_STATES = {
+    "hospital": ("영업중", "점심시간"),
+    "pharmacy": ("영업중",),
+}
+# 세션에 남길 후보 속성 → 검색 결과 행의 키 (전체 행은 필요할 때 id로 다시 만듦)
+ROW_KEYS = {
+    "hospital": {"name": "name", "type": "hospital_type", "state": "state", "phone": "phone"},
+    "pharmacy": {"name": "약국명", "state": "영업 상태", "phone": "전화"},
+}
+LIST_TYPES = {"hospital": "hospital_list", "pharmacy": "pharmacy_list"}
+NAMES = {"hospital": "병원", "pharmacy": "약국"}
+
+
+def compact_candidate(dataset, row_id, distance_km, row):
+    """검색 결과 행 → 세션에 남길 후보 요약 (id, 이름, 진료과목, 거리, 영업 상태, 오늘 여닫는 시각, 전화)"""
+    candidate = {"id": row_id, "distance_km": round(distance_km, 3)}
+    candidate.update({key: row.get(row_key) for key, row_key in ROW_KEYS[dataset].items()})
+    candidate["opening_time"] = row.get("opening_time")
+    candidate["closing_time"] = row.get("closing_time")
+    return candidate
+
+
+def remember_results(dataset, candidates, **params):
+    """검색 후보(가까운 순, 최대 MAX_CANDIDATES개)를 현재 세션 상태에 저장
+
+    세션 저장은 이번 턴의 대화 기록이 추가될 때 함께 반영된다.
+    """
+    history = current_session.get()
+    if history is None:
+        return
+    history.state["last_results"] = {
+        "dataset": dataset,
+        "params": params,
+        "items": sorted(candidates, key=lambda c: c["distance_km"])[:MAX_CANDIDATES],
+    }
+
+
+def has_previous_results(history) -> bool:
+    return bool(history is not None and history.state.get("last_results", {}).get("items"))
+
+
+def match_session_intent(message, history):
+    """match_intent + 이전 결과가 없는 세션의 필터 요청은 에이전트로 넘김 (None)"""
+    intent = match_intent(message)
+    if intent is not None and intent.tool == "refine_previous_results" and not has_previous_results(history):
+        return None
+    return intent
+
+
+async def arefine_previous_results(**kwargs) -> Dict:
+    # 응답할 몇 곳의 전체 행만 DB에서 다시 읽음 (current_session은 sync_to_async가 그대로 넘김)
+    return await sync_to_async(refine_previous_results)(**kwargs)
+
+
+@timed("tool.refine_previous_results")
+def refine_previous_results(department: str = None, open_only: bool = False, max_distance_km: float = None,
+                            sort_by: str = None) -> Dict:
+    """
+    이전 검색 결과 필터링 도구 (새로 검색하지 않고 직전에 찾은 병원/약국 목록에서 다시 고름)
+    사용자가 "내과로 알려줘", "지금 연 곳만", "1km 이내로", "가장 늦게 닫는 순으로" 처럼
+    직전 검색 결과를 좁히거나 다시 정렬해달라고 할 때 사용하세요.
+    Args:
+        department: 진료과목 (예: "내과", "소아과") - 병원 결과에만 적용
+        open_only: True면 영업 중인 곳만
+        max_distance_km: 최대 거리(km)
+        sort_by: 정렬 기준 ("distance" - 가까운 순, "earliest_open" - 가장 빨리 여는 순, "latest_close" - 가장 늦게 닫는 순)
+    """
+    from .views import load_result_rows
+
+    history = current_session.get()
+    if not has_previous_results(history):
+        return {
+            "type": "no_results",
+            "start_message": "이전에 검색한 결과가 없습니다.",
+            "end_message": "먼저 근처 병원이나 약국을 검색해주세요.",
+            "data": []
+        }
+
+    last_results = history.state["last_results"]
+    dataset = last_results["dataset"]
+    items = list(last_results["items"])
+    conditions = []
+
+    if department and dataset == "hospital":
+        hospital_type = normalize_department(department)
+        items = [c for c in items if hospital_type in (c.get("type") or "")]
+        conditions.append(hospital_type)
+    if open_only:
+        items = [c for c in items if c.get("state") in OPEN_STATES[dataset]]
+        conditions.append("영업 중인")
+    if max_distance_km is not None:
+        items = [c for c in items if c["distance_km"] <= max_distance_km]
+        conditions.append(f"{max_distance_km:g}km 이내")
+
+    if sort_by == "earliest_open":
+        items.sort(key=lambda c: c.get("opening_time") or 9999)
+        conditions.append("가장 빨리 여는 순")
+    elif sort_by == "latest_close":
+        items.sort(key=lambda c: c.get("closing_time") or 0, reverse=True)
+        conditions.append("가장 늦게 닫는 순")
+    elif sort_by == "distance":
+        items.sort(key=lambda c: c["distance_km"])
+        conditions.append("가까운 순")
+
+    name = NAMES[dataset]
+    condition_str = " ".join(conditions)
+    logger.info(f"Refined previous results: dataset={dataset} conditions={conditions} count={len(items)}")
+
+    rows = load_result_rows(dataset, items[:5], last_results["params"].get("target_time")) if items else []
+    if not rows:
+        return {
+            "type": "no_results",
+            "start_message": f"죄송합니다. 이전에 찾은 {name} 중 {condition_str} 곳이 없습니다.",
+            "end_message": "조건을 바꾸거나 새로 검색해보세요.",
+            "data": []
+        }
+
+    return {
+        "type": LIST_TYPES[dataset],
+        "start_message": f"이전에 찾은 {name} 중 {condition_str} {name}들입니다:",
+        "end_message": "방문 전 전화로 확인하시는 것이 좋습니다.",
+        "data": rows
+    }
@@ -0,0 +1,123 @@
+import logging
+import re
+import threading
+from collections import defaultdict
+from typing import NamedTuple
+
+from django.conf import settings
+
+from .intents import DEPARTMENT_ALIASES
+
+logger = logging.getLogger(__name__)
+
+# 모델 라우팅 기본 설정 (settings.CHAT_MODEL_ROUTING 으로 덮어쓸 수 있음)
+DEFAULT_MODEL_ROUTING = {
+    "ENABLED": True,
+    "SIMPLE_MODEL": "gpt-4o-mini",  # 인사/단일 도구 조회
+    "COMPLEX_MODEL": "gpt-4o",      # 여러 단계/모호한 요청
+    "CLASSIFIER_MODEL": None,       # 규칙으로 판단되지 않는 턴을 분류할 작은 모델 (None이면 COMPLEX로 보냄)
+    "SIMPLE_MAX_CHARS": 40,
+}
+
+CLASSIFIER_PROMPT = """다음 사용자 메시지가 병원/약국 검색 도구를 한 번만 호출하거나 인사/감사 정도로 답할 수 있으면 simple,
+여러 번의 검색, 비교, 증상 판단 등 추론이 필요하면 complex 로만 답하세요.
+
+메시지: {message}"""
+
+GREETING = re.compile(r"^(?:안녕|하이|hi|hello|반가워|고마워|감사|땡큐|thank|ㅎㅇ|잘\s*있어|수고)", re.IGNORECASE)
+# 여러 단계/추론이 필요한 표현
+COMPLEX_MARKERS = re.compile(
+    r"그리고|그 다음|다음에|비교|차이|어느\s*(?:게|쪽)|왜|어떻게|괜찮을까|해야\s*(?:해|할까|돼)|"
+    r"증상|아파|아프|열이|기침|콧물|설사|토했|두드러기|다쳤|부었|먹어도|복용|처방"
+)
+_DEPARTMENTS = "|".join(sorted(DEPARTMENT_ALIASES, key=len, reverse=True))
+HOSPITAL_KEYWORDS = re.compile(rf"병원|의원|{_DEPARTMENTS}")
+LOOKUP_KEYWORDS = re.compile(
+    rf"약국|병원|의원|{_DEPARTMENTS}|영업|문\s*연|여는|닫는|가까운|근처|주변|오전|오후|내일|주말|토요일|일요일|km"
+)
+
+
+class Route(NamedTuple):
+    name: str    # "simple" | "complex"
+    model: str
+    reason: str
+
+
+def _config():
+    return {**DEFAULT_MODEL_ROUTING, **getattr(settings, "CHAT_MODEL_ROUTING", {})}
+
+
+def classify(message: str, config=None) -> Route:
+    """턴의 복잡도를 로컬 규칙(+선택적으로 작은 모델)으로 판단해 사용할 모델 결정"""
+    config = config or _config()
+    simple = Route("simple", config["SIMPLE_MODEL"], "")
+    complex_ = Route("complex", config["COMPLEX_MODEL"], "")
+    if not config["ENABLED"]:
+        return complex_._replace(reason="disabled")
+
+    text = (message or "").strip()
+    if COMPLEX_MARKERS.search(text):
+        return complex_._replace(reason="multi_step_or_medical")
+    if "약국" in text and HOSPITAL_KEYWORDS.search(text):
+        return complex_._replace(reason="multiple_tools")
+    if GREETING.match(text) and len(text) <= config["SIMPLE_MAX_CHARS"]:
+        return simple._replace(reason="greeting")
+    if LOOKUP_KEYWORDS.search(text) and len(text) <= config["SIMPLE_MAX_CHARS"]:
+        return simple._replace(reason="single_lookup")
+
+    if config["CLASSIFIER_MODEL"]:
+        label = _classify_with_model(text, config["CLASSIFIER_MODEL"])
+        if label == "simple":
+            return simple._replace(reason="classifier")
+        if label == "complex":
+            return complex_._replace(reason="classifier")
+    return complex_._replace(reason="ambiguous")
+
+
+def _classify_with_model(text, model):
+    try:
+        from .agent import make_chat_model
+
+        result = make_chat_model(model, temperature=0, max_tokens=3).invoke(CLASSIFIER_PROMPT.format(message=text))
+        label = result.content.strip().lower()
+        return label if label in ("simple", "complex") else None
+    except Exception as e:
+        logger.error(f"Route classifier error: {str(e)}")
+        return None
+
+
+class RouteStats:
+    """경로별 호출 수, 지연시간, 토큰 사용량 누적"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = defaultdict(lambda: {"turns": 0, "latency": 0.0, "prompt_tokens": 0,
+                                           "completion_tokens": 0, "cost": 0.0})
+
+    def record(self, route: Route, latency: float, usage):
+        with self._lock:
+            stats = self._stats[(route.name, route.model)]
+            stats["turns"] += 1
+            stats["latency"] += latency
+            stats["prompt_tokens"] += usage.prompt_tokens
+            stats["completion_tokens"] += usage.completion_tokens
+            stats["cost"] += usage.total_cost
+        logger.info(
+            f"Chat route: route={route.name} model={route.model} reason={route.reason} "
+            f"latency={latency:.2f}s prompt={usage.prompt_tokens} completion={usage.completion_tokens} "
+            f"cost=${usage.total_cost:.5f}"
+        )
+
+    def snapshot(self):
+        with self._lock:
+            result = {}
+            for (name, model), stats in self._stats.items():
+                turns = stats["turns"]
+                result[f"{name}:{model}"] = {
+                    **stats,
+                    "avg_latency": round(stats["latency"] / turns, 3) if turns else 0.0,
+                }
+            return result
+
+
+route_stats = RouteStats()
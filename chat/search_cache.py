@@ -0,0 +1,209 @@
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+# 검색 결과 캐시 기본 설정 (settings.CHAT_SEARCH_CACHE 로 덮어쓸 수 있음)
+DEFAULT_SEARCH_CACHE = {
+    "LOCAL_CACHE": "default",   # 프로세스 내 캐시 alias (LocMemCache)
+    "SHARED_CACHE": None,       # 워커 간 공유 캐시 alias (None이면 사용 안 함)
+    "TTL": 300,                 # 결과 보관 시간(초)
+    "CELL_METERS": 100,         # 좌표 격자 크기(m)
+    "VERSION_CHECK_INTERVAL": 30,  # 데이터셋 버전 재확인 주기(초)
+}
+
+METERS_PER_DEGREE = 111320
+
+
+def _version_key(dataset):
+    return f"chat:dataset_version:{dataset}"
+
+
+class SearchResultCache:
+    """
+    병원/약국 검색 후보 캐시
+    키: (좌표 격자 ~100m, 검색 조건, 데이터셋 버전)
+    격자 중심에서 (반경 + margin_km) 안의 후보를 저장하고, 거리/반경 필터와 영업 상태는 요청마다 실제 좌표와 시각으로 계산
+    - 1단계: 프로세스 내 캐시
+    - 2단계: (선택) 워커 간 공유 캐시
+    데이터 수집 명령이 bump_dataset_version()으로 버전을 올리면 이전 결과는 더 이상 조회되지 않음
+    """
+
+    def __init__(self, local_cache="default", shared_cache=None, ttl=300, cell_meters=100,
+                 version_check_interval=30):
+        self.local = caches[local_cache]
+        self.shared = caches[shared_cache] if shared_cache else None
+        self.ttl = ttl
+        self.cell_meters = cell_meters
+        self.cell_degrees = cell_meters / METERS_PER_DEGREE
+        self.version_check_interval = version_check_interval
+        self._versions = {}  # dataset -> (version, checked_at)
+        self._inflight = {}  # key -> Future (계산 중인 결과, 같은 키의 동시 계산은 한 번만)
+        self._lock = threading.Lock()
+        self._stats = Counter()
+
+    def snap(self, latitude, longitude):
+        """좌표를 격자 중심으로 이동 (같은 격자의 요청은 같은 결과를 공유)"""
+        lat_index = math.floor(latitude / self.cell_degrees)
+        lat_center = (lat_index + 0.5) * self.cell_degrees
+        lon_degrees = self.cell_degrees / max(math.cos(math.radians(lat_center)), 0.01)
+        lon_index = math.floor(longitude / lon_degrees)
+        return lat_center, (lon_index + 0.5) * lon_degrees
+
+    @property
+    def margin_km(self):
+        """격자 안 좌표와 격자 중심 사이 거리의 상한 (격자 대각선의 절반)"""
+        return self.cell_meters * math.sqrt(2) / 2 / 1000
+
+    def make_key(self, dataset, latitude, longitude, **params):
+        lat, lon = self.snap(latitude, longitude)
+        digest = hashlib.md5(json.dumps(params, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+        version = self.dataset_version(dataset)
+        return f"chat:search:{dataset}:v{version}:{lat:.5f}:{lon:.5f}:{digest}"
+
+    def get(self, key):
+        value = self.local.get(key)
+        if value is not None:
+            self._stats["local_hits"] += 1
+            return value
+        if self.shared is not None:
+            try:
+                value = self.shared.get(key)
+            except Exception as e:
+                logger.error(f"Search cache shared get error: {str(e)}")
+                value = None
+            if value is not None:
+                self._stats["shared_hits"] += 1
+                self.local.set(key, value, self.ttl)
+                return value
+        self._stats["misses"] += 1
+        return None
+
+    def set(self, key, value):
+        self.local.set(key, value, self.ttl)
+        if self.shared is not None:
+            try:
+                self.shared.set(key, value, self.ttl)
+            except Exception as e:
+                logger.error(f"Search cache shared set error: {str(e)}")
+
+    aget = sync_to_async(get)
+    aset = sync_to_async(set)
+    amake_key = sync_to_async(make_key)
+
+    def _claim(self, key):
+        """(future, owner) - owner가 아니면 다른 곳에서 같은 키를 계산 중"""
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self._stats["inflight_joins"] += 1
+                return future, False
+            future = self._inflight[key] = Future()
+            return future, True
+
+    def _release(self, key, future, value=None, error=None):
+        with self._lock:
+            self._inflight.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(value)
+
+    def get_or_compute(self, key, compute):
+        """캐시 조회, 없으면 compute() 결과를 저장해 반환 (계산 중인 같은 키는 그 결과를 기다림)"""
+        value = self.get(key)
+        if value is not None:
+            return value
+        future, owner = self._claim(key)
+        if not owner:
+            return future.result()
+        try:
+            value = compute()
+            self.set(key, value)
+        except BaseException as e:  # 취소 포함 - 기다리는 쪽이 멈추지 않도록 항상 해제
+            self._release(key, future, error=e)
+            raise
+        self._release(key, future, value)
+        return value
+
+    async def aget_or_compute(self, key, acompute):
+        """get_or_compute의 비동기 버전 (acompute는 코루틴 함수)"""
+        value = await self.aget(key)
+        if value is not None:
+            return value
+        future, owner = self._claim(key)
+        if not owner:
+            return await asyncio.wrap_future(future)
+        try:
+            value = await acompute()
+            await self.aset(key, value)
+        except BaseException as e:  # 취소 포함 - 기다리는 쪽이 멈추지 않도록 항상 해제
+            self._release(key, future, error=e)
+            raise
+        self._release(key, future, value)
+        return value
+
+    def dataset_version(self, dataset):
+        """데이터셋 버전 (공유 캐시 조회는 version_check_interval마다 한 번)"""
+        now = time.monotonic()
+        with self._lock:
+            cached = self._versions.get(dataset)
+            if cached and now - cached[1] < self.version_check_interval:
+                return cached[0]
+        version = (self.shared or self.local).get(_version_key(dataset), 0)
+        with self._lock:
+            self._versions[dataset] = (version, now)
+        return version
+
+    def stats(self):
+        stats = dict(self._stats)
+        lookups = sum(stats.get(k, 0) for k in ("local_hits", "shared_hits", "misses"))
+        hits = stats.get("local_hits", 0) + stats.get("shared_hits", 0)
+        stats["hit_rate"] = round(hits / lookups, 4) if lookups else 0.0
+        return stats
+
+
+def _config():
+    return {**DEFAULT_SEARCH_CACHE, **getattr(settings, "CHAT_SEARCH_CACHE", {})}
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_search_cache() -> SearchResultCache:
+    """settings.CHAT_SEARCH_CACHE 설정으로 프로세스 전역 캐시 생성"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                config = _config()
+                _cache = SearchResultCache(
+                    local_cache=config["LOCAL_CACHE"],
+                    shared_cache=config["SHARED_CACHE"],
+                    ttl=config["TTL"],
+                    cell_meters=config["CELL_METERS"],
+                    version_check_interval=config["VERSION_CHECK_INTERVAL"],
+                )
+    return _cache
+
+
+def bump_dataset_version(dataset):
+    """데이터 수집 후 호출 - 해당 데이터셋의 캐시된 검색 결과를 무효화"""
+    config = _config()
+    cache = caches[config["SHARED_CACHE"] or config["LOCAL_CACHE"]]
+    version = time.time_ns()
+    cache.set(_version_key(dataset), version, None)
+    logger.info(f"Search dataset version bumped: {dataset} -> {version}")
+    return version
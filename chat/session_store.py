@@ -0,0 +1,261 @@
+import logging
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import List, Optional, Sequence
+
+from django.conf import settings
+from django.core.cache import caches
+from langchain_core.chat_history import BaseChatMessageHistory
+from langchain_core.messages import BaseMessage, messages_from_dict, messages_to_dict
+
+logger = logging.getLogger(__name__)
+
+# 세션 저장소 기본 설정 (settings.CHAT_SESSION_STORE 로 덮어쓸 수 있음)
+DEFAULT_SESSION_STORE = {
+    "MAX_ENTRIES": 1000,   # 프로세스 내 캐시에 유지할 최대 세션 수 (LRU)
+    "IDLE_TTL": 1800,      # 마지막 사용 후 프로세스 내 캐시에서 제거되기까지의 시간(초)
+    "MAX_TURNS": 10,       # 세션별로 보관할 최근 대화 턴 수 (질문+응답 = 1턴)
+    "SHARED_CACHE": None,  # 워커 간 공유 저장소로 사용할 Django 캐시 alias (None이면 사용 안 함)
+    "SHARED_TTL": 60 * 60 * 24,  # 공유 저장소 보관 기간(초)
+    "REVALIDATE_INTERVAL": 5,    # 프로세스 내 캐시 항목의 공유 버전을 다시 확인하기까지의 시간(초)
+}
+
+
+class BoundedChatMessageHistory(BaseChatMessageHistory):
+    """최근 N개의 메시지만 보관하는 채팅 기록"""
+
+    def __init__(self, session_id: str, max_messages: int, messages: Optional[List[BaseMessage]] = None,
+                 state: Optional[dict] = None, version: int = 0, on_change=None):
+        self.session_id = session_id
+        self.max_messages = max_messages
+        self.messages: List[BaseMessage] = list(messages or [])[-max_messages:]
+        self.state = dict(state or {})  # 세션 부가 정보 (요약, 이전 검색 결과 등)
+        self.version = version
+        self._on_change = on_change
+        self._unsaved: List[BaseMessage] = []  # 마지막 저장 이후 추가된 메시지
+        self._saved_state: Optional[dict] = dict(self.state)  # 마지막 저장 시점의 상태 (None이면 전체를 덮어씀)
+
+    def add_messages(self, messages: Sequence[BaseMessage]) -> None:
+        self.messages.extend(messages)
+        self._unsaved.extend(messages)
+        if len(self.messages) > self.max_messages:
+            del self.messages[:-self.max_messages]
+        self.save()
+
+    def clear(self) -> None:
+        self.messages = []
+        self.state = {}
+        self._unsaved = []
+        self._saved_state = None
+        self.save()
+
+    def save(self) -> None:
+        """변경 내용을 저장소에 반영"""
+        if self._on_change:
+            self._on_change(self)
+
+    def mark_saved(self, version: int) -> None:
+        self.version = version
+        self._unsaved = []
+        self._saved_state = dict(self.state)
+
+    def rebase(self, latest: "BoundedChatMessageHistory") -> None:
+        """다른 워커가 먼저 저장한 기록(latest) 위에 이번에 바뀐 내용(추가된 메시지, 값이 바뀐 상태)을 다시 적용"""
+        if self._saved_state is None:  # clear()는 그대로 덮어씀
+            return
+        changed = {k: v for k, v in self.state.items() if self._saved_state.get(k) is not v}
+        self.messages = (latest.messages + self._unsaved)[-self.max_messages:]
+        self.state = {**latest.state, **changed}
+
+    def to_dict(self) -> dict:
+        return {
+            "messages": messages_to_dict(self.messages),
+            "state": self.state,
+            "version": self.version,
+        }
+
+
+class ChatSessionStore:
+    """
+    채팅 세션 저장소
+    - 1단계: 프로세스 내 LRU + 유휴 TTL 캐시
+    - 2단계: (선택) Django 캐시 기반 공유 저장소 (파일/DB/Redis 등, 워커 간 세션 공유)
+
+    프로세스 내 캐시 항목은 revalidate_interval 초마다만 공유 버전 키와 비교하고,
+    그 사이의 다른 워커 변경은 저장할 때 버전 충돌로 감지해 합친다.
+    """
+
+    def __init__(self, max_entries=1000, idle_ttl=1800, max_turns=10, shared_cache=None, shared_ttl=None,
+                 revalidate_interval=5):
+        self.max_entries = max_entries
+        self.idle_ttl = idle_ttl
+        self.max_messages = max_turns * 2
+        self.shared = caches[shared_cache] if shared_cache else None
+        self.shared_ttl = shared_ttl
+        self.revalidate_interval = revalidate_interval
+        self._local = OrderedDict()  # session_id -> (history, last_access, last_validated)
+        self._lock = threading.RLock()
+        self._stats = Counter()
+
+    @staticmethod
+    def _key(session_id):
+        return f"chat:session:{session_id}"
+
+    @staticmethod
+    def _version_key(session_id):
+        return f"chat:session:{session_id}:v"
+
+    def get(self, session_id: str) -> BoundedChatMessageHistory:
+        """세션 기록 조회 (없으면 생성)"""
+        now = time.monotonic()
+        with self._lock:
+            self._evict_expired(now)
+            entry = self._local.get(session_id)
+            if entry is not None:
+                history, _, validated = entry
+                if self.shared is not None and now - validated >= self.revalidate_interval:
+                    # 다른 워커가 갱신한 경우 공유 저장소에서 다시 읽음
+                    if self.shared.get(self._version_key(session_id), 0) != history.version:
+                        self._stats["stale"] += 1
+                        entry = None
+                    validated = now
+                if entry is not None:
+                    self._local.move_to_end(session_id)
+                    self._local[session_id] = (history, now, validated)
+                    self._stats["hits"] += 1
+                    return history
+
+            history = self._load_shared(session_id)
+            if history is not None:
+                self._stats["shared_hits"] += 1
+            else:
+                self._stats["misses"] += 1
+                history = self._new_history(session_id)
+
+            self._local[session_id] = (history, now, now)
+            self._local.move_to_end(session_id)
+            while len(self._local) > self.max_entries:
+                evicted_id, _ = self._local.popitem(last=False)
+                self._stats["evictions_lru"] += 1
+                logger.debug(f"Chat session evicted (LRU): {evicted_id}")
+            return history
+
+    def save(self, history: BoundedChatMessageHistory) -> None:
+        """세션 기록을 공유 저장소에 반영 (write-through)
+
+        버전 키를 add/incr로 올려 새 버전 번호를 받고, 번호가 건너뛰었으면(그 사이 다른 워커가 저장)
+        공유 저장소의 최신 기록 위에 이번 변경을 다시 적용한 뒤 저장한다.
+        """
+        if self.shared is None:
+            history.mark_saved(history.version + 1)
+            return
+        session_id = history.session_id
+        try:
+            version = self._next_version(session_id, history.version)
+            if version != history.version + 1:
+                self._stats["conflicts"] += 1
+                logger.warning(
+                    f"Chat session version conflict: session={session_id} "
+                    f"local={history.version} claimed={version}"
+                )
+                latest = self._load_shared(session_id)
+                if latest is not None:
+                    history.rebase(latest)
+            history.version = version
+            self.shared.set(self._key(session_id), history.to_dict(), self.shared_ttl)
+            history.mark_saved(version)
+        except Exception as e:
+            logger.error(f"Chat session save error: {str(e)}")
+            return
+        with self._lock:
+            entry = self._local.get(session_id)
+            if entry is not None and entry[0] is history:
+                self._local[session_id] = (history, entry[1], time.monotonic())
+
+    def _next_version(self, session_id, current):
+        """공유 버전 키를 1 올린 값 (Redis/Memcached 등에서는 add/incr가 원자적이라 워커마다 다른 번호를 받음)"""
+        key = self._version_key(session_id)
+        if self.shared.add(key, current + 1, self.shared_ttl):
+            return current + 1
+        try:
+            version = self.shared.incr(key)
+        except ValueError:  # add 직후 만료/삭제된 경우
+            self.shared.set(key, current + 1, self.shared_ttl)
+            return current + 1
+        self.shared.touch(key, self.shared_ttl)
+        return version
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._local.pop(session_id, None)
+        if self.shared is not None:
+            self.shared.delete_many([self._key(session_id), self._version_key(session_id)])
+
+    def stats(self) -> dict:
+        """히트율 및 제거 횟수 통계"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._local)
+        lookups = sum(stats.get(k, 0) for k in ("hits", "shared_hits", "misses", "stale"))
+        stats["hit_rate"] = round(stats.get("hits", 0) / lookups, 4) if lookups else 0.0
+        return stats
+
+    def _new_history(self, session_id, messages=None, state=None, version=0):
+        return BoundedChatMessageHistory(
+            session_id,
+            self.max_messages,
+            messages=messages,
+            state=state,
+            version=version,
+            on_change=self.save,
+        )
+
+    def _load_shared(self, session_id):
+        if self.shared is None:
+            return None
+        try:
+            payload = self.shared.get(self._key(session_id))
+        except Exception as e:
+            logger.error(f"Chat session load error: {str(e)}")
+            return None
+        if not payload:
+            return None
+        return self._new_history(
+            session_id,
+            messages=messages_from_dict(payload.get("messages", [])),
+            state=payload.get("state"),
+            version=payload.get("version", 0),
+        )
+
+    def _evict_expired(self, now):
+        """유휴 TTL이 지난 세션 제거 (가장 오래된 항목부터 검사)"""
+        while self._local:
+            session_id, (_, last_access, _) = next(iter(self._local.items()))
+            if now - last_access < self.idle_ttl:
+                break
+            self._local.popitem(last=False)
+            self._stats["evictions_ttl"] += 1
+            logger.debug(f"Chat session evicted (TTL): {session_id}")
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_session_store() -> ChatSessionStore:
+    """settings.CHAT_SESSION_STORE 설정으로 프로세스 전역 저장소 생성"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                config = {**DEFAULT_SESSION_STORE, **getattr(settings, "CHAT_SESSION_STORE", {})}
+                _store = ChatSessionStore(
+                    max_entries=config["MAX_ENTRIES"],
+                    idle_ttl=config["IDLE_TTL"],
+                    max_turns=config["MAX_TURNS"],
+                    shared_cache=config["SHARED_CACHE"],
+                    shared_ttl=config["SHARED_TTL"],
+                    revalidate_interval=config["REVALIDATE_INTERVAL"],
+                )
+    return _store
@@ -0,0 +1,325 @@
+import asyncio
+import logging
+import shutil
+import struct
+import subprocess
+import threading
+import weakref
+from typing import NamedTuple, Optional
+
+from .metrics import span, timed
+from .offline import afake_transcribe, fake_transcribe, offline_enabled
+
+logger = logging.getLogger(__name__)
+
+# google.cloud.speech(grpc/protobuf)는 import 비용이 커서 실제로 음성을 변환할 때 불러온다.
+
+LANGUAGE_CODE = "ko-KR"
+SAMPLE_RATE_HERTZ = 16000
+BYTES_PER_SECOND = SAMPLE_RATE_HERTZ * 2  # LINEAR16 mono
+WAV_HEADER_BYTES = 44
+# OGG_OPUS에 허용되는 샘플레이트
+OPUS_SAMPLE_RATES = (8000, 12000, 16000, 24000, 48000)
+# 길이 정보를 헤더에서 바로 얻을 수 없는 WebM은 낮은 비트레이트(16kbps)로 가정해 길게 추정
+WEBM_ESTIMATED_BYTES_PER_SECOND = 2000
+# 파이프로 만든 FLAC은 전체 샘플 수가 비어 있으므로 압축률 25%로 가정해 길게 추정
+FLAC_ESTIMATED_BYTES_PER_SECOND = BYTES_PER_SECOND // 4
+
+# Speech API가 직접 받지 못해 변환이 필요한 형식 (MP3, AAC/M4A, AMR)
+TRANSCODE_SIGNATURES = (b"ID3", b"\xff\xfb", b"\xff\xf3", b"\xff\xf2", b"\xff\xf1", b"\xff\xf9", b"#!AMR")
+TRANSCODE_CHUNK_BYTES = 64 * 1024
+TRANSCODE_TIMEOUT = 60
+
+# recognize()는 1분 이하 음성만 처리 가능 → 더 길면 스트리밍 인식 사용
+SYNC_RECOGNIZE_MAX_SECONDS = 60
+# 스트리밍 인식 요청당 최대 오디오 크기 (API 제한 25,600 bytes)
+STREAMING_CHUNK_BYTES = 25600
+# 스트리밍 인식 가능 최대 길이 (API 제한 약 5분), 더 길면 long_running_recognize 사용
+STREAMING_MAX_SECONDS = 290
+LONG_RUNNING_TIMEOUT = 300
+
+_client = None
+_client_lock = threading.Lock()
+_async_clients = weakref.WeakKeyDictionary()  # event loop -> SpeechAsyncClient (grpc.aio 채널은 이벤트 루프에 묶임)
+
+
+def get_speech_client():
+    """프로세스 전역 Speech 클라이언트 (gRPC 채널/인증을 요청마다 새로 만들지 않음)"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from google.cloud import speech
+
+                _client = speech.SpeechClient()
+                logger.info("Speech client created")
+    return _client
+
+
+def get_async_speech_client():
+    """현재 이벤트 루프용 Speech 비동기 클라이언트"""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        from google.cloud import speech
+
+        client = speech.SpeechAsyncClient()
+        _async_clients[loop] = client
+        logger.info("Speech async client created")
+    return client
+
+
+def read_upload(uploaded_file) -> bytes:
+    """request.FILES의 업로드 파일을 디스크를 거치지 않고 bytes로 읽음"""
+    return b"".join(uploaded_file.chunks())
+
+
+class AudioInfo(NamedTuple):
+    """업로드 음성의 형식 (헤더로 판별)"""
+    codec: str
+    encoding: str  # RecognitionConfig.AudioEncoding 이름
+    sample_rate_hertz: Optional[int]
+    duration: float
+
+
+def _wav_info(content):
+    # RIFF 청크를 따라가며 fmt/data 청크를 찾음
+    sample_rate, byte_rate, data_size = SAMPLE_RATE_HERTZ, BYTES_PER_SECOND, len(content) - WAV_HEADER_BYTES
+    offset = 12
+    while offset + 8 <= len(content):
+        chunk_id, chunk_size = content[offset:offset + 4], struct.unpack("<I", content[offset + 4:offset + 8])[0]
+        if chunk_id == b"fmt " and chunk_size >= 16:
+            sample_rate, byte_rate = struct.unpack("<II", content[offset + 12:offset + 20])
+        elif chunk_id == b"data":
+            data_size = min(chunk_size, len(content) - offset - 8)
+            break
+        offset += 8 + chunk_size + (chunk_size & 1)
+    return AudioInfo("wav", "LINEAR16", sample_rate, max(data_size, 0) / (byte_rate or BYTES_PER_SECOND))
+
+
+def _flac_info(content):
+    # STREAMINFO: 샘플레이트 20bit, 채널 3bit, 비트 5bit, 전체 샘플 수 36bit
+    if len(content) < 26:
+        return AudioInfo("flac", "FLAC", None, 0.0)
+    packed = int.from_bytes(content[18:26], "big")
+    sample_rate = packed >> 44
+    total_samples = packed & ((1 << 36) - 1)
+    if total_samples and sample_rate:
+        duration = total_samples / sample_rate
+    else:
+        duration = len(content) / FLAC_ESTIMATED_BYTES_PER_SECOND
+    return AudioInfo("flac", "FLAC", sample_rate or None, duration)
+
+
+def _ogg_opus_info(content):
+    head = content.find(b"OpusHead")
+    input_rate = struct.unpack("<I", content[head + 12:head + 16])[0] if head >= 0 else 0
+    sample_rate = input_rate if input_rate in OPUS_SAMPLE_RATES else 48000
+    # 마지막 Ogg 페이지의 granule position = 48kHz 기준 샘플 수
+    duration = 0.0
+    last_page = content.rfind(b"OggS")
+    if last_page >= 0 and last_page + 14 <= len(content):
+        granule = struct.unpack("<q", content[last_page + 6:last_page + 14])[0]
+        duration = max(granule, 0) / 48000
+    return AudioInfo("ogg_opus", "OGG_OPUS", sample_rate, duration)
+
+
+def detect_audio(content: bytes) -> Optional[AudioInfo]:
+    """헤더로 음성 형식 판별 (Speech API가 직접 받지 못하는 형식이면 None → 변환 필요)"""
+    if content[:4] == b"RIFF" and content[8:12] == b"WAVE":
+        return _wav_info(content)
+    if content[:4] == b"fLaC":
+        return _flac_info(content)
+    if content[:4] == b"OggS":
+        if b"OpusHead" in content[:512]:
+            return _ogg_opus_info(content)
+        return None  # Ogg Vorbis 등
+    if content[:4] == b"\x1a\x45\xdf\xa3":  # EBML (WebM/Matroska)
+        if b"A_OPUS" in content[:4096]:
+            return AudioInfo("webm_opus", "WEBM_OPUS", 48000,
+                             len(content) / WEBM_ESTIMATED_BYTES_PER_SECOND)
+        return None
+    if content[4:8] == b"ftyp" or content.startswith(TRANSCODE_SIGNATURES):
+        return None
+    # 헤더 없는 음성은 기존 앱과 같은 LINEAR16 16kHz로 처리
+    return AudioInfo("pcm", "LINEAR16", SAMPLE_RATE_HERTZ, len(content) / BYTES_PER_SECOND)
+
+
+def transcode_to_flac(content: bytes) -> Optional[bytes]:
+    """ffmpeg로 16kHz mono FLAC 변환 (임시 파일 없이 파이프로 입력을 흘려보내며 출력을 읽음)"""
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        logger.error("Audio transcode error: ffmpeg is not installed")
+        return None
+
+    process = subprocess.Popen(
+        [ffmpeg, "-hide_banner", "-loglevel", "error", "-i", "pipe:0",
+         "-ac", "1", "-ar", str(SAMPLE_RATE_HERTZ), "-f", "flac", "pipe:1"],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+    )
+
+    def feed():
+        try:
+            for start in range(0, len(content), TRANSCODE_CHUNK_BYTES):
+                process.stdin.write(content[start:start + TRANSCODE_CHUNK_BYTES])
+        except BrokenPipeError:
+            pass
+        finally:
+            process.stdin.close()
+
+    writer = threading.Thread(target=feed, daemon=True)
+    writer.start()
+    try:
+        output, errors = process.communicate(timeout=TRANSCODE_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.communicate()
+        logger.error("Audio transcode error: timeout")
+        return None
+    finally:
+        writer.join()
+
+    if process.returncode != 0 or not output:
+        logger.error(f"Audio transcode error: {errors.decode(errors='ignore').strip()}")
+        return None
+    return output
+
+
+def prepare_audio(content: bytes):
+    """(전송할 음성, 형식) 반환 - 지원 형식은 그대로, 나머지는 FLAC으로 변환"""
+    info = detect_audio(content)
+    if info is not None:
+        return content, info
+
+    transcoded = transcode_to_flac(content)
+    if transcoded is None:
+        return None, None
+    info = _flac_info(transcoded)
+    logger.info(f"Audio transcoded: {len(content)} -> {len(transcoded)} bytes")
+    return transcoded, info._replace(codec="flac (transcoded)")
+
+
+def recognition_config(info: AudioInfo):
+    from google.cloud import speech
+
+    config = speech.RecognitionConfig(
+        encoding=speech.RecognitionConfig.AudioEncoding[info.encoding],
+        language_code=LANGUAGE_CODE,
+        enable_automatic_punctuation=True,
+        model="default"
+    )
+    if info.sample_rate_hertz:
+        config.sample_rate_hertz = info.sample_rate_hertz
+    return config
+
+
+def _streaming_requests(content, config):
+    from google.cloud import speech
+
+    yield speech.StreamingRecognizeRequest(
+        streaming_config=speech.StreamingRecognitionConfig(config=config)
+    )
+    for start in range(0, len(content), STREAMING_CHUNK_BYTES):
+        yield speech.StreamingRecognizeRequest(audio_content=content[start:start + STREAMING_CHUNK_BYTES])
+
+
+async def _astreaming_requests(content, config):
+    for request in _streaming_requests(content, config):
+        yield request
+
+
+def _join_results(results):
+    transcript = " ".join(result.alternatives[0].transcript for result in results if result.alternatives)
+    return transcript.strip() or None
+
+
+def _streaming_final_results(responses):
+    return [result for response in responses for result in response.results if result.is_final]
+
+
+@timed("stt")
+def transcribe_speech(content: bytes):
+    """음성(bytes)을 텍스트로 변환
+
+    WAV/FLAC/OGG_OPUS/WEBM_OPUS는 헤더로 판별해 그대로 보내고, 그 외 형식(MP3, M4A 등)은 FLAC으로 변환한다.
+    1분 이하는 recognize, 그보다 길면 스트리밍 인식(약 5분 이하) 또는 long_running_recognize를 사용한다.
+    settings.CHAT_OFFLINE 이 켜져 있으면 Speech API 대신 offline.fake_transcribe를 사용한다.
+    """
+    if offline_enabled():
+        return fake_transcribe(content)
+    from google.cloud import speech
+
+    try:
+        with span("stt.prepare"):
+            content, info = prepare_audio(content)
+        if content is None:
+            return None
+        client = get_speech_client()
+        config = recognition_config(info)
+        duration = info.duration
+
+        if duration <= SYNC_RECOGNIZE_MAX_SECONDS:
+            response = client.recognize(config=config, audio=speech.RecognitionAudio(content=content))
+            results = response.results
+        elif duration <= STREAMING_MAX_SECONDS:
+            responses = client.streaming_recognize(requests=_streaming_requests(content, config))
+            results = _streaming_final_results(responses)
+        else:
+            operation = client.long_running_recognize(config=config, audio=speech.RecognitionAudio(content=content))
+            results = operation.result(timeout=LONG_RUNNING_TIMEOUT).results
+
+        logger.info(
+            f"Speech recognized: codec={info.codec} bytes={len(content)} duration={duration:.1f}s "
+            f"results={len(results)}"
+        )
+        if not results:
+            logger.info("No transcription results")
+            return None
+        return _join_results(results)
+
+    except Exception as e:
+        logger.error(f"Transcription error: {str(e)}")
+        return None
+
+
+@timed("stt")
+async def atranscribe_speech(content: bytes):
+    """transcribe_speech의 비동기 버전"""
+    if offline_enabled():
+        return await afake_transcribe(content)
+    from google.cloud import speech
+
+    try:
+        with span("stt.prepare"):
+            content, info = await asyncio.to_thread(prepare_audio, content)
+        if content is None:
+            return None
+        client = get_async_speech_client()
+        config = recognition_config(info)
+        duration = info.duration
+
+        if duration <= SYNC_RECOGNIZE_MAX_SECONDS:
+            response = await client.recognize(config=config, audio=speech.RecognitionAudio(content=content))
+            results = response.results
+        elif duration <= STREAMING_MAX_SECONDS:
+            stream = await client.streaming_recognize(requests=_astreaming_requests(content, config))
+            results = [result async for response in stream for result in response.results if result.is_final]
+        else:
+            operation = await client.long_running_recognize(
+                config=config, audio=speech.RecognitionAudio(content=content)
+            )
+            response = await operation.result(timeout=LONG_RUNNING_TIMEOUT)
+            results = response.results
+
+        logger.info(
+            f"Speech recognized: codec={info.codec} bytes={len(content)} duration={duration:.1f}s "
+            f"results={len(results)}"
+        )
+        if not results:
+            logger.info("No transcription results")
+            return None
+        return _join_results(results)
+
+    except Exception as e:
+        logger.error(f"Transcription error: {str(e)}")
+        return None
@@ -0,0 +1,40 @@
+import json
+import queue
+import threading
+
+from django.db import connections
+
+# 에이전트 실행 스레드가 끝났음을 알리는 표시
+_DONE = object()
+
+
+def sse_event(event: str, data) -> str:
+    """Server-Sent Events 형식의 메시지 생성"""
+    payload = json.dumps(data, ensure_ascii=False, default=str)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+def run_in_background(func, events: queue.Queue) -> threading.Thread:
+    """func를 별도 스레드에서 실행하고 결과 또는 예외를 큐로 전달"""
+
+    def target():
+        try:
+            events.put(("result", func()))
+        except Exception as e:
+            events.put(("error", e))
+        finally:
+            connections.close_all()  # 이 스레드에서 연 DB 연결 정리
+            events.put((_DONE, None))
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    return thread
+
+
+def iter_events(events: queue.Queue, timeout: float = 120):
+    """실행 스레드가 끝날 때까지 큐의 이벤트를 순서대로 반환"""
+    while True:
+        kind, payload = events.get(timeout=timeout)
+        if kind is _DONE:
+            return
+        yield kind, payload
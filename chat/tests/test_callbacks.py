@@ -0,0 +1,47 @@
+import json
+import queue
+from unittest import TestCase
+
+from ..callbacks import JsonFieldStream, QueueCallbackHandler
+
+RESPONSE = {
+    "type": "chat",
+    "start_message": "열이 \"38도\" 이상이면\n소아과 진료를 받아보세요 😊",
+    "end_message": "수분 보충도 잊지 마세요.",
+}
+
+
+def chunks(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+class JsonFieldStreamTests(TestCase):
+    def test_decodes_only_the_field_for_any_token_split(self):
+        for raw in (json.dumps(RESPONSE, ensure_ascii=False), json.dumps(RESPONSE)):
+            for size in (1, 2, 3, 5, 7, len(raw)):
+                with self.subTest(ascii=raw.isascii(), size=size):
+                    stream = JsonFieldStream("start_message")
+                    text = "".join(stream.feed(token) for token in chunks(raw, size))
+                    self.assertEqual(text, RESPONSE["start_message"])
+                    self.assertTrue(stream.done)
+
+    def test_ignores_text_without_the_field(self):
+        stream = JsonFieldStream("start_message")
+        self.assertEqual(stream.feed("죄송합니다. 다시 말씀해주세요."), "")
+        self.assertFalse(stream.done)
+
+
+class QueueCallbackHandlerTests(TestCase):
+    def test_token_events_carry_decoded_start_message(self):
+        events = queue.Queue()
+        handler = QueueCallbackHandler(events)
+        for token in chunks(json.dumps(RESPONSE, ensure_ascii=False), 4):
+            handler.on_llm_new_token(token, run_id="run-1")
+        handler.on_llm_end(None, run_id="run-1")
+
+        tokens = []
+        while not events.empty():
+            kind, payload = events.get()
+            self.assertEqual(kind, "token")
+            tokens.append(payload["token"])
+        self.assertEqual("".join(tokens), RESPONSE["start_message"])
@@ -0,0 +1,37 @@
+from unittest import TestCase
+
+from ..intents import match_intent
+
+
+class SymptomIntentTests(TestCase):
+    """증상 문장 → 병원 검색 템플릿 (정보 질문은 에이전트로)"""
+
+    def assertSearches(self, message, department):
+        intent = match_intent(message)
+        self.assertIsNotNone(intent, message)
+        self.assertEqual((intent.tool, intent.kwargs["query"]), ("search_hospital", department))
+
+    def test_symptom_statements(self):
+        self.assertSearches("아이가 귀가 아파요", "이비인후과")
+        self.assertSearches("아이가 열이 나요", "소아청소년과")
+        self.assertSearches("발목을 삐었어요", "정형외과")
+        self.assertSearches("두드러기가 났어요", "피부과")
+        self.assertSearches("수족구 걸린 것 같아요", "소아청소년과")
+
+    def test_hospital_cue(self):
+        self.assertSearches("아이가 귀가 아픈데 어디로 가야 해?", "이비인후과")
+        self.assertSearches("스트레스 때문에 병원 가봐야 할까", "정신건강의학과")
+
+    def test_emergency_even_as_question(self):
+        self.assertSearches("아이가 경련을 해요?", "종합병원")
+
+    def test_information_questions_go_to_agent(self):
+        for message in ("이유식 언제 시작해요?", "분유 얼마나 먹여야 해?", "접종 후 열이 나면 어떻게 해?",
+                        "수족구 전염 기간이 얼마나 돼?", "교정 비용이 얼마야?"):
+            with self.subTest(message=message):
+                self.assertIsNone(match_intent(message))
+
+    def test_keyword_without_symptom_goes_to_agent(self):
+        for message in ("스트레스 받아", "요즘 너무 피곤해"):
+            with self.subTest(message=message):
+                self.assertIsNone(match_intent(message))
@@ -0,0 +1,53 @@
+from unittest import TestCase
+
+from django.core.cache.backends.locmem import LocMemCache
+from langchain_core.messages import AIMessage, HumanMessage
+
+from ..session_store import ChatSessionStore
+
+
+class ChatSessionStoreTests(TestCase):
+    """워커 두 개가 같은 공유 저장소를 쓰는 상황"""
+
+    def setUp(self):
+        shared = LocMemCache(f"chat-sessions-{self.id()}", {})
+        self.first = self._store(shared)
+        self.second = self._store(shared)
+
+    @staticmethod
+    def _store(shared, revalidate_interval=0):
+        store = ChatSessionStore(shared_ttl=60, revalidate_interval=revalidate_interval)
+        store.shared = shared
+        return store
+
+    def test_concurrent_writes_are_merged(self):
+        a = self.first.get("s1")
+        b = self.second.get("s1")
+        a.add_messages([HumanMessage(content="약국"), AIMessage(content="a")])
+        b.state["last_results"] = {"dataset": "pharmacy", "items": [{"id": 1}]}
+        b.add_messages([HumanMessage(content="병원"), AIMessage(content="b")])
+
+        latest = self._store(self.first.shared).get("s1")
+        self.assertEqual([m.content for m in latest.messages], ["약국", "a", "병원", "b"])
+        self.assertEqual(latest.state["last_results"]["dataset"], "pharmacy")
+        self.assertEqual(latest.version, 2)
+        self.assertEqual(self.second.stats()["conflicts"], 1)
+
+    def test_local_hit_skips_shared_version_within_interval(self):
+        store = self._store(self.first.shared, revalidate_interval=60)
+        history = store.get("s1")
+        self.first.get("s1").add_messages([HumanMessage(content="다른 워커")])
+
+        self.assertIs(store.get("s1"), history)
+        self.assertEqual(history.messages, [])
+
+        history.add_messages([HumanMessage(content="이 워커")])
+        self.assertEqual([m.content for m in history.messages], ["다른 워커", "이 워커"])
+
+    def test_stale_entry_is_reloaded_after_interval(self):
+        history = self.first.get("s1")
+        self.second.get("s1").add_messages([HumanMessage(content="다른 워커")])
+
+        reloaded = self.first.get("s1")
+        self.assertIsNot(reloaded, history)
+        self.assertEqual([m.content for m in reloaded.messages], ["다른 워커"])
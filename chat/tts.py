@@ -0,0 +1,152 @@
+import io
+import logging
+import math
+import re
+import struct
+import threading
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from .offline import offline_config
+
+logger = logging.getLogger(__name__)
+
+# TTS 기본 설정 (settings.CHAT_TTS 로 덮어쓸 수 있음)
+DEFAULT_TTS = {
+    "BACKEND": "chat.tts.GttsBackend",
+    "OPTIONS": {},
+    "MAX_WORKERS": 4,  # 문장 동시 합성 수
+    # 요청에 audio_format이 없을 때의 음성 응답 형식
+    # "base64": 전체 음성을 audio 필드에 base64로 (기존 모바일 앱 호환), "url": 문장별 재생 URL 목록(audio_urls)
+    "AUDIO_FORMAT": "base64",
+}
+
+AUDIO_FORMATS = ("base64", "url")
+
+# 문장 끝 (마침표/물음표/느낌표/물결 뒤 공백 또는 줄바꿈)
+SENTENCE_END = re.compile(r"(?<=[.!?~。])\s+|\n+")
+# 이보다 짧은 문장은 앞 문장에 붙여서 합성 (너무 잘게 나누면 요청 수만 늘어남)
+MIN_SENTENCE_CHARS = 8
+
+
+class TtsBackend:
+    """TTS 엔진 인터페이스"""
+    name = "base"
+    content_type = "audio/mpeg"
+    extension = "mp3"
+
+    def synthesize(self, text: str, lang: str = "ko") -> bytes:
+        raise NotImplementedError
+
+
+class GttsBackend(TtsBackend):
+    """Google Translate TTS (네트워크 필요)"""
+    name = "gtts"
+
+    def synthesize(self, text, lang="ko"):
+        from gtts import gTTS
+
+        buffer = io.BytesIO()
+        gTTS(text=text, lang=lang).write_to_fp(buffer)
+        return buffer.getvalue()
+
+
+class OfflineToneBackend(TtsBackend):
+    """네트워크 없이 동작하는 테스트/벤치마크용 엔진
+
+    글자 수에 비례하는 길이의 사인파 WAV를 만든다. latency_per_char로 실제 엔진의 합성 지연을 흉내낼 수 있다.
+    """
+    name = "offline"
+    content_type = "audio/wav"
+    extension = "wav"
+
+    def __init__(self, sample_rate=16000, seconds_per_char=0.08, latency=0.0, latency_per_char=0.0):
+        self.sample_rate = sample_rate
+        self.seconds_per_char = seconds_per_char
+        self.latency = latency
+        self.latency_per_char = latency_per_char
+
+    def synthesize(self, text, lang="ko"):
+        if self.latency or self.latency_per_char:
+            time.sleep(self.latency + self.latency_per_char * len(text))
+
+        frames = int(self.sample_rate * self.seconds_per_char * max(len(text), 1))
+        samples = (int(3000 * math.sin(2 * math.pi * 440 * i / self.sample_rate)) for i in range(frames))
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(self.sample_rate)
+            wav.writeframes(b"".join(struct.pack("<h", sample) for sample in samples))
+        return buffer.getvalue()
+
+
+def split_sentences(text: str):
+    """응답 문장을 합성 단위로 분리"""
+    sentences = []
+    for part in SENTENCE_END.split(text.strip()):
+        part = part.strip()
+        if not part:
+            continue
+        if sentences and len(sentences[-1]) < MIN_SENTENCE_CHARS:
+            sentences[-1] = f"{sentences[-1]} {part}"
+        else:
+            sentences.append(part)
+    return sentences
+
+
+def _config():
+    return {**DEFAULT_TTS, **getattr(settings, "CHAT_TTS", {})}
+
+
+def audio_format(requested=None) -> str:
+    """요청의 audio_format (없거나 모르는 값이면 설정 기본값)"""
+    return requested if requested in AUDIO_FORMATS else _config()["AUDIO_FORMAT"]
+
+
+_backend = None
+_executor = None
+_lock = threading.Lock()
+
+
+def get_tts_backend() -> TtsBackend:
+    """settings.CHAT_TTS['BACKEND'] 엔진 (프로세스 전역, settings.CHAT_OFFLINE 이 켜져 있으면 OfflineToneBackend)"""
+    global _backend
+    if _backend is None:
+        with _lock:
+            if _backend is None:
+                offline = offline_config()
+                if offline["ENABLED"]:
+                    _backend = OfflineToneBackend(**offline["TTS_OPTIONS"])
+                else:
+                    config = _config()
+                    _backend = import_string(config["BACKEND"])(**config["OPTIONS"])
+    return _backend
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=_config()["MAX_WORKERS"], thread_name_prefix="tts")
+    return _executor
+
+
+def synthesize_sentences(text, lang="ko", cache=None):
+    """문장별로 동시에 합성하고, 완료되는 대로 순서대로 (index, key) 반환
+
+    첫 문장이 끝나면 나머지가 합성 중이어도 바로 돌려주므로 클라이언트가 먼저 재생을 시작할 수 있다.
+    """
+    if cache is None:
+        from .tts_cache import get_tts_cache
+        cache = get_tts_cache()
+
+    sentences = split_sentences(text)
+    futures = [_get_executor().submit(cache.get_or_create, sentence, lang) for sentence in sentences]
+    for index, future in enumerate(futures):
+        yield index, future.result()
@@ -0,0 +1,159 @@
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import threading
+from collections import Counter
+
+from django.conf import settings
+
+from .tts import get_tts_backend
+
+logger = logging.getLogger(__name__)
+
+# TTS 캐시 기본 설정 (settings.CHAT_TTS_CACHE 로 덮어쓸 수 있음)
+DEFAULT_TTS_CACHE = {
+    "DIRECTORY": os.path.join(tempfile.gettempdir(), "chat_tts"),
+    "MAX_BYTES": 200 * 1024 * 1024,  # 디스크 사용량 상한, 넘으면 오래 사용하지 않은 파일부터 삭제
+}
+
+KEY_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+
+def audio_key(text, lang="ko", voice="default"):
+    """(텍스트, 언어, 음성) 내용 기반 키"""
+    return hashlib.sha256(f"{lang}\0{voice}\0{text}".encode("utf-8")).hexdigest()
+
+
+class TtsCache:
+    """
+    TTS 음성 파일 캐시 (내용 기반 주소)
+    같은 문장은 한 번만 합성하고, 파일은 GET /chat/audio/<key>.<extension> 으로 제공
+    디스크 사용량이 max_bytes를 넘으면 마지막 사용 시각(mtime)이 오래된 파일부터 삭제
+    """
+
+    def __init__(self, directory, max_bytes, backend):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.backend = backend
+        self._size = None  # 디스크 사용량 (처음 필요할 때 계산)
+        self._lock = threading.Lock()
+        self._inflight = {}  # key -> Lock (같은 문장의 동시 합성 방지)
+        self._stats = Counter()
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key):
+        if not KEY_PATTERN.match(key):
+            raise ValueError(f"Invalid audio key: {key}")
+        return os.path.join(self.directory, key[:2], f"{key}.{self.backend.extension}")
+
+    def exists(self, key):
+        return os.path.exists(self.path(key))
+
+    def get_or_create(self, text, lang="ko"):
+        """캐시된 음성의 키 반환 (없으면 합성 후 저장)"""
+        key = audio_key(text, lang, self.backend.name)
+        path = self.path(key)
+        if self._touch(path):
+            self._stats["hits"] += 1
+            return key
+
+        with self._lock:
+            key_lock = self._inflight.setdefault(key, threading.Lock())
+        with key_lock:
+            try:
+                if self._touch(path):
+                    self._stats["hits"] += 1
+                    return key
+                self._stats["misses"] += 1
+                self._write(path, self.backend.synthesize(text, lang))
+            finally:
+                with self._lock:
+                    self._inflight.pop(key, None)
+        return key
+
+    def _touch(self, path):
+        try:
+            os.utime(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _write(self, path, content):
+        # 임시 파일에 쓴 뒤 교체 (다른 워커가 쓰다 만 파일을 읽지 않도록)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        os.replace(temp_path, path)
+
+        with self._lock:
+            if self._size is None:
+                self._size = self._disk_usage()
+            else:
+                self._size += len(content)
+            over_limit = self._size > self.max_bytes
+        if over_limit:
+            self.evict()
+
+    def _files(self):
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if not name.endswith(".tmp"):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    yield stat.st_mtime, stat.st_size, path
+
+    def _disk_usage(self):
+        return sum(size for _, size, _ in self._files())
+
+    def evict(self):
+        """오래 사용하지 않은 파일부터 삭제해 사용량을 상한의 90%로 줄임"""
+        files = sorted(self._files())
+        total = sum(size for _, size, _ in files)
+        target = self.max_bytes * 0.9
+        removed = 0
+        for _, size, path in files:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        with self._lock:
+            self._size = total
+        self._stats["evictions"] += removed
+        if removed:
+            logger.info(f"TTS cache evicted {removed} files, size={total}")
+
+    def stats(self):
+        stats = dict(self._stats)
+        lookups = stats.get("hits", 0) + stats.get("misses", 0)
+        stats["hit_rate"] = round(stats.get("hits", 0) / lookups, 4) if lookups else 0.0
+        stats["size"] = self._size
+        return stats
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_tts_cache() -> TtsCache:
+    """settings.CHAT_TTS_CACHE 설정으로 프로세스 전역 캐시 생성"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                config = {**DEFAULT_TTS_CACHE, **getattr(settings, "CHAT_TTS_CACHE", {})}
+                _cache = TtsCache(
+                    directory=config["DIRECTORY"],
+                    max_bytes=config["MAX_BYTES"],
+                    backend=get_tts_backend(),
+                )
+    return _cache
@@ -1,7 +1,14 @@
-from django.urls import path
-from .views import  UnifiedChatAPIView
+from django.urls import path, re_path
+from .views import  UnifiedChatAPIView, UnifiedChatStreamAPIView
+from .async_views import AsyncUnifiedChatView
+from .audio_views import TtsAudioView
+from .metrics_views import ChatMetricsView
 
 urlpatterns = [
     path("unified/", UnifiedChatAPIView.as_view(), name="unified-chat"),
+    path("unified/async/", AsyncUnifiedChatView.as_view(), name="unified-chat-async"),
+    path("unified/stream/", UnifiedChatStreamAPIView.as_view(), name="unified-chat-stream"),
+    path("metrics/", ChatMetricsView.as_view(), name="chat-metrics"),
+    re_path(r"^audio/(?P<key>[0-9a-f]{64})\.(?P<extension>[a-z0-9]+)$", TtsAudioView.as_view(), name="chat-audio"),
 ]
 
@@ -1,20 +1,18 @@
+import contextvars
+import copy
 import logging
+import queue
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.urls import reverse
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.parsers import JSONParser, MultiPartParser, FormParser
-import os
 from dotenv import load_dotenv
-import openai
 from typing import List, Dict
 from django.db.models import F
 from django.db.models.functions import ACos, Cos, Radians, Sin
-from langchain.tools import tool
-from langchain_openai import ChatOpenAI
-from langchain_core.prompts import ChatPromptTemplate
-from langchain.agents import create_tool_calling_agent, AgentExecutor
-from langchain_community.chat_message_histories import ChatMessageHistory
-from langchain_core.runnables.history import RunnableWithMessageHistory
 from drf_yasg.utils import swagger_auto_schema
 import re
 from datetime import datetime, time, timedelta
@@ -23,78 +21,37 @@ import json
 from django.db.models import F
 from django.db.models.functions import Radians, Sin, Cos, ACos
 from datetime import datetime
-import math
-from gtts import gTTS
-from google.cloud import speech
 import base64
-from dotenv import load_dotenv
-import openai
+import math
+import time as time_module
 import uuid
-import tempfile
-from langchain_core.messages import HumanMessage, AIMessage
 
 # 올바른 앱에서 import
 from searchHospital.models import Hospital
 from searchPharmacy.models import Pharmacy
+from .speech import read_upload, transcribe_speech
+from .tts import audio_format, synthesize_sentences
+from .tts_cache import get_tts_cache
+from .search_cache import get_search_cache
+from .agent import get_agent_executor, get_history_manager, token_usage
+from .router import classify, route_stats
+from .intents import normalize_department
+from .prefetch import start_prefetch
+from .metrics import Timings, current_timings, record, span, timed, wants_timings
+from .streaming import iter_events, run_in_background, sse_event
+from .refine import (
+    arefine_previous_results,
+    compact_candidate,
+    current_session,
+    match_session_intent,
+    refine_previous_results,
+    remember_results,
+)
 
 # 로그 설정
 logger = logging.getLogger(__name__)
 load_dotenv()
 
-# OpenAI client 초기화
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-client = openai.OpenAI(api_key=OPENAI_API_KEY)
-
-# 음성을 텍스트로 변환하는 함수
-def transcribe_speech(audio_file_path):
-    """음성을 텍스트로 변환하는 함수"""
-    speech_client = None
-    try:
-        speech_client = speech.SpeechClient()
-        print("Speech client created")
-
-        with open(audio_file_path, "rb") as audio_file:
-            content = audio_file.read()
-        print(f"Audio file read: {len(content)} bytes")
-
-        audio = speech.RecognitionAudio(content=content)
-        config = speech.RecognitionConfig(
-            encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
-            sample_rate_hertz=16000,
-            language_code="ko-KR",
-            enable_automatic_punctuation=True,
-            model="default"
-        )
-        print("Recognition config created")
-
-        response = speech_client.recognize(config=config, audio=audio)
-        print("Recognition response:", response)
-
-        if not response.results:
-            print("No transcription results")
-            return None
-
-        transcript = ""
-        for result in response.results:
-            transcript += result.alternatives[0].transcript + " "
-            print(f"Confidence: {result.alternatives[0].confidence}")
-
-        return transcript.strip()
-
-    except Exception as e:
-        print(f"Transcription error: {str(e)}")
-        return None
-
-    finally:
-        # Speech 클라이언트 정리
-        if speech_client:
-            try:
-                speech_client.transport.close()
-            except Exception as e:
-                print(f"Speech client cleanup error: {str(e)}")    
-                
-                
-                
 # 시간 관련 유틸리티 함수들
 def normalize_time(time_str):
     """시간 문자열을 정규화"""
@@ -261,8 +218,116 @@ def get_hospital_closing_time(hospital, target_date):
     except:
         return None
 
+HOSPITAL_RADIUS_KM = 3
+PHARMACY_RADIUS_KM = 10
+PHARMACY_LIMIT = 10
+
+
+def within_radius(rows, latitude, longitude, radius_km):
+    """캐시된 후보(격자 중심 기준 조회)의 distance를 실제 좌표로 다시 계산해 반경 안의 것만 반환
+
+    캐시된 객체는 다른 요청과 공유되므로 복사본에 distance를 설정한다.
+    """
+    nearby = []
+    for row in rows:
+        distance = haversine(latitude, longitude, row.latitude, row.longitude)
+        if distance <= radius_km:
+            row = copy.copy(row)
+            row.distance = distance
+            nearby.append(row)
+    return nearby
+
+def _hospital_queryset(query, latitude, longitude, radius_km=HOSPITAL_RADIUS_KM):
+    """반경 radius_km 이내 병원 쿼리"""
+    hospitals = Hospital.objects.annotate(
+        distance=ACos(
+            Cos(Radians(latitude)) * 
+            Cos(Radians(F('latitude'))) * 
+            Cos(Radians(F('longitude')) - Radians(longitude)) + 
+            Sin(Radians(latitude)) * 
+            Sin(Radians(F('latitude')))
+        ) * 6371
+    ).filter(distance__lte=radius_km)
+
+    if query:
+        hospitals = hospitals.filter(hospital_type__icontains=query)
+    return hospitals
+
+def hospital_row(hospital, target_date):
+    """병원 검색 결과 행 (영업 시간 정보가 없으면 None)"""
+    opening_time = get_hospital_opening_time(hospital, target_date)
+    if opening_time is None:
+        return None
+    return {
+        'name': hospital.name,
+        'address': hospital.address,
+        'phone': hospital.phone,
+        'hospital_type': hospital.hospital_type,
+        'distance': f"{hospital.distance:.1f}km",
+        'state': get_hospital_state(hospital, target_date),
+        'opening_time': opening_time,
+        'closing_time': get_hospital_closing_time(hospital, target_date),
+        'weekday_hours': hospital.weekday_hours,
+        'saturday_hours': hospital.saturday_hours,
+        'sunday_hours': hospital.sunday_hours,
+        'lunch_time': hospital.lunch_time
+    }
+
+def _build_hospital_results(hospitals, query, target_time, sort_by):
+    """조회된 병원 목록을 (검색 결과 응답, 후속 필터링용 후보 목록)으로 변환"""
+    # 시간 처리
+    current_time = datetime.now()
+    target_date = current_time
+    if target_time:
+        target_date = parse_target_time(target_time)
+
+    # 결과 처리 (영업 시간 정보가 있는 경우만 포함)
+    results = []
+    candidates = []
+    for hospital in hospitals:
+        hospital_data = hospital_row(hospital, target_date)
+        if hospital_data is not None:
+            results.append(hospital_data)
+            candidates.append(compact_candidate("hospital", hospital.id, hospital.distance, hospital_data))
+
+    # 정렬 처리
+    time_description = "영업 중인"
+    if sort_by == "earliest_open":
+        results.sort(key=lambda x: x['opening_time'])
+        time_description = "가장 빨리 여는"
+    elif sort_by == "latest_close":
+        results.sort(key=lambda x: x['closing_time'], reverse=True)
+        time_description = "가장 늦게 닫는"
+    else:
+        results = [r for r in results if r['state'] in ["영업중", "점심시간"]]
+
+    # 시간 표시 문자열 생성
+    time_str = f"{target_date.strftime('%Y-%m-%d %H:%M')} 기준" if target_time else "현재"
+    
+    if not results:
+        return {
+            "type": "no_results",
+            "start_message": f"죄송합니다. {time_str} {time_description} {query} 병원을 찾을 수 없습니다.",
+            "end_message": "다른 시간대를 확인해보시거나, 직접 전화로 문의해보세요.",
+            "data": []
+        }, candidates
+
+    return {
+        "type": "hospital_list",
+        "start_message": f"{time_str} {time_description} {query} 병원들입니다:",
+        "end_message": "방문 전 전화로 확인하시는 것이 좋습니다.",
+        "data": results[:5]
+    }, candidates
+
+HOSPITAL_SEARCH_ERROR = {
+    "type": "error",
+    "start_message": "병원 검색 중 오류가 발생했습니다.",
+    "end_message": "다시 시도해주세요.",
+    "data": []
+}
+
 # 병원 검색 도구 개선
-@tool
+@timed("tool.search_hospital")
 def search_hospital(query: str = "", latitude: float = None, longitude: float = None, target_time: str = None, sort_by: str = None) -> Dict:
     """
     병원 검색 도구
@@ -274,87 +339,41 @@ def search_hospital(query: str = "", latitude: float = None, longitude: float =
         sort_by: 정렬 기준 ("earliest_open" - 가장 빨리 여는 순, "latest_close" - 가장 늦게 닫는 순)
     """
     try:
-        # 시간 처리
-        current_time = datetime.now()
-        target_date = current_time
-        if target_time:
-            target_date = parse_target_time(target_time)
-            
-        # 기본 쿼리
-        hospitals = Hospital.objects.annotate(
-            distance=ACos(
-                Cos(Radians(latitude)) * 
-                Cos(Radians(F('latitude'))) * 
-                Cos(Radians(F('longitude')) - Radians(longitude)) + 
-                Sin(Radians(latitude)) * 
-                Sin(Radians(F('latitude')))
-            ) * 6371
-        ).filter(distance__lte=3)
-
-        if query:
-            hospitals = hospitals.filter(hospital_type__icontains=query)
-
-        # 결과 처리
-        results = []
-        for hospital in hospitals:
-            opening_time = get_hospital_opening_time(hospital, target_date)
-            closing_time = get_hospital_closing_time(hospital, target_date)
-            
-            if opening_time is not None:  # 영업 시간 정보가 있는 경우만 포함
-                state = get_hospital_state(hospital, target_date)
-                hospital_data = {
-                    'name': hospital.name,
-                    'address': hospital.address,
-                    'phone': hospital.phone,
-                    'hospital_type': hospital.hospital_type,
-                    'distance': f"{hospital.distance:.1f}km",
-                    'state': state,
-                    'opening_time': opening_time,
-                    'closing_time': closing_time,
-                    'weekday_hours': hospital.weekday_hours,
-                    'saturday_hours': hospital.saturday_hours,
-                    'sunday_hours': hospital.sunday_hours,
-                    'lunch_time': hospital.lunch_time
-                }
-                results.append(hospital_data)
-
-        # 정렬 처리
-        time_description = "영업 중인"
-        if sort_by == "earliest_open":
-            results.sort(key=lambda x: x['opening_time'])
-            time_description = "가장 빨리 여는"
-        elif sort_by == "latest_close":
-            results.sort(key=lambda x: x['closing_time'], reverse=True)
-            time_description = "가장 늦게 닫는"
-        else:
-            results = [r for r in results if r['state'] in ["영업중", "점심시간"]]
-
-        # 시간 표시 문자열 생성
-        time_str = f"{target_date.strftime('%Y-%m-%d %H:%M')} 기준" if target_time else "현재"
-        
-        if not results:
-            return {
-                "type": "no_results",
-                "start_message": f"죄송합니다. {time_str} {time_description} {query} 병원을 찾을 수 없습니다.",
-                "end_message": "다른 시간대를 확인해보시거나, 직접 전화로 문의해보세요.",
-                "data": []
-            }
-
-        return {
-            "type": "hospital_list",
-            "start_message": f"{time_str} {time_description} {query} 병원들입니다:",
-            "end_message": "방문 전 전화로 확인하시는 것이 좋습니다.",
-            "data": results[:5]
-        }
+        query = normalize_department(query)
+        cache = get_search_cache()
+        key = cache.make_key("hospital", latitude, longitude, query=query)
+
+        def compute():
+            return list(_hospital_queryset(query, *cache.snap(latitude, longitude),
+                                           radius_km=HOSPITAL_RADIUS_KM + cache.margin_km))
+
+        hospitals = within_radius(cache.get_or_compute(key, compute), latitude, longitude, HOSPITAL_RADIUS_KM)
+        result, candidates = _build_hospital_results(hospitals, query, target_time, sort_by)
+        remember_results("hospital", candidates, query=query, target_time=target_time)
+        return result
+    except Exception as e:
+        logger.error(f"Hospital search error: {str(e)}")
+        return dict(HOSPITAL_SEARCH_ERROR)
 
+@timed("tool.search_hospital")
+async def asearch_hospital(query: str = "", latitude: float = None, longitude: float = None, target_time: str = None, sort_by: str = None) -> Dict:
+    """병원 검색 도구 (비동기 ORM)"""
+    try:
+        query = normalize_department(query)
+        cache = get_search_cache()
+        key = await cache.amake_key("hospital", latitude, longitude, query=query)
+
+        async def compute():
+            return [hospital async for hospital in _hospital_queryset(query, *cache.snap(latitude, longitude),
+                                                                      radius_km=HOSPITAL_RADIUS_KM + cache.margin_km)]
+
+        hospitals = within_radius(await cache.aget_or_compute(key, compute), latitude, longitude, HOSPITAL_RADIUS_KM)
+        result, candidates = _build_hospital_results(hospitals, query, target_time, sort_by)
+        remember_results("hospital", candidates, query=query, target_time=target_time)
+        return result
     except Exception as e:
         logger.error(f"Hospital search error: {str(e)}")
-        return {
-            "type": "error",
-            "start_message": "병원 검색 중 오류가 발생했습니다.",
-            "end_message": "다시 시도해주세요.",
-            "data": []
-        }
+        return dict(HOSPITAL_SEARCH_ERROR)
 
 #####################################################
 # 약국
@@ -450,7 +469,122 @@ def get_pharmacy_closing_time(pharmacy, target_date):
     end_time = time_mapping[weekday]
     return int(end_time) if end_time else None
 
-@tool
+def _pharmacy_queryset(latitude, longitude, radius_km=PHARMACY_RADIUS_KM):
+    """반경 radius_km 이내 약국 쿼리 (가까운 순)"""
+    return (
+        Pharmacy.objects
+        .annotate(
+            distance=ACos(
+                Cos(Radians(latitude)) * 
+                Cos(Radians(F('latitude'))) * 
+                Cos(Radians(F('longitude')) - Radians(longitude)) + 
+                Sin(Radians(latitude)) * 
+                Sin(Radians(F('latitude')))
+            ) * 6371
+        )
+        .filter(distance__lte=radius_km)
+        .order_by('distance')
+    )
+
+def _pharmacy_candidates(queryset, margin_km, tenth_distance):
+    """격자 안 어느 좌표에서든 가까운 10곳이 될 수 있는 약국
+
+    격자 중심에서 10번째로 가까운 약국까지의 거리가 d면, 실제 좌표 기준 10곳은 모두 중심에서 d + 2×margin 안에 있다.
+    """
+    if tenth_distance is None:
+        return queryset
+    return queryset.filter(distance__lte=tenth_distance + 2 * margin_km)
+
+def nearest_pharmacies(rows, latitude, longitude):
+    return sorted(within_radius(rows, latitude, longitude, PHARMACY_RADIUS_KM),
+                  key=lambda pharmacy: pharmacy.distance)[:PHARMACY_LIMIT]
+
+def pharmacy_row(pharmacy, target_date):
+    """약국 검색 결과 행 (영업 시간 정보가 없으면 None)"""
+    opening_time = get_pharmacy_opening_time(pharmacy, target_date)
+    if opening_time is None:
+        return None
+    formatted_data = format_pharmacy_data(pharmacy, target_date)
+    formatted_data['opening_time'] = opening_time
+    formatted_data['closing_time'] = get_pharmacy_closing_time(pharmacy, target_date)
+    return formatted_data
+
+def load_result_rows(dataset, candidates, target_time=None):
+    """세션에 저장한 후보(id, 거리)로 검색 결과 행을 다시 만듦 (후보 순서대로, 그 사이 삭제된 곳은 제외)"""
+    model, build_row = (Hospital, hospital_row) if dataset == "hospital" else (Pharmacy, pharmacy_row)
+    target_date = parse_target_time(target_time) if target_time else datetime.now()
+    objects = model.objects.in_bulk([candidate["id"] for candidate in candidates])
+    rows = []
+    for candidate in candidates:
+        obj = objects.get(candidate["id"])
+        if obj is None:
+            continue
+        obj.distance = candidate["distance_km"]
+        row = build_row(obj, target_date)
+        if row is not None:
+            rows.append(row)
+    return rows
+
+def _build_pharmacy_results(nearby_pharmacies, target_time, sort_by):
+    """조회된 약국 목록을 (검색 결과 응답, 후속 필터링용 후보 목록)으로 변환"""
+    # 시간 처리
+    target_date = datetime.now()
+    if target_time:
+        target_date = parse_target_time(target_time)
+
+    # 결과 처리 (영업 시간 정보가 있는 경우만 포함)
+    results = []
+    candidates = []
+    for pharmacy in nearby_pharmacies:
+        formatted_data = pharmacy_row(pharmacy, target_date)
+        if formatted_data is not None:
+            results.append(formatted_data)
+            candidates.append(compact_candidate("pharmacy", pharmacy.id, pharmacy.distance, formatted_data))
+
+    # 정렬 처리
+    time_description = "영업 중인"
+    if sort_by == "earliest_open":
+        results.sort(key=lambda x: x['opening_time'])
+        time_description = "가장 빨리 여는"
+    elif sort_by == "latest_close":
+        results.sort(key=lambda x: x['closing_time'], reverse=True)
+        time_description = "가장 늦게 닫는"
+    else:
+        results = [r for r in results if r["영업 상태"] == "영업중"]
+
+    # 시간 표시 문자열 생성
+    time_str = f"{target_date.strftime('%Y-%m-%d %H:%M')} 기준" if target_time else "현재"
+
+    if not results:
+        return {
+            "type": "no_results",
+            "start_message": f"죄송합니다. {time_str} {time_description} 약국을 찾을 수 없습니다.",
+            "end_message": "다른 시간대를 확인해보시거나, 직접 전화로 문의해보세요.",
+            "data": []
+        }, candidates
+
+    return {
+        "type": "pharmacy_list",
+        "start_message": f"{time_str} {time_description} 약국들입니다:",
+        "end_message": "방문하시기 전에 전화로 확인하시는 것이 좋습니다.",
+        "data": results[:5]
+    }, candidates
+
+PHARMACY_LOCATION_REQUIRED = {
+    "type": "error",
+    "start_message": "위치 정보가 필요합니다.",
+    "end_message": "위치 정보를 설정해주세요.",
+    "data": []
+}
+
+PHARMACY_SEARCH_ERROR = {
+    "type": "error",
+    "start_message": "약국 검색 중 오류가 발생했습니다.",
+    "end_message": "다시 시도해주세요.",
+    "data": []
+}
+
+@timed("tool.search_pharmacy")
 def search_pharmacy(latitude: float = None, longitude: float = None, target_time: str = None, sort_by: str = None) -> Dict:
     """
     근처 약국 검색
@@ -463,175 +597,91 @@ def search_pharmacy(latitude: float = None, longitude: float = None, target_time
     try:
         # 위치 정보 검증
         if None in (latitude, longitude):
-            return {
-                "type": "error",
-                "start_message": "위치 정보가 필요합니다.",
-                "end_message": "위치 정보를 설정해주세요.",
-                "data": []
-            }
+            return dict(PHARMACY_LOCATION_REQUIRED)
 
-        # 시간 처리
-        target_date = datetime.now()
-        if target_time:
-            target_date = parse_target_time(target_time)
-
-        # 약국 검색 쿼리
-        nearby_pharmacies = (
-            Pharmacy.objects
-            .annotate(
-                distance=ACos(
-                    Cos(Radians(latitude)) * 
-                    Cos(Radians(F('latitude'))) * 
-                    Cos(Radians(F('longitude')) - Radians(longitude)) + 
-                    Sin(Radians(latitude)) * 
-                    Sin(Radians(F('latitude')))
-                ) * 6371
-            )
-            .filter(distance__lte=10)
-            .order_by('distance')[:10]
-        )
+        cache = get_search_cache()
+        key = cache.make_key("pharmacy", latitude, longitude)
 
-        # 결과 처리
-        results = []
-        for pharmacy in nearby_pharmacies:
-            opening_time = get_pharmacy_opening_time(pharmacy, target_date)
-            closing_time = get_pharmacy_closing_time(pharmacy, target_date)
-            
-            if opening_time is not None:  # 영업 시간 정보가 있는 경우만 포함
-                formatted_data = format_pharmacy_data(pharmacy, target_date)
-                formatted_data['opening_time'] = opening_time
-                formatted_data['closing_time'] = closing_time
-                results.append(formatted_data)
-
-        # 정렬 처리
-        time_description = "영업 중인"
-        if sort_by == "earliest_open":
-            results.sort(key=lambda x: x['opening_time'])
-            time_description = "가장 빨리 여는"
-        elif sort_by == "latest_close":
-            results.sort(key=lambda x: x['closing_time'], reverse=True)
-            time_description = "가장 늦게 닫는"
-        else:
-            results = [r for r in results if r["영업 상태"] == "영업중"]
+        def compute():
+            queryset = _pharmacy_queryset(*cache.snap(latitude, longitude), radius_km=PHARMACY_RADIUS_KM + cache.margin_km)
+            tenth = next(iter(queryset.values_list('distance', flat=True)[PHARMACY_LIMIT - 1:PHARMACY_LIMIT]), None)
+            return list(_pharmacy_candidates(queryset, cache.margin_km, tenth))
 
-        # 시간 표시 문자열 생성
-        time_str = f"{target_date.strftime('%Y-%m-%d %H:%M')} 기준" if target_time else "현재"
-
-        if not results:
-            return {
-                "type": "no_results",
-                "start_message": f"죄송합니다. {time_str} {time_description} 약국을 찾을 수 없습니다.",
-                "end_message": "다른 시간대를 확인해보시거나, 직접 전화로 문의해보세요.",
-                "data": []
-            }
-
-        return {
-            "type": "pharmacy_list",
-            "start_message": f"{time_str} {time_description} 약국들입니다:",
-            "end_message": "방문하시기 전에 전화로 확인하시는 것이 좋습니다.",
-            "data": results[:5]
-        }
+        nearby_pharmacies = nearest_pharmacies(cache.get_or_compute(key, compute), latitude, longitude)
+        result, candidates = _build_pharmacy_results(nearby_pharmacies, target_time, sort_by)
+        remember_results("pharmacy", candidates, target_time=target_time)
+        return result
 
     except Exception as e:
         logger.error(f"Pharmacy search error: {str(e)}")
-        return {
-            "type": "error",
-            "start_message": "약국 검색 중 오류가 발생했습니다.",
-            "end_message": "다시 시도해주세요.",
-            "data": []
-        }
+        return dict(PHARMACY_SEARCH_ERROR)
 
-# 도구 리스트
-tools = [search_hospital, search_pharmacy]
+@timed("tool.search_pharmacy")
+async def asearch_pharmacy(latitude: float = None, longitude: float = None, target_time: str = None, sort_by: str = None) -> Dict:
+    """근처 약국 검색 (비동기 ORM)"""
+    try:
+        if None in (latitude, longitude):
+            return dict(PHARMACY_LOCATION_REQUIRED)
 
-# GPT-4 LangChain 프롬프트 설정
-prompt = ChatPromptTemplate.from_messages([
-    (
-        "system",
-        """당신은 의료 서비스 도우미입니다. 
+        cache = get_search_cache()
+        key = await cache.amake_key("pharmacy", latitude, longitude)
 
-        이전 대화 내용을 고려하여 응답해주세요. 예를 들어:
-        - 사용자가 "내과로 알려줘"라고 하면 이전에 검색된 병원들 중 내과를 찾아주세요.
-        - 새로운 검색이 필요한 경우에만 search_hospital이나 search_pharmacy를 호출하세요.
-        
-        모든 응답은 반드시 다음과 같은 JSON 형식으로 반환해주세요:
-        병원/약국 검색 결과:
-        {{
-            "type": "hospital_list" 또는 "pharmacy_list",
-            "start_message": "검색 결과 소개 메시지",
-            "end_message": "마무리 메시지",
-            "data": [검색된 목록]
-        }}
-        
-        일반 대화:
-        {{
-            "type": "chat",
-            "start_message": "대화 메시지 앞부분",
-            "end_message": "대화 메시지 뒷부분이나 추가 안내",
-            "data": []
-        }}
-        
-        검색 결과 없음:
-        {{
-            "type": "no_results",
-            "start_message": "결과가 없다는 안내",
-            "end_message": "대안 추천",
-            "data": []
-        }}
-        
-        예시:
-        - 약국 검색: search_pharmacy(latitude=latitude, longitude=longitude)
-        - 병원 검색: search_hospital(query="이비인후과", latitude=latitude, longitude=longitude)
-        
-        위치 정보를 사용자에게 직접 물어보지 말고, 제공된 정보를 사용하세요."""
-    ),
-    ("placeholder", "{chat_history}"),
-    ("human", "사용자 위치: 위도 {latitude}, 경도 {longitude}\n메시지: {input}"),
-    ("placeholder", "{agent_scratchpad}"),
-])
-
-# LLM 및 에이전트 생성
-llm = ChatOpenAI(model="gpt-4o", temperature=0)
-agent = create_tool_calling_agent(llm, tools, prompt)
-agent_executor = AgentExecutor(
-    agent=agent,
-    tools=tools,
-    verbose=True,
-    max_iterations=3,
-    handle_parsing_errors=True
-)
+        async def compute():
+            queryset = _pharmacy_queryset(*cache.snap(latitude, longitude), radius_km=PHARMACY_RADIUS_KM + cache.margin_km)
+            tenth = [distance async for distance in
+                     queryset.values_list('distance', flat=True)[PHARMACY_LIMIT - 1:PHARMACY_LIMIT]]
+            return [pharmacy async for pharmacy in
+                    _pharmacy_candidates(queryset, cache.margin_km, tenth[0] if tenth else None)]
 
-# 세션 기록 저장소
-store = {}
+        nearby_pharmacies = nearest_pharmacies(await cache.aget_or_compute(key, compute), latitude, longitude)
+        result, candidates = _build_pharmacy_results(nearby_pharmacies, target_time, sort_by)
+        remember_results("pharmacy", candidates, target_time=target_time)
+        return result
+
+    except Exception as e:
+        logger.error(f"Pharmacy search error: {str(e)}")
+        return dict(PHARMACY_SEARCH_ERROR)
 
 def get_session_history(session_ids):
-    """세션별 채팅 기록 관리"""
-    if session_ids not in store:
-        store[session_ids] = ChatMessageHistory()
-    return store[session_ids]
-
-# 챗봇 실행기
-agent_with_chat_history = RunnableWithMessageHistory(
-    agent_executor,
-    get_session_history,
-    input_messages_key="input",
-    history_messages_key="chat_history",
-)
+    """세션별 채팅 기록 관리 (LRU + TTL 세션 저장소)"""
+    from .session_store import get_session_store
+
+    return get_session_store().get(session_ids)
+
+# 템플릿 의도에서 직접 호출할 도구 함수
+TOOL_FUNCTIONS = {
+    "search_hospital": search_hospital,
+    "search_pharmacy": search_pharmacy,
+    "refine_previous_results": refine_previous_results,
+}
+ASYNC_TOOL_FUNCTIONS = {
+    "search_hospital": asearch_hospital,
+    "search_pharmacy": asearch_pharmacy,
+    "refine_previous_results": arefine_previous_results,
+}
+# 사용자 위치를 인자로 받는 도구
+LOCATION_TOOLS = ("search_hospital", "search_pharmacy")
+
+LIST_RESPONSE_TYPES = ("hospital_list", "pharmacy_list")
+
+# 빠른 응답 버튼 메시지
+QUICK_REPLY_MESSAGES = ["근처 약국 찾아줘", "근처 병원 찾아줘"]
+QUICK_REPLY_ACK = {
+    "type": "chat",
+    "start_message": "네, 알겠습니다! 😊",
+    "end_message": "근처를 검색해볼게요.",
+    "data": []
+}
+
 
 class UnifiedChatAPIView(APIView):
     """음성/텍스트 통합 대화 API"""
     parser_classes = (MultiPartParser, FormParser, JSONParser)
     permission_classes = [IsAuthenticated]
 
-    def __init__(self):
-        super().__init__()
-        self.message_histories = {}  # 세션별 대화 기록 저장
-
     def get_or_create_history(self, session_id):
         """세션별 대화 기록 가져오기 또는 생성"""
-        if session_id not in self.message_histories:
-            self.message_histories[session_id] = ChatMessageHistory()
-        return self.message_histories[session_id]
+        return get_session_history(session_id)
 
     def format_response(self, response_data):
         try:
@@ -682,6 +732,158 @@ class UnifiedChatAPIView(APIView):
                 "data": []
             }
 
+    def iter_voice_chunks(self, formatted_response, timings=None):
+        """응답 메시지를 문장별로 동시에 합성하고, 완료되는 대로 순서대로 재생 URL 반환"""
+        response_text = f"{formatted_response['start_message']} {formatted_response['end_message']}"
+        backend = get_tts_cache().backend
+        started = time_module.perf_counter()
+        for index, key in synthesize_sentences(response_text, lang='ko'):
+            if index == 0:
+                record("tts.first_chunk", time_module.perf_counter() - started, timings)
+            yield {
+                "index": index,
+                "audio_url": reverse("chat-audio", kwargs={"key": key, "extension": backend.extension}),
+                "audio_type": backend.content_type,
+            }
+        record("tts", time_module.perf_counter() - started, timings)
+
+    def synthesize_voice(self, formatted_response, requested_format=None):
+        """응답 메시지 음성
+
+        audio_format이 "base64"면 기존 응답 그대로 전체 음성을 audio(base64) 필드로,
+        "url"이면 문장별 재생 URL 목록(audio_urls, 순서대로 이어서 재생)으로 반환
+        """
+        try:
+            if audio_format(requested_format) == "base64":
+                return self.synthesize_inline_voice(formatted_response)
+            chunks = list(self.iter_voice_chunks(formatted_response))
+            if not chunks:
+                return None
+            return {
+                "audio_urls": [chunk["audio_url"] for chunk in chunks],
+                "audio_type": chunks[0]["audio_type"]
+            }
+        except Exception as e:
+            logger.error(f"TTS generation error: {str(e)}")
+            return None
+
+    def synthesize_inline_voice(self, formatted_response):
+        """전체 응답을 한 파일로 합성(캐시 사용)해 base64로 반환 (audio_urls 이전 응답 형식)"""
+        response_text = f"{formatted_response['start_message']} {formatted_response['end_message']}"
+        started = time_module.perf_counter()
+        cache = get_tts_cache()
+        key = cache.get_or_create(response_text, lang='ko')
+        try:
+            with open(cache.path(key), 'rb') as f:
+                content = f.read()
+        except FileNotFoundError:
+            # 읽기 전에 캐시 정리로 지워짐
+            content = cache.backend.synthesize(response_text, 'ko')
+        record("tts", time_module.perf_counter() - started)
+        return {
+            "audio": base64.b64encode(content).decode('utf-8'),
+            "audio_type": "audio/mp3" if cache.backend.extension == "mp3" else cache.backend.content_type,
+        }
+
+    def respond(self, chat_history, input_text, user_profile, callbacks=None):
+        """템플릿 의도는 LLM 없이 도구를 직접 호출하고, 나머지는 에이전트로 처리"""
+        token = current_session.set(chat_history)
+        try:
+            return self._respond(chat_history, input_text, user_profile, callbacks)
+        finally:
+            current_session.reset(token)
+
+    def tool_kwargs(self, intent, user_profile):
+        kwargs = dict(intent.kwargs)
+        if intent.tool in LOCATION_TOOLS:
+            kwargs["latitude"] = float(user_profile.latitude)
+            kwargs["longitude"] = float(user_profile.longitude)
+        return kwargs
+
+    def add_note(self, formatted_response, note):
+        """도구 결과 안내 메시지 앞에 의도 안내(증상 → 진료과목 추천 등)를 붙임 (캐시된 결과는 복사)"""
+        return {**formatted_response, "start_message": f"{note} {formatted_response.get('start_message', '')}".strip()}
+
+    def _respond(self, chat_history, input_text, user_profile, callbacks):
+        with span("intent"):
+            intent = match_session_intent(input_text, chat_history)
+        if intent is None:
+            return self.run_agent(chat_history, input_text, user_profile, callbacks=callbacks)
+
+        formatted_response = TOOL_FUNCTIONS[intent.tool](**self.tool_kwargs(intent, user_profile))
+        if intent.note:
+            formatted_response = self.add_note(formatted_response, intent.note)
+        logger.info(f"Chat fast path: session={chat_history.session_id} tool={intent.tool} args={intent.kwargs}")
+        for handler in callbacks or []:
+            handler.on_tool_end(formatted_response, name=intent.tool)
+
+        with span("history.record"):
+            get_history_manager().record_turn(chat_history, input_text, formatted_response)
+        return formatted_response
+
+    def run_agent(self, chat_history, input_text, user_profile, callbacks=None):
+        """토큰 예산 내의 대화 기록으로 에이전트를 실행하고 응답을 기록"""
+        from .callbacks import TimingCallbackHandler
+        from .history import count_tokens
+
+        # 검색이 분명한 턴은 LLM 호출과 동시에 DB 조회 시작 (도구 호출 시 결과를 이어받음)
+        prefetch = start_prefetch(
+            input_text, float(user_profile.latitude), float(user_profile.longitude), TOOL_FUNCTIONS
+        )
+
+        history_manager = get_history_manager()
+        with span("history.prepare"):
+            history_messages = history_manager.prepare(chat_history)
+        context = {
+            "input": input_text,
+            "latitude": float(user_profile.latitude),
+            "longitude": float(user_profile.longitude),
+            "chat_history": history_messages,
+        }
+
+        with span("route"):
+            route = classify(input_text)
+        started = time_module.perf_counter()
+        callbacks = [*(callbacks or []), TimingCallbackHandler(current_timings.get())]
+        with token_usage() as usage:
+            response = get_agent_executor(route.model).invoke(context, config={"callbacks": callbacks})
+        latency = time_module.perf_counter() - started
+        record("agent", latency)
+        route_stats.record(route, latency, usage)
+        if prefetch is not None:
+            prefetch.finish(response.get("intermediate_steps"))
+        logger.info(
+            f"Chat prompt tokens: session={chat_history.session_id} "
+            f"history={count_tokens(history_messages)} prompt={usage.prompt_tokens} "
+            f"completion={usage.completion_tokens} llm_calls={usage.successful_requests}"
+        )
+
+        response_data = response.get("output", "응답을 생성하지 못했습니다.")
+        with span("format"):
+            formatted_response = self.merge_tool_data(
+                self.format_response(response_data),
+                response.get("intermediate_steps"),
+            )
+        with span("history.record"):
+            history_manager.record_turn(chat_history, input_text, formatted_response)
+        return formatted_response
+
+    def merge_tool_data(self, formatted_response, intermediate_steps):
+        """LLM 응답(type/start_message/end_message)에 마지막 도구 결과의 data를 병합"""
+        tool_result = None
+        for _, observation in reversed(intermediate_steps or []):
+            if isinstance(observation, dict) and "data" in observation:
+                tool_result = observation
+                break
+
+        formatted_response.setdefault("data", [])
+        if formatted_response["type"] != "chat" and tool_result is not None:
+            # 목록 응답인데 도구 결과가 비어 있으면 도구 결과의 type을 따름
+            if formatted_response["type"] in LIST_RESPONSE_TYPES and tool_result["type"] not in LIST_RESPONSE_TYPES:
+                formatted_response["type"] = tool_result["type"]
+            formatted_response["data"] = tool_result["data"]
+        return formatted_response
+
     def get_initial_message(self, user_profile):
         """사용자 위치 정보를 포함한 초기 메시지 생성"""
         try:
@@ -713,8 +915,19 @@ class UnifiedChatAPIView(APIView):
             }
 
     def post(self, request):
-        temp_files = []  # 임시 파일 관리
+        """단계별 소요 시간을 기록하고, X-Chat-Timings 헤더가 있으면 응답에 timings 포함"""
+        timings = Timings()
+        token = current_timings.set(timings)
+        try:
+            with span("total"):
+                response = self._post(request)
+        finally:
+            current_timings.reset(token)
+        if wants_timings(request) and isinstance(response.data, dict):
+            response.data["timings"] = timings.as_dict()
+        return response
 
+    def _post(self, request):
         try:
             user_profile = request.user.profile
             if not (user_profile.latitude and user_profile.longitude):
@@ -728,16 +941,8 @@ class UnifiedChatAPIView(APIView):
 
             # 음성 입력 처리
             if 'audio' in request.FILES:
-                audio_file = request.FILES['audio']
-                temp_audio_path = os.path.join(tempfile.gettempdir(), f'temp_audio_{uuid.uuid4()}.wav')
-                temp_files.append(temp_audio_path)
-
-                with open(temp_audio_path, 'wb+') as destination:
-                    for chunk in audio_file.chunks():
-                        destination.write(chunk)
-
-                # 음성을 텍스트로 변환
-                input_text = transcribe_speech(temp_audio_path)
+                # 음성을 텍스트로 변환 (업로드 내용을 임시 파일 없이 바로 전달)
+                input_text = transcribe_speech(read_upload(request.FILES['audio']))
                 if not input_text:
                     return Response({
                         "type": "error",
@@ -758,32 +963,10 @@ class UnifiedChatAPIView(APIView):
             chat_history = self.get_or_create_history(session_id)
 
             # 버튼 클릭 처리
-            if input_text in ["근처 약국 찾아줘", "근처 병원 찾아줘"]:
-                # 사용자 메시지 저장
-                chat_history.add_message(HumanMessage(content=input_text))
-                
-                initial_response = {
-                    "type": "chat",
-                    "start_message": "네, 알겠습니다! 😊",
-                    "end_message": "근처를 검색해볼게요.",
-                    "data": []
-                }
+            if input_text in QUICK_REPLY_MESSAGES:
+                initial_response = QUICK_REPLY_ACK
 
-                context = {
-                    "input": input_text,
-                    "latitude": float(user_profile.latitude),
-                    "longitude": float(user_profile.longitude)
-                }
-
-                response = agent_with_chat_history.invoke(
-                    context,
-                    config={"configurable": {"session_id": session_id}},
-                )
-                response_data = response.get("output", "응답을 생성하지 못했습니다.")
-                formatted_response = self.format_response(response_data)
-                
-                # AI 응답 저장
-                chat_history.add_message(AIMessage(content=formatted_response["start_message"]))
+                formatted_response = self.respond(chat_history, input_text, user_profile)
 
                 result = {
                     "input_text": input_text,
@@ -801,24 +984,7 @@ class UnifiedChatAPIView(APIView):
                 return Response(result, status=status.HTTP_200_OK)
 
             # 일반 대화 처리
-            chat_history.add_message(HumanMessage(content=input_text))
-            
-            context = {
-                "input": input_text,
-                "latitude": float(user_profile.latitude),
-                "longitude": float(user_profile.longitude),
-                "chat_history": chat_history.messages  # 대화 기록 전달
-            }
-
-            response = agent_with_chat_history.invoke(
-                context,
-                config={"configurable": {"session_id": session_id}},
-            )
-            response_data = response.get("output", "응답을 생성하지 못했습니다.")
-            formatted_response = self.format_response(response_data)
-            
-            # AI 응답 저장
-            chat_history.add_message(AIMessage(content=formatted_response["start_message"]))
+            formatted_response = self.respond(chat_history, input_text, user_profile)
 
             result = {
                 "input_text": input_text,
@@ -836,28 +1002,52 @@ class UnifiedChatAPIView(APIView):
             # 3. 음성 응답 생성 (need_voice가 true일 경우)
             need_voice = request.data.get('need_voice', False)
             if need_voice:
-                temp_tts_path = os.path.join(tempfile.gettempdir(), f'temp_tts_{uuid.uuid4()}.mp3')
-                temp_files.append(temp_tts_path)
+                audio = self.synthesize_voice(formatted_response, request.data.get('audio_format'))
+                if audio:
+                    result.update(audio)
 
-                try:
-                    response_text = f"{formatted_response['start_message']} {formatted_response['end_message']}"
-                    tts = gTTS(text=response_text, lang='ko')
-                    tts.save(temp_tts_path)
+            return Response(result, status=status.HTTP_200_OK)
 
-                    with open(temp_tts_path, 'rb') as f:
-                        audio_content = base64.b64encode(f.read()).decode('utf-8')
+        except Exception as e:
+            logger.error(f"ChatBot error: {str(e)}")
+            return Response({
+                "type": "error",
+                "start_message": "처리 중 오류가 발생했습니다.",
+                "end_message": "다시 시도해주세요.",
+                "data": [],
+                "error": str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-                    result.update({
-                        "audio": audio_content,
-                        "audio_type": "audio/mp3"
-                    })
-                except Exception as e:
-                    logger.error(f"TTS generation error: {str(e)}")
 
-            return Response(result, status=status.HTTP_200_OK)
+class UnifiedChatStreamAPIView(UnifiedChatAPIView):
+    """음성/텍스트 통합 대화 API (Server-Sent Events 스트리밍)
+
+    이벤트 순서: ack → (transcript) → tool_result / token ... → message → (audio ...) → done
+    """
 
+    def post(self, request):
+        try:
+            user_profile = request.user.profile
+            if not (user_profile.latitude and user_profile.longitude):
+                return Response(
+                    {"error": "위치 정보가 설정되어 있지 않습니다."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            # 음성 입력은 내용만 읽어두고 변환은 스트림 안에서 진행
+            input_text = None
+            audio = None
+            if 'audio' in request.FILES:
+                audio = read_upload(request.FILES['audio'])
+            else:
+                input_text = request.data.get('message')
+                if not input_text:
+                    return Response(
+                        {"error": "메시지가 제공되지 않았습니다."},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
         except Exception as e:
-            logger.error(f"ChatBot error: {str(e)}")
+            logger.error(f"ChatBot stream error: {str(e)}")
             return Response({
                 "type": "error",
                 "start_message": "처리 중 오류가 발생했습니다.",
@@ -866,11 +1056,95 @@ class UnifiedChatAPIView(APIView):
                 "error": str(e)
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-        finally:
-            # 임시 파일 정리
-            for temp_file in temp_files:
-                if os.path.exists(temp_file):
-                    try:
-                        os.remove(temp_file)
-                    except Exception as e:
-                        logger.error(f"Error deleting temporary file: {str(e)}")
+        session_id = request.data.get("session_id", str(uuid.uuid4()))
+        need_voice = request.data.get('need_voice', False)
+
+        response = StreamingHttpResponse(
+            self.stream_events(user_profile, input_text, audio, session_id, need_voice, wants_timings(request)),
+            content_type="text/event-stream",
+        )
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"  # nginx 버퍼링 비활성화
+        return response
+
+    def stream_events(self, user_profile, input_text, audio, session_id, need_voice, include_timings=False):
+        location = {
+            "latitude": float(user_profile.latitude),
+            "longitude": float(user_profile.longitude)
+        }
+        # 응답 본문을 보내는 동안 실행되므로 요청 Timings는 별도 컨텍스트에 두고 단계 실행 시 사용
+        timings = Timings()
+        context = contextvars.copy_context()
+        context.run(current_timings.set, timings)
+
+        try:
+            # 1. 즉시 응답
+            yield sse_event("ack", {"session_id": session_id, "input_text": input_text})
+
+            # 2. 음성 입력 변환
+            if audio is not None:
+                input_text = context.run(transcribe_speech, audio)
+                if not input_text:
+                    yield sse_event("error", {
+                        "type": "error",
+                        "start_message": "음성을 텍스트로 변환하지 못했습니다.",
+                        "end_message": "다시 시도해주세요.",
+                        "data": []
+                    })
+                    return
+                yield sse_event("transcript", {"input_text": input_text})
+
+            if input_text in QUICK_REPLY_MESSAGES:
+                yield sse_event("message", QUICK_REPLY_ACK)
+
+            # 3. 에이전트 실행 (도구 결과와 토큰을 도착하는 대로 전송)
+            chat_history = self.get_or_create_history(session_id)
+            events = queue.Queue()
+            from .callbacks import QueueCallbackHandler
+
+            handler = QueueCallbackHandler(events)
+            run_in_background(
+                lambda: context.run(self.respond, chat_history, input_text, user_profile, callbacks=[handler]),
+                events,
+            )
+
+            formatted_response = None
+            for kind, payload in iter_events(events):
+                if kind == "result":
+                    formatted_response = payload
+                elif kind == "error":
+                    raise payload
+                else:
+                    yield sse_event(kind, payload)
+
+            yield sse_event("message", {
+                "input_text": input_text,
+                **formatted_response,
+                "session_id": session_id,
+                "location": location,
+            })
+
+            # 4. 음성 응답
+            if need_voice:
+                # 문장 단위로 합성되는 대로 전송 (첫 문장부터 재생 가능)
+                try:
+                    for chunk in self.iter_voice_chunks(formatted_response, timings):
+                        yield sse_event("audio", chunk)
+                except Exception as e:
+                    logger.error(f"TTS generation error: {str(e)}")
+
+            record("total", time_module.perf_counter() - timings.started, timings)
+            done = {"session_id": session_id}
+            if include_timings:
+                done["timings"] = timings.as_dict()
+            yield sse_event("done", done)
+
+        except Exception as e:
+            logger.error(f"ChatBot stream error: {str(e)}")
+            yield sse_event("error", {
+                "type": "error",
+                "start_message": "처리 중 오류가 발생했습니다.",
+                "end_message": "다시 시도해주세요.",
+                "data": [],
+                "error": str(e)
+            })
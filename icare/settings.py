@@ -218,5 +218,107 @@ LOGGING = {
     },
 }
 
+# 캐시 설정
+CACHE_DIR = os.path.join(BASE_DIR, 'cache')
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # 워커 간 공유되는 채팅 세션 저장소 (여러 서버 사용 시 DatabaseCache/Redis로 교체)
+    'chat_sessions': {
+        'BACKEND': env('CHAT_SESSION_CACHE_BACKEND', default='django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': env('CHAT_SESSION_CACHE_LOCATION', default=os.path.join(CACHE_DIR, 'chat_sessions')),
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+    # 워커/관리 명령 간 공유 캐시 (검색 결과, 데이터셋 버전 등)
+    'shared': {
+        'BACKEND': env('SHARED_CACHE_BACKEND', default='django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': env('SHARED_CACHE_LOCATION', default=os.path.join(CACHE_DIR, 'shared')),
+        'OPTIONS': {'MAX_ENTRIES': 20000},
+    },
+}
+
+# 채팅 검색 도구 결과 캐시 설정 (데이터 수집 명령 실행 시 자동 무효화)
+CHAT_SEARCH_CACHE = {
+    'LOCAL_CACHE': 'default',
+    'SHARED_CACHE': 'shared',
+    'TTL': env.int('CHAT_SEARCH_CACHE_TTL', default=300),
+    'CELL_METERS': env.int('CHAT_SEARCH_CACHE_CELL_METERS', default=100),
+}
+
+# 채팅 세션 저장소 설정
+CHAT_SESSION_STORE = {
+    'MAX_ENTRIES': env.int('CHAT_SESSION_MAX_ENTRIES', default=1000),
+    'IDLE_TTL': env.int('CHAT_SESSION_IDLE_TTL', default=1800),
+    'MAX_TURNS': env.int('CHAT_SESSION_MAX_TURNS', default=10),
+    'SHARED_CACHE': 'chat_sessions',
+    'SHARED_TTL': env.int('CHAT_SESSION_SHARED_TTL', default=60 * 60 * 24),
+    'REVALIDATE_INTERVAL': env.int('CHAT_SESSION_REVALIDATE_INTERVAL', default=5),
+}
+
+# 채팅 음성 응답(TTS) 엔진 (테스트/벤치마크는 chat.tts.OfflineToneBackend 사용 가능)
+CHAT_TTS = {
+    'BACKEND': env('CHAT_TTS_BACKEND', default='chat.tts.GttsBackend'),
+    'MAX_WORKERS': env.int('CHAT_TTS_MAX_WORKERS', default=4),
+    # 요청에 audio_format이 없을 때: base64(기존 audio 필드) 또는 url(audio_urls)
+    'AUDIO_FORMAT': env('CHAT_TTS_AUDIO_FORMAT', default='base64'),
+}
+
+# 채팅 음성 응답(TTS) 파일 캐시 (GET /chat/audio/<key>.mp3 로 제공)
+CHAT_TTS_CACHE = {
+    'DIRECTORY': env('CHAT_TTS_CACHE_DIR', default=os.path.join(CACHE_DIR, 'tts')),
+    'MAX_BYTES': env.int('CHAT_TTS_CACHE_MAX_BYTES', default=200 * 1024 * 1024),
+}
+
+# 검색이 분명한 턴은 첫 LLM 호출과 동시에 검색 도구의 DB 조회를 미리 시작
+CHAT_TOOL_PREFETCH = env.bool('CHAT_TOOL_PREFETCH', default=True)
+
+# 채팅 에이전트 모델 라우팅 (단순한 턴은 작은 모델, 여러 단계/모호한 턴만 큰 모델)
+CHAT_MODEL_ROUTING = {
+    'ENABLED': env.bool('CHAT_MODEL_ROUTING_ENABLED', default=True),
+    'SIMPLE_MODEL': env('CHAT_SIMPLE_MODEL', default='gpt-4o-mini'),
+    'COMPLEX_MODEL': env('CHAT_COMPLEX_MODEL', default='gpt-4o'),
+    'CLASSIFIER_MODEL': env('CHAT_ROUTER_CLASSIFIER_MODEL', default=None),
+}
+
+# 가짜 LLM/STT/TTS로 채팅 실행 (OpenAI/Google 호출 없음, 부하 테스트/개발용 - chat.offline.DEFAULT_OFFLINE 참고)
+CHAT_OFFLINE = {
+    'ENABLED': env.bool('CHAT_OFFLINE', default=False),
+    'LLM_LATENCY': env.float('CHAT_OFFLINE_LLM_LATENCY', default=0.6),
+    'STT_LATENCY': env.float('CHAT_OFFLINE_STT_LATENCY', default=0.4),
+}
+
+# 처방전 OCR 백그라운드 작업 큐 (registerPrescription.jobs.DEFAULT_OCR_QUEUE 참고)
+PRESCRIPTION_OCR_QUEUE = {
+    'WORKERS': env.int('PRESCRIPTION_OCR_WORKERS', default=2),
+    'MAX_PENDING': env.int('PRESCRIPTION_OCR_MAX_PENDING', default=20),
+    'MAX_ATTEMPTS': env.int('PRESCRIPTION_OCR_MAX_ATTEMPTS', default=3),
+    'RETRY_BACKOFF': env.float('PRESCRIPTION_OCR_RETRY_BACKOFF', default=2.0),
+    'BATCH_WORKERS': env.int('PRESCRIPTION_OCR_BATCH_WORKERS', default=4),
+}
+
+# 처방전 OCR 업로드 전 이미지 전처리 (registerPrescription.preprocess.DEFAULT_OCR_IMAGE 참고)
+PRESCRIPTION_OCR_IMAGE = {
+    'ENABLED': env.bool('PRESCRIPTION_OCR_PREPROCESS', default=True),
+    'MAX_SIDE': env.int('PRESCRIPTION_OCR_MAX_SIDE', default=1960),
+}
+
+# 처방전 OCR 결과 규칙 기반 추출, 신뢰도가 낮을 때만 GPT 사용 (registerPrescription.parser.DEFAULT_OCR_PARSER 참고)
+PRESCRIPTION_OCR_PARSER = {
+    'ENABLED': env.bool('PRESCRIPTION_OCR_PARSER', default=True),
+    'MIN_CONFIDENCE': env.float('PRESCRIPTION_OCR_PARSER_MIN_CONFIDENCE', default=0.8),
+    'TABLE_DETECTION': env.bool('PRESCRIPTION_OCR_TABLE_DETECTION', default=False),
+}
+
+# 같은 처방전 사진 재업로드 시 이전 OCR/추출 결과 재사용 (registerPrescription.dedup.DEFAULT_OCR_DEDUP 참고)
+PRESCRIPTION_OCR_DEDUP = {
+    'ENABLED': env.bool('PRESCRIPTION_OCR_DEDUP', default=True),
+    'MAX_DISTANCE': env.int('PRESCRIPTION_OCR_DEDUP_MAX_DISTANCE', default=6),
+}
+
+# 프롬프트에 포함할 대화 기록 최대 토큰 수 (초과 시 오래된 턴을 요약)
+CHAT_HISTORY_MAX_TOKENS = env.int('CHAT_HISTORY_MAX_TOKENS', default=1500)
+
 # Google Cloud 설정
 GOOGLE_APPLICATION_CREDENTIALS = os.getenv('GOOGLE_APPLICATION_CREDENTIALS')
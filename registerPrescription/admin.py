@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Prescription, Medicine
+from .models import OcrCache, OcrJob, Prescription, Medicine
 
 class MedicineInline(admin.TabularInline):
     model = Medicine
@@ -18,3 +18,18 @@ class MedicineAdmin(admin.ModelAdmin):
     list_display = ['name', 'dosage', 'frequency', 'duration', 'prescription']
     list_filter = ['created_at']
     search_fields = ['name']
+
+
+@admin.register(OcrJob)
+class OcrJobAdmin(admin.ModelAdmin):
+    list_display = ['job_id', 'user', 'child_name', 'status', 'attempts', 'deduplicated', 'created_at', 'finished_at']
+    list_filter = ['status', 'deduplicated', 'created_at']
+    search_fields = ['job_id', 'user__username', 'child_name']
+    readonly_fields = ['result', 'error']
+
+
+@admin.register(OcrCache)
+class OcrCacheAdmin(admin.ModelAdmin):
+    list_display = ['image_sha256', 'user', 'prescription', 'created_at', 'updated_at']
+    search_fields = ['image_sha256', 'user__username']
+    readonly_fields = ['ocr_result', 'extracted']
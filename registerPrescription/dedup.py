@@ -0,0 +1,134 @@
+import hashlib
+import io
+import logging
+import re
+from datetime import timedelta
+from typing import NamedTuple, Optional
+
+from django.conf import settings
+from django.db import IntegrityError
+from django.utils import timezone
+
+from .models import OcrCache
+from .parser import parse_date, parse_decimal, parse_int
+
+logger = logging.getLogger(__name__)
+
+# 같은 사진 재업로드 감지 기본 설정 (settings.PRESCRIPTION_OCR_DEDUP 로 덮어쓸 수 있음)
+DEFAULT_OCR_DEDUP = {
+    "ENABLED": True,
+    # dHash(64비트) 해밍 거리가 이 이하면 재촬영/재압축한 사진일 수 있음 (같은 약국 양식의 다른 약봉투도 4~7이 나오므로
+    # 이것만으로 같은 사진으로 보지 않고, 새로 OCR/추출한 결과가 캐시의 추출 결과와 같을 때만 기존 처방전을 재사용)
+    "MAX_DISTANCE": 6,
+    "LOOKBACK": 50,      # 거의 같은 사진을 찾을 때 비교할 사용자별 최근 캐시 수
+    "TTL_DAYS": 30,      # 이보다 오래된 캐시는 사용하지 않음
+}
+
+
+class ImageHashes(NamedTuple):
+    sha256: str
+    dhash: Optional[str]  # 16자리 16진수, 이미지를 열 수 없으면(PDF 등) None → 정확히 같은 파일만 찾음
+
+
+def _config():
+    return {**DEFAULT_OCR_DEDUP, **getattr(settings, "PRESCRIPTION_OCR_DEDUP", {})}
+
+
+def dhash(image: bytes, size: int = 8) -> Optional[str]:
+    """차이 해시: (size+1)×size 흑백 축소본에서 가로로 이웃한 픽셀의 밝기 비교 비트"""
+    try:
+        from PIL import Image, ImageOps
+
+        with Image.open(io.BytesIO(image)) as source:
+            source.draft("L", (size * 8, size * 8))  # JPEG는 축소 디코딩으로 빠르게 열기
+            picture = ImageOps.exif_transpose(source).convert("L").resize((size + 1, size))
+    except Exception as e:
+        logger.warning(f"dHash 계산 실패: {e}")
+        return None
+
+    pixels = list(picture.getdata())
+    bits = 0
+    for row in range(size):
+        for column in range(size):
+            left = pixels[row * (size + 1) + column]
+            right = pixels[row * (size + 1) + column + 1]
+            bits = (bits << 1) | (left > right)
+    return f"{bits:0{size * size // 4}x}"
+
+
+def image_hashes(image: bytes) -> ImageHashes:
+    return ImageHashes(hashlib.sha256(image).hexdigest(), dhash(image))
+
+
+def hamming(a: str, b: str) -> int:
+    return bin(int(a, 16) ^ int(b, 16)).count("1")
+
+
+def _recent(user, config):
+    return OcrCache.objects.filter(
+        user=user, updated_at__gte=timezone.now() - timedelta(days=config["TTL_DAYS"])
+    )
+
+
+def find_cached(user, hashes: ImageHashes) -> Optional[OcrCache]:
+    """같은 사용자가 올린 같은(SHA-256) 사진의 캐시 (OCR/추출을 건너뛰어도 되는 경우)"""
+    config = _config()
+    if not config["ENABLED"]:
+        return None
+    return _recent(user, config).filter(image_sha256=hashes.sha256).first()
+
+
+def _medicine_key(medicine):
+    return (
+        re.sub(r"\s+", "", str(medicine.get("약품명") or "")),
+        parse_decimal(medicine.get("투약량")),
+        parse_int(medicine.get("투약횟수"), None),
+        parse_int(medicine.get("투약일수"), None),
+    )
+
+
+def _prescription_number(extracted):
+    number = str(extracted.get("처방전번호") or "")
+    # 규칙 기반 추출은 번호를 임의로 만들므로(RX-xxxxxxxx) 비교하지 않음
+    return None if number.startswith("RX-") else number or None
+
+
+def same_prescription(a: dict, b: dict) -> bool:
+    """두 추출 결과가 같은 처방전인지 (조제일자, 처방전 번호, 약품 목록이 모두 같아야 함)"""
+    date_a = parse_date(str(a.get("조제일자") or ""))
+    if date_a is None or date_a != parse_date(str(b.get("조제일자") or "")):
+        return False
+    number_a, number_b = _prescription_number(a), _prescription_number(b)
+    if number_a and number_b and number_a != number_b:
+        return False
+    medicines_a = sorted(map(_medicine_key, a.get("약품목록") or []), key=repr)
+    return bool(medicines_a) and medicines_a == sorted(map(_medicine_key, b.get("약품목록") or []), key=repr)
+
+
+def find_same_prescription(user, hashes: ImageHashes, extracted: dict) -> Optional[OcrCache]:
+    """거의 같은(dHash) 사진 중 새로 추출한 결과와 같은 처방전이 등록된 캐시 (재촬영한 약봉투)"""
+    config = _config()
+    if not config["ENABLED"] or hashes.dhash is None:
+        return None
+    candidates = (
+        _recent(user, config).exclude(image_dhash="").exclude(image_sha256=hashes.sha256)
+        .filter(prescription__isnull=False).select_related("prescription").order_by("-updated_at")
+    )
+    for cache in candidates[:config["LOOKBACK"]]:
+        if (hamming(cache.image_dhash, hashes.dhash) <= config["MAX_DISTANCE"] and cache.extracted
+                and same_prescription(extracted, cache.extracted)):
+            return cache
+    return None
+
+
+def remember(user, hashes: ImageHashes, **fields) -> None:
+    """OCR 결과(ocr_result), 추출 결과(extracted), 등록된 처방전(prescription)을 캐시에 저장"""
+    if not _config()["ENABLED"]:
+        return
+    try:
+        OcrCache.objects.update_or_create(
+            user=user, image_sha256=hashes.sha256, defaults={"image_dhash": hashes.dhash or "", **fields}
+        )
+    except IntegrityError:
+        # 같은 사진을 동시에 처리한 다른 작업이 먼저 저장함
+        OcrCache.objects.filter(user=user, image_sha256=hashes.sha256).update(updated_at=timezone.now(), **fields)
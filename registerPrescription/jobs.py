@@ -0,0 +1,199 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .dedup import find_cached, find_same_prescription, remember
+from .models import OcrJob
+
+logger = logging.getLogger(__name__)
+
+# 처방전 OCR 작업 큐 기본 설정 (settings.PRESCRIPTION_OCR_QUEUE 로 덮어쓸 수 있음)
+DEFAULT_OCR_QUEUE = {
+    "WORKERS": 2,          # 동시에 처리할 작업 수 (= OCR/LLM 동시 호출 수 상한)
+    "MAX_PENDING": 20,     # 대기 + 처리 중 작업 최대 수 (넘으면 새 요청은 429)
+    "MAX_ATTEMPTS": 3,     # 일시적 오류(네트워크, 5xx, 429) 재시도를 포함한 최대 시도 횟수
+    "RETRY_BACKOFF": 2.0,  # 첫 재시도 대기(초), 이후 두 배씩
+    "STALE_AFTER": 600,    # 이 시간(초)이 지나도 끝나지 않은 작업은 실패로 표시 (프로세스 재시작 등)
+    "BATCH_WORKERS": 4,    # 여러 장 등록(ocr/batch/)에서 동시에 처리할 이미지 수 (프로세스 전체)
+    "BATCH_MAX_IMAGES": 10,
+}
+
+
+class QueueFull(Exception):
+    """대기 중인 작업이 MAX_PENDING을 넘음"""
+
+
+class TransientOcrError(Exception):
+    """다시 시도하면 성공할 수 있는 오류 (네트워크 오류, OCR/LLM 서버 5xx/429)"""
+
+
+def ocr_queue_config():
+    return {**DEFAULT_OCR_QUEUE, **getattr(settings, "PRESCRIPTION_OCR_QUEUE", {})}
+
+
+def _update(job_id, **fields):
+    OcrJob.objects.filter(pk=job_id).update(**fields)
+
+
+def recognize(view, image: bytes, filename: str, content_type: str, child_name: str, config,
+              ocr_result=None, on_attempt=None, on_ocr=None):
+    """OCR → 추출, (OCR 결과, 추출 결과) 반환
+
+    일시적 오류는 MAX_ATTEMPTS까지 재시도하고, 이미 받은 OCR 결과(ocr_result)는 재시도에서 다시 요청하지 않는다.
+    """
+    for attempt in range(1, config["MAX_ATTEMPTS"] + 1):
+        if on_attempt:
+            on_attempt(attempt)
+        try:
+            if ocr_result is None:
+                ocr_result = view.read_image(image, filename, content_type)
+                if on_ocr:
+                    on_ocr(ocr_result)
+            return ocr_result, view.extract(ocr_result, child_name)
+        except TransientOcrError as e:
+            if attempt == config["MAX_ATTEMPTS"]:
+                raise
+            delay = config["RETRY_BACKOFF"] * 2 ** (attempt - 1)
+            logger.warning(f"OCR {filename} attempt {attempt} failed, retrying in {delay:.1f}s: {e}")
+            time.sleep(delay)
+
+
+def process_job(job_id, image: bytes, filename: str, content_type: str, config=None, hashes=None):
+    """OCR → 추출 → 저장
+
+    저장은 한 번만. 같은 사진의 캐시가 있으면 OCR(과 추출)을 건너뛰고,
+    거의 같은 사진으로 이미 등록한 처방전과 추출 결과가 같으면 새로 저장하지 않고 그 처방전을 돌려준다.
+    """
+    from .views import ClovaOCRAPIView, prescription_payload
+
+    config = config or ocr_queue_config()
+    close_old_connections()
+    try:
+        job = OcrJob.objects.select_related("user").get(pk=job_id)
+        _update(job_id, status=OcrJob.STATUS_RUNNING, started_at=timezone.now())
+        view = ClovaOCRAPIView()
+
+        cached = find_cached(job.user, hashes) if hashes else None
+        final_result = cached.extracted if cached else None
+        if cached:
+            logger.info(f"OCR job {job_id} reuses cached {'extraction' if final_result else 'OCR result'}")
+        if final_result is None:
+            _, final_result = recognize(
+                view, image, filename, content_type, job.child_name, config,
+                ocr_result=cached.ocr_result if cached else None,
+                on_attempt=lambda attempt: _update(job_id, attempts=attempt),
+                on_ocr=(lambda ocr_result: remember(job.user, hashes, ocr_result=ocr_result)) if hashes else None,
+            )
+
+        same = find_same_prescription(job.user, hashes, final_result) if hashes and not cached else None
+        if same is not None:
+            logger.info(f"OCR job {job_id} matches prescription {same.prescription_id} of a similar photo")
+            prescription, data = same.prescription, prescription_payload(same.prescription)
+        else:
+            prescription, data = view._save_prescription_data(job.user, job.child_name, final_result)
+        if hashes:
+            remember(job.user, hashes, extracted=final_result, prescription=prescription)
+        _update(job_id, status=OcrJob.STATUS_SUCCEEDED, result=data, prescription=prescription,
+                deduplicated=cached is not None or same is not None, error="", finished_at=timezone.now())
+        logger.info(f"OCR job {job_id} succeeded: prescription={prescription.prescription_id}")
+    except Exception as e:
+        logger.exception(f"OCR job {job_id} failed")
+        _update(job_id, status=OcrJob.STATUS_FAILED, error=str(e), finished_at=timezone.now())
+    finally:
+        close_old_connections()
+
+
+class OcrJobQueue:
+    """프로세스 내 OCR 작업 풀 (대기 수 제한)
+
+    웹 워커는 작업을 넣고 바로 응답하고, OCR 업체/LLM 호출은 WORKERS개 스레드에서만 일어난다.
+    여러 장 등록(get_batch_executor)의 이미지도 reserve()/release()로 같은 대기 수 제한을 받는다.
+    """
+
+    def __init__(self, workers, max_pending, config=None):
+        self.max_pending = max_pending
+        self.config = config
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prescription-ocr")
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    @property
+    def pending(self):
+        return self._pending
+
+    def reserve(self, count=1):
+        """대기 수 count개 확보 (모자라면 하나도 확보하지 않고 QueueFull)"""
+        with self._lock:
+            if self._pending + count > self.max_pending:
+                raise QueueFull(f"대기 중인 작업이 {self.max_pending}개를 넘었습니다.")
+            self._pending += count
+
+    def release(self, *_):
+        """확보한 대기 수 하나 반환 (Future.add_done_callback에도 사용)"""
+        with self._lock:
+            self._pending -= 1
+
+    def submit(self, job: OcrJob, image: bytes, filename: str, content_type: str, hashes=None):
+        self.reserve()
+        try:
+            self._executor.submit(self._run, job.job_id, image, filename, content_type, hashes)
+        except Exception:
+            self.release()
+            raise
+
+    def _run(self, job_id, image, filename, content_type, hashes):
+        try:
+            process_job(job_id, image, filename, content_type, self.config, hashes)
+        finally:
+            self.release()
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_ocr_queue() -> OcrJobQueue:
+    """settings.PRESCRIPTION_OCR_QUEUE 설정으로 프로세스 전역 작업 큐 생성"""
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                config = ocr_queue_config()
+                _queue = OcrJobQueue(config["WORKERS"], config["MAX_PENDING"], config)
+    return _queue
+
+
+_batch_executor = None
+
+
+def get_batch_executor() -> ThreadPoolExecutor:
+    """여러 장 등록용 프로세스 전역 스레드 풀 (동시 요청이 많아도 OCR/LLM 동시 호출은 BATCH_WORKERS개까지)"""
+    global _batch_executor
+    if _batch_executor is None:
+        with _queue_lock:
+            if _batch_executor is None:
+                _batch_executor = ThreadPoolExecutor(
+                    max_workers=ocr_queue_config()["BATCH_WORKERS"], thread_name_prefix="prescription-ocr-batch"
+                )
+    return _batch_executor
+
+
+def expire_stale(job: OcrJob) -> OcrJob:
+    """STALE_AFTER가 지나도 끝나지 않은 작업(처리하던 프로세스가 재시작된 경우 등)을 실패로 표시"""
+    if job.status in OcrJob.FINISHED_STATUSES:
+        return job
+    if timezone.now() - job.created_at > timedelta(seconds=ocr_queue_config()["STALE_AFTER"]):
+        # 그 사이 다른 프로세스가 끝낸 작업은 덮어쓰지 않음
+        OcrJob.objects.filter(pk=job.pk, status__in=[OcrJob.STATUS_QUEUED, OcrJob.STATUS_RUNNING]).update(
+            status=OcrJob.STATUS_FAILED,
+            error="처리 시간이 초과되었습니다. 다시 등록해주세요.",
+            finished_at=timezone.now(),
+        )
+        job.refresh_from_db()
+    return job
@@ -0,0 +1,105 @@
+import difflib
+import os
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from registerPrescription.preprocess import DEFAULT_OCR_IMAGE, EXTENSION_FORMATS, prepare_image
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".tif", ".tiff")
+
+
+class Command(BaseCommand):
+    help = (
+        'OCR 업로드 전 이미지 전처리 벤치마크. 처방전/약봉투 사진에 대해 전처리 시간과 '
+        '원본/전처리 후 업로드 크기를 비교합니다. --ocr을 주면 두 이미지로 Clova OCR을 실제 호출해 '
+        'OCR 지연시간과 인식 텍스트 유사도도 비교합니다 (OCR 호출 비용 발생).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+', help='이미지 파일 또는 이미지가 있는 디렉터리')
+        parser.add_argument('--max-side', type=int, help='긴 변 최대 픽셀 (기본: 설정값)')
+        parser.add_argument('--quality', type=int, help='JPEG 품질 (기본: 설정값)')
+        parser.add_argument('--no-crop', action='store_true', help='문서 영역 자르기 끄기')
+        parser.add_argument('--ocr', action='store_true', help='원본/전처리 이미지로 Clova OCR 호출 비교')
+
+    def handle(self, *args, **options):
+        files = self.collect(options['paths'])
+        if not files:
+            raise CommandError('이미지 파일이 없습니다.')
+
+        config = {**DEFAULT_OCR_IMAGE, **getattr(settings, 'PRESCRIPTION_OCR_IMAGE', {}), 'ENABLED': True}
+        if options['max_side']:
+            config['MAX_SIDE'] = options['max_side']
+        if options['quality']:
+            config['JPEG_QUALITY'] = options['quality']
+        if options['no_crop']:
+            config['CROP'] = False
+
+        view = None
+        if options['ocr']:
+            from registerPrescription.views import ClovaOCRAPIView
+            view = ClovaOCRAPIView()
+
+        prepare_times, original_sizes, processed_sizes = [], [], []
+        original_ocr, processed_ocr, similarities = [], [], []
+        self.stdout.write(
+            f"{'image':<32} {'orig(KB)':>9} {'sent(KB)':>9} {'ratio':>6} {'prep(ms)':>9}"
+            + (f" {'ocr orig(s)':>12} {'ocr sent(s)':>12} {'text sim':>9}" if view else "")
+        )
+        for path in files:
+            with open(path, 'rb') as f:
+                image = f.read()
+            started = time.perf_counter()
+            prepared = prepare_image(image, os.path.basename(path), config=config)
+            prepare_times.append((time.perf_counter() - started) * 1000)
+            original_sizes.append(len(image))
+            processed_sizes.append(len(prepared.data))
+
+            line = (
+                f"{os.path.basename(path)[:32]:<32} {len(image) / 1024:>9.0f} {len(prepared.data) / 1024:>9.0f} "
+                f"{len(prepared.data) / len(image):>6.0%} {prepare_times[-1]:>9.0f}"
+            )
+            if view:
+                original_format = EXTENSION_FORMATS.get(os.path.splitext(path)[1].lower(), 'jpg')
+                original_text, original_time = self.ocr(view, image, path, original_format)
+                processed_text, processed_time = self.ocr(view, prepared.data, path, prepared.format)
+                similarity = difflib.SequenceMatcher(None, original_text, processed_text).ratio()
+                original_ocr.append(original_time)
+                processed_ocr.append(processed_time)
+                similarities.append(similarity)
+                line += f" {original_time:>12.2f} {processed_time:>12.2f} {similarity:>9.0%}"
+            self.stdout.write(line)
+
+        self.stdout.write(
+            f"\nimages={len(files)} upload {sum(original_sizes) / 1024 / 1024:.1f}MB → "
+            f"{sum(processed_sizes) / 1024 / 1024:.1f}MB ({sum(processed_sizes) / sum(original_sizes):.0%}), "
+            f"prep p50={statistics.median(prepare_times):.0f}ms max={max(prepare_times):.0f}ms"
+        )
+        if view:
+            self.stdout.write(
+                f"OCR p50 {statistics.median(original_ocr):.2f}s → {statistics.median(processed_ocr):.2f}s, "
+                f"text similarity mean={statistics.mean(similarities):.0%} min={min(similarities):.0%}"
+            )
+
+    def collect(self, paths):
+        files = []
+        for path in paths:
+            if os.path.isdir(path):
+                files.extend(
+                    os.path.join(path, name) for name in sorted(os.listdir(path))
+                    if name.lower().endswith(IMAGE_EXTENSIONS)
+                )
+            elif os.path.isfile(path):
+                files.append(path)
+        return files
+
+    def ocr(self, view, image, path, image_format):
+        """OCR 1회 호출, (인식 텍스트, 소요 시간) 반환"""
+        started = time.perf_counter()
+        result = view.run_ocr(image, os.path.basename(path), 'image/jpeg', image_format)
+        elapsed = time.perf_counter() - started
+        text = " ".join(field.get("inferText", "") for field in result["images"][0].get("fields", []))
+        return text, elapsed
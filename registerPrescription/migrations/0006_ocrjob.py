@@ -0,0 +1,80 @@
+import uuid
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("registerPrescription", "0005_alter_prescription_id"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OcrJob",
+            fields=[
+                (
+                    "job_id",
+                    models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False),
+                ),
+                ("child_name", models.CharField(blank=True, max_length=100, verbose_name="아동 이름")),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("queued", "대기"),
+                            ("running", "처리 중"),
+                            ("succeeded", "완료"),
+                            ("failed", "실패"),
+                        ],
+                        default="queued",
+                        max_length=20,
+                        verbose_name="상태",
+                    ),
+                ),
+                ("attempts", models.PositiveSmallIntegerField(default=0, verbose_name="시도 횟수")),
+                ("error", models.TextField(blank=True, verbose_name="오류")),
+                (
+                    "result",
+                    models.JSONField(
+                        blank=True,
+                        encoder=django.core.serializers.json.DjangoJSONEncoder,
+                        null=True,
+                        verbose_name="등록 결과",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("started_at", models.DateTimeField(blank=True, null=True)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "prescription",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="ocr_jobs",
+                        to="registerPrescription.prescription",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="ocr_jobs",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "처방전 OCR 작업",
+                "verbose_name_plural": "처방전 OCR 작업 목록",
+                "db_table": "ocr_jobs",
+                "ordering": ["-created_at"],
+                "indexes": [models.Index(fields=["user", "created_at"], name="ocr_jobs_user_created_idx")],
+            },
+        ),
+    ]
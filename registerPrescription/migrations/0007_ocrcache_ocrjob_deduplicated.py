@@ -0,0 +1,58 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("registerPrescription", "0006_ocrjob"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ocrjob",
+            name="deduplicated",
+            field=models.BooleanField(default=False, verbose_name="이전 결과 재사용"),
+        ),
+        migrations.CreateModel(
+            name="OcrCache",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("image_sha256", models.CharField(max_length=64, verbose_name="이미지 SHA-256")),
+                ("image_dhash", models.CharField(blank=True, max_length=16, verbose_name="이미지 dHash")),
+                ("ocr_result", models.JSONField(verbose_name="OCR 결과")),
+                ("extracted", models.JSONField(blank=True, null=True, verbose_name="추출 결과")),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "prescription",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="ocr_caches",
+                        to="registerPrescription.prescription",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="ocr_caches",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "처방전 OCR 캐시",
+                "verbose_name_plural": "처방전 OCR 캐시 목록",
+                "db_table": "ocr_caches",
+                "indexes": [models.Index(fields=["user", "updated_at"], name="ocr_caches_user_updated_idx")],
+                "constraints": [
+                    models.UniqueConstraint(fields=("user", "image_sha256"), name="ocr_caches_user_sha256_uniq")
+                ],
+            },
+        ),
+    ]
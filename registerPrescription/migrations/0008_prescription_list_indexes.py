@@ -0,0 +1,19 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("registerPrescription", "0007_ocrcache_ocrjob_deduplicated"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="prescription",
+            index=models.Index(fields=["child", "created_at"], name="prescriptions_child_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="prescription",
+            index=models.Index(fields=["child", "prescription_date"], name="prescriptions_child_date_idx"),
+        ),
+    ]
@@ -0,0 +1,67 @@
+import re
+from datetime import timedelta
+
+from django.db import migrations, models
+
+NUMBER = re.compile(r"\d[\d,]*(?:\.\d+)?")
+BATCH_SIZE = 1000
+
+
+def parse_int(value):
+    """OCR로 저장된 문자열 정리 ("6,400원" → 6400, "3일" → 3, 빈 값 → 0)"""
+    match = NUMBER.search(value or "")
+    return int(float(match.group().replace(",", ""))) if match else 0
+
+
+def cleanse_numbers(apps, schema_editor):
+    """정수 컬럼으로 바꾸기 전에 total_amount, duration 문자열을 숫자만 남김"""
+    Prescription = apps.get_model("registerPrescription", "Prescription")
+    changed = []
+    for prescription in Prescription.objects.only("prescription_id", "total_amount", "duration").iterator():
+        total_amount = str(parse_int(prescription.total_amount))
+        duration = str(min(parse_int(prescription.duration), 32767))
+        if (total_amount, duration) != (prescription.total_amount, prescription.duration):
+            prescription.total_amount, prescription.duration = total_amount, duration
+            changed.append(prescription)
+    Prescription.objects.bulk_update(changed, ["total_amount", "duration"], batch_size=BATCH_SIZE)
+
+
+def fill_end_dates(apps, schema_editor):
+    Prescription = apps.get_model("registerPrescription", "Prescription")
+    changed = []
+    for prescription in Prescription.objects.only("prescription_id", "prescription_date", "duration").iterator():
+        if prescription.prescription_date:
+            prescription.end_date = prescription.prescription_date + timedelta(days=prescription.duration or 0)
+            changed.append(prescription)
+    Prescription.objects.bulk_update(changed, ["end_date"], batch_size=BATCH_SIZE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("registerPrescription", "0008_prescription_list_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(cleanse_numbers, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="prescription",
+            name="total_amount",
+            field=models.PositiveIntegerField(default=0, verbose_name="총액"),
+        ),
+        migrations.AlterField(
+            model_name="prescription",
+            name="duration",
+            field=models.PositiveSmallIntegerField(default=0, verbose_name="투약일수"),
+        ),
+        migrations.AddField(
+            model_name="prescription",
+            name="end_date",
+            field=models.DateField(blank=True, null=True, verbose_name="투약 종료일"),
+        ),
+        migrations.RunPython(fill_end_dates, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="prescription",
+            index=models.Index(fields=["child", "end_date"], name="prescriptions_child_end_idx"),
+        ),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("registerPrescription", "0009_prescription_numeric_columns_end_date"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="medicine",
+            name="dosage",
+            field=models.DecimalField(decimal_places=2, max_digits=6, verbose_name="복용량"),
+        ),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("registerPrescription", "0010_alter_medicine_dosage"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="medicine",
+            name="dosage",
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=6, null=True, verbose_name="복용량"),
+        ),
+    ]
@@ -1,5 +1,9 @@
+import uuid
+from datetime import timedelta
+
 from django.db import models
 from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 from children.models import Children
 
 class Prescription(models.Model):
@@ -9,8 +13,9 @@ class Prescription(models.Model):
     prescription_number = models.CharField(max_length=100, verbose_name='처방전 번호')
     prescription_date = models.DateField(verbose_name='처방일자')
     pharmacy_address = models.CharField(max_length=200, verbose_name='약국주소', blank=True)
-    total_amount = models.CharField(max_length=50, verbose_name='총액', blank=True)
-    duration = models.CharField(max_length=50, verbose_name='투약일수', blank=True)
+    total_amount = models.PositiveIntegerField(default=0, verbose_name='총액')
+    duration = models.PositiveSmallIntegerField(default=0, verbose_name='투약일수')
+    end_date = models.DateField(null=True, blank=True, verbose_name='투약 종료일')  # 처방일 + 투약일수, save()에서 계산
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -18,10 +23,28 @@ class Prescription(models.Model):
         verbose_name = '처방전'
         verbose_name_plural = '처방전 목록'
         db_table = 'prescriptions'
+        # 목록 keyset 페이지네이션용 (정렬 동일 값은 InnoDB 보조 인덱스에 포함된 PK로 구분)
+        indexes = [
+            models.Index(fields=['child', 'created_at'], name='prescriptions_child_created_idx'),
+            models.Index(fields=['child', 'prescription_date'], name='prescriptions_child_date_idx'),
+            # 복용 중인 처방전 조회 (end_date > 오늘)
+            models.Index(fields=['child', 'end_date'], name='prescriptions_child_end_idx'),
+        ]
 
     def __str__(self):
         return f"{self.child.child_name}의 처방전 ({self.prescription_date})"
 
+    def save(self, *args, **kwargs):
+        self.end_date = medication_end_date(self.prescription_date, self.duration)
+        super().save(*args, **kwargs)
+
+
+def medication_end_date(prescription_date, duration):
+    """투약 종료일 (처방일 + 투약일수, bulk_create처럼 save()를 거치지 않는 경로에서도 사용)"""
+    if not prescription_date:
+        return None
+    return prescription_date + timedelta(days=duration or 0)
+
 class Medicine(models.Model):
     medicine_id = models.AutoField(primary_key=True)
     prescription = models.ForeignKey(
@@ -31,7 +54,8 @@ class Medicine(models.Model):
         db_column='prescription_id'
     )
     name = models.CharField(max_length=100, verbose_name='약품명', db_column='medicine_name')
-    dosage = models.IntegerField(verbose_name='복용량')
+    # 물약 0.5, 반 알(1/2) 등, 읽을 수 없으면 비워 둠
+    dosage = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True, verbose_name='복용량')
     frequency = models.IntegerField(verbose_name='투약횟수', null=True, default=0)
     duration = models.IntegerField(verbose_name='투약일수', null=True, default=0)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -43,4 +67,73 @@ class Medicine(models.Model):
         db_table = 'medicines'
 
     def __str__(self):
-        return f"{self.name} (복용량: {self.dosage})"
\ No newline at end of file
+        return f"{self.name} (복용량: {self.dosage})"
+
+
+class OcrJob(models.Model):
+    """처방전 OCR 등록 작업 (요청은 바로 202로 응답하고 OCR/추출/저장은 백그라운드에서 처리)"""
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_SUCCEEDED = 'succeeded'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, '대기'),
+        (STATUS_RUNNING, '처리 중'),
+        (STATUS_SUCCEEDED, '완료'),
+        (STATUS_FAILED, '실패'),
+    ]
+    FINISHED_STATUSES = (STATUS_SUCCEEDED, STATUS_FAILED)
+
+    job_id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='ocr_jobs')
+    child_name = models.CharField(max_length=100, verbose_name='아동 이름', blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_QUEUED, verbose_name='상태')
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name='시도 횟수')
+    deduplicated = models.BooleanField(default=False, verbose_name='이전 결과 재사용')
+    error = models.TextField(blank=True, verbose_name='오류')
+    result = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder, verbose_name='등록 결과')
+    prescription = models.ForeignKey(
+        Prescription, on_delete=models.SET_NULL, null=True, blank=True, related_name='ocr_jobs'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = '처방전 OCR 작업'
+        verbose_name_plural = '처방전 OCR 작업 목록'
+        db_table = 'ocr_jobs'
+        indexes = [models.Index(fields=['user', 'created_at'], name='ocr_jobs_user_created_idx')]
+
+    def __str__(self):
+        return f"OCR 작업 {self.job_id} ({self.status})"
+
+
+class OcrCache(models.Model):
+    """사용자별 처방전 이미지 OCR/추출 결과
+
+    같은 사진을 다시 올리면 OCR/GPT 호출 없이 재사용하고, 거의 같은(dHash) 사진은 새로 추출한 결과가 같을 때만 처방전을 재사용
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='ocr_caches')
+    image_sha256 = models.CharField(max_length=64, verbose_name='이미지 SHA-256')
+    image_dhash = models.CharField(max_length=16, blank=True, verbose_name='이미지 dHash')
+    ocr_result = models.JSONField(verbose_name='OCR 결과')
+    extracted = models.JSONField(null=True, blank=True, verbose_name='추출 결과')
+    prescription = models.ForeignKey(
+        Prescription, on_delete=models.SET_NULL, null=True, blank=True, related_name='ocr_caches'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = '처방전 OCR 캐시'
+        verbose_name_plural = '처방전 OCR 캐시 목록'
+        db_table = 'ocr_caches'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'image_sha256'], name='ocr_caches_user_sha256_uniq'),
+        ]
+        indexes = [models.Index(fields=['user', 'updated_at'], name='ocr_caches_user_updated_idx')]
+
+    def __str__(self):
+        return f"OCR 캐시 {self.image_sha256[:12]}"
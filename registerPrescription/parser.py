@@ -0,0 +1,286 @@
+import logging
+import re
+import statistics
+import uuid
+from datetime import date
+from decimal import ROUND_HALF_UP, Decimal
+from typing import List, NamedTuple, Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# OCR 결과 규칙 기반 추출 기본 설정 (settings.PRESCRIPTION_OCR_PARSER 로 덮어쓸 수 있음)
+DEFAULT_OCR_PARSER = {
+    "ENABLED": True,
+    "MIN_CONFIDENCE": 0.8,       # 이보다 낮으면 LLM 추출로 넘어감
+    "TABLE_DETECTION": False,    # Clova OCR 표 추출(enableTableDetection) 요청 여부 (도메인에서 사용 설정 필요)
+}
+
+# 약봉투/처방전 항목 이름 (OCR이 글자 사이를 띄어 읽는 경우가 많아 글자 사이 공백 허용)
+LABELS = {
+    "약국명": ["상호", "약국명"],
+    "약국주소": ["사업장소재지", "소재지", "주소"],
+    "조제일자": ["조제일자", "조제일", "교부일자", "발행일"],
+    "총수납금액": ["총수납금액", "수납금액", "합계", "본인부담금"],
+    "투약일수": ["총투약일수", "투약일수"],
+}
+MEDICINE_HEADERS = ["약품명", "처방의약품", "약명"]
+# 약품 표가 끝났음을 알리는 항목
+TABLE_END_LABELS = ["합계", "총수납", "수납금액", "본인부담", "복약안내", "주의사항", "사업장"]
+
+# 필드별 가중치 (합이 1), 약품 목록이 없으면 신뢰도와 관계없이 LLM으로 넘어감
+WEIGHTS = {"약품목록": 0.35, "조제일자": 0.25, "약국명": 0.2, "투약일수": 0.1, "총수납금액": 0.1}
+
+DATE = re.compile(r"(20\d{2})\s*[.\-/년]\s*(\d{1,2})\s*[.\-/월]\s*(\d{1,2})")
+AMOUNT = re.compile(r"\d{1,3}(?:,\d{3})+|\d+")
+DAYS_SUPPLY = re.compile(r"(\d+)\s*일분")
+PHARMACY = re.compile(r"[가-힣A-Za-z0-9]+약국")
+NUMBER = re.compile(r"^(\d+(?:\.\d+)?|\d+/\d+|\d*[½⅓⅔¼¾])(?:정|포|캡슐|알|ml|mL|회|일|T|C)?$")
+# 반 알 등 분수 투약량 ("1/2", "½", "1½" → 1 1/2)
+FRACTION_CHARS = {"½": "1/2", "⅓": "1/3", "⅔": "2/3", "¼": "1/4", "¾": "3/4"}
+FRACTION = re.compile(r"(?:(\d+)\s+)?(\d+)\s*/\s*(\d+)")
+PRODUCT_CODE = re.compile(r"^\d{6,}$")  # 보험 약품 코드
+
+
+class ParsedPrescription(NamedTuple):
+    result: dict
+    confidence: float
+    missing: List[str]
+
+
+def parser_config():
+    return {**DEFAULT_OCR_PARSER, **getattr(settings, "PRESCRIPTION_OCR_PARSER", {})}
+
+
+def _label_pattern(labels):
+    return re.compile("|".join(r"\s*".join(map(re.escape, label)) for label in labels))
+
+
+LABEL_PATTERNS = {field: _label_pattern(labels) for field, labels in LABELS.items()}
+ANY_LABEL = _label_pattern([label for labels in LABELS.values() for label in labels])
+HEADER_PATTERN = _label_pattern(MEDICINE_HEADERS)
+TABLE_END_PATTERN = _label_pattern(TABLE_END_LABELS)
+
+
+def ocr_lines(ocr_result) -> List[List[str]]:
+    """OCR fields를 boundingPoly 위치로 줄 단위로 묶어 [[왼쪽부터 단어, ...], ...] 반환"""
+    words = []
+    for image in ocr_result.get("images", []):
+        for field in image.get("fields", []):
+            vertices = field.get("boundingPoly", {}).get("vertices", [])
+            text = field.get("inferText", "").strip()
+            if not vertices or not text:
+                continue
+            ys = [v.get("y", 0) for v in vertices]
+            words.append((
+                (min(ys) + max(ys)) / 2,
+                max(ys) - min(ys),
+                min(v.get("x", 0) for v in vertices),
+                text,
+            ))
+    if not words:
+        return []
+
+    # 세로 중심이 글자 높이의 절반 이내면 같은 줄
+    tolerance = max(1.0, statistics.median(height for _, height, _, _ in words) / 2)
+    lines = []
+    for center, _, x, text in sorted(words):
+        if lines and abs(lines[-1]["center"] - center) <= tolerance:
+            line = lines[-1]
+            line["words"].append((x, text))
+            line["center"] = (line["center"] * (len(line["words"]) - 1) + center) / len(line["words"])
+        else:
+            lines.append({"center": center, "words": [(x, text)]})
+    return [[text for _, text in sorted(line["words"])] for line in lines]
+
+
+def _value_after(line_text, pattern) -> Optional[str]:
+    """줄에서 항목 이름 뒤, 다음 항목 이름 앞까지의 값"""
+    match = pattern.search(line_text)
+    if match is None:
+        return None
+    rest = line_text[match.end():]
+    following = ANY_LABEL.search(rest)
+    if following:
+        rest = rest[:following.start()]
+    return rest.strip(" :：|").strip() or None
+
+
+def _find_value(texts, field) -> Optional[str]:
+    """항목 이름이 있는 줄의 값, 같은 줄에 값이 없으면 다음 줄
+
+    약품 표 머리행(약품명 ... 총투약일수)의 열 이름은 항목으로 보지 않는다 (다음 줄은 첫 약품 행).
+    """
+    pattern = LABEL_PATTERNS[field]
+    for index, text in enumerate(texts):
+        if pattern.search(text) and not HEADER_PATTERN.search(text):
+            value = _value_after(text, pattern)
+            following = texts[index + 1] if index + 1 < len(texts) else ""
+            if value is None and not ANY_LABEL.search(following) and not HEADER_PATTERN.search(following):
+                value = following.strip() or None
+            if value:
+                return value
+    return None
+
+
+def parse_date(text) -> Optional[str]:
+    match = DATE.search(text or "")
+    if match is None:
+        return None
+    try:
+        # 실제 있는 날짜만 인정 ("2025.02.30" 같은 OCR 오인식은 None → 신뢰도가 낮아져 GPT로 넘어감)
+        return date(*(int(part) for part in match.groups())).isoformat()
+    except ValueError:
+        return None
+
+
+def _parse_number(value, fractions=False) -> Optional[Decimal]:
+    if isinstance(value, (int, float, Decimal)):
+        return Decimal(str(value))
+    text = str(value or "")
+    if fractions:
+        for char, fraction in FRACTION_CHARS.items():
+            text = text.replace(char, f" {fraction}")
+        match = FRACTION.search(text)
+        if match:
+            if not int(match.group(3)):
+                return None
+            return Decimal(match.group(1) or 0) + Decimal(match.group(2)) / Decimal(match.group(3))
+    match = re.search(r"\d[\d,]*(?:\.\d+)?", text)
+    return Decimal(match.group().replace(",", "")) if match else None
+
+
+def parse_int(value, default=0, maximum=None) -> int:
+    """OCR/LLM이 준 금액/일수/횟수 문자열을 정수로 ("6,400원" → 6400, "3일분" → 3)
+
+    소수는 반올림하고 경고를 남기며, maximum보다 큰 값(OCR이 숫자를 이어 읽은 경우 등)은 default로 둔다.
+    """
+    number = _parse_number(value)
+    if number is None:
+        return default
+    if maximum is not None and number > maximum:
+        logger.warning(f"숫자 값이 너무 큼 ({value!r} > {maximum}), {default}(으)로 저장")
+        return default
+    rounded = int(number.quantize(Decimal(1), rounding=ROUND_HALF_UP))
+    if rounded != number:
+        logger.warning(f"정수 항목의 소수 값 반올림: {value!r} → {rounded}")
+    return rounded
+
+
+def parse_decimal(value, default=None, maximum=Decimal(9999)) -> Optional[Decimal]:
+    """투약량 ("0.5", "2.5ml", "1/2", "½" → 0.50, 2.50, 0.50, 0.50), 소수 둘째 자리까지
+
+    숫자를 찾을 수 없으면 default(없음), 1로 채우지 않는다 (반 알을 한 알로 저장하지 않도록).
+    """
+    number = _parse_number(value, fractions=True)
+    if number is None:
+        if value not in (None, ""):
+            logger.warning(f"투약량을 읽을 수 없음: {value!r}")
+        return default
+    if number > maximum:
+        logger.warning(f"투약량이 너무 큼 ({value!r} > {maximum}), {default}(으)로 저장")
+        return default
+    rounded = number.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+    if rounded != number:
+        logger.warning(f"투약량 반올림: {value!r} → {rounded}")
+    return rounded
+
+
+def _first_int(text) -> Optional[str]:
+    match = re.search(r"\d+", text or "")
+    return match.group() if match else None
+
+
+def _number(token) -> Optional[str]:
+    match = NUMBER.match(token.replace(" ", ""))
+    if match is None or PRODUCT_CODE.match(token):
+        return None
+    value = _parse_number(match.group(1), fractions=True)
+    if value == value.to_integral_value():
+        return str(int(value))
+    return str(value.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)).rstrip("0").rstrip(".")
+
+
+def _medicine(tokens) -> Optional[dict]:
+    """약품 행: 약품명 ... 투약량 투약횟수 투약일수 (뒤에서부터 숫자 3개)"""
+    tokens = [token for token in tokens if token and not PRODUCT_CODE.match(token)]
+    numbers = []
+    while tokens and len(numbers) < 3:
+        number = _number(tokens[-1])
+        if number is None:
+            break
+        numbers.insert(0, number)
+        tokens.pop()
+    name = " ".join(tokens).strip()
+    if len(numbers) < 3 or not re.search(r"[가-힣A-Za-z]", name):
+        return None
+    return {"약품명": name, "투약량": numbers[0], "투약횟수": numbers[1], "투약일수": numbers[2]}
+
+
+def _medicines(rows) -> List[dict]:
+    """약품명 머리행 다음부터 표가 끝날 때까지의 약품 행"""
+    medicines, in_table, misses = [], False, 0
+    for tokens in rows:
+        text = " ".join(tokens)
+        if not in_table:
+            in_table = bool(HEADER_PATTERN.search(text))
+            continue
+        if TABLE_END_PATTERN.search(text):
+            break
+        medicine = _medicine(list(tokens))
+        if medicine is None:
+            misses += 1
+            if misses >= 2 and medicines:  # 약품 행이 아닌 줄이 이어지면 표가 끝난 것으로 봄
+                break
+            continue
+        misses = 0
+        medicines.append(medicine)
+    return medicines
+
+
+def parse_prescription(ocr_result, table_rows=None) -> ParsedPrescription:
+    """Clova OCR 결과에서 약봉투 표준 항목(상호, 조제일자, 투약일수, 약품명 표 등)을 규칙으로 추출
+
+    table_rows: OCR 표 추출 결과를 행 단위로 정리한 것 (ClovaOCRAPIView.extract_table_from_ocr), 있으면 약품 표로 우선 사용
+    """
+    lines = ocr_lines(ocr_result)
+    texts = [" ".join(words) for words in lines]
+
+    pharmacy_name = _find_value(texts, "약국명")
+    if pharmacy_name is None or "약국" not in pharmacy_name:
+        found = PHARMACY.search(pharmacy_name or " ".join(texts))
+        pharmacy_name = found.group() if found else pharmacy_name
+
+    date_text = _find_value(texts, "조제일자")
+    prescription_date = parse_date(date_text) or parse_date(" ".join(texts))
+
+    amount_text = _find_value(texts, "총수납금액")
+    amount = AMOUNT.search(amount_text or "")
+
+    medicines = _medicines(table_rows) if table_rows else []
+    if not medicines:
+        medicines = _medicines(lines)
+    # 총 투약일수는 약품별 투약일수 중 가장 긴 것 (약품 행이 없을 때만 항목 값/"3일분"을 사용)
+    if medicines:
+        days = str(max(int(float(medicine["투약일수"])) for medicine in medicines))
+    else:
+        days = _first_int(_find_value(texts, "투약일수"))
+        if days is None:
+            supply = DAYS_SUPPLY.search(" ".join(texts))
+            days = supply.group(1) if supply else None
+
+    result = {
+        "약국명": re.sub(r"\s+약국$", "약국", pharmacy_name or ""),
+        "처방전번호": f"RX-{str(uuid.uuid4())[:8]}",
+        "조제일자": prescription_date,
+        "약국주소": _find_value(texts, "약국주소") or "",
+        "총수납금액": amount.group().replace(",", "") if amount else None,
+        "투약일수": days,
+        "약품목록": medicines,
+    }
+    found = {field for field in WEIGHTS if result[field]}
+    confidence = sum(WEIGHTS[field] for field in found) if medicines else 0.0
+    result["총수납금액"] = result["총수납금액"] or "0"
+    result["투약일수"] = result["투약일수"] or "0"
+    return ParsedPrescription(result, round(confidence, 2), [field for field in WEIGHTS if field not in found])
@@ -0,0 +1,115 @@
+import io
+import logging
+import os
+from typing import NamedTuple
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# OCR 업로드 전 이미지 전처리 기본 설정 (settings.PRESCRIPTION_OCR_IMAGE 로 덮어쓸 수 있음)
+DEFAULT_OCR_IMAGE = {
+    "ENABLED": True,
+    "MAX_SIDE": 1960,         # 긴 변 최대 픽셀 (Clova OCR 권장 해상도, 이보다 크면 전송/인식 시간만 늘어남)
+    "GRAYSCALE": True,
+    "CROP": True,             # 배경(책상 등)을 잘라내고 처방전/약봉투 영역만 남김
+    "CROP_MIN_AREA": 0.3,     # 찾은 문서 영역이 전체의 이 비율보다 작으면 잘못 찾은 것으로 보고 자르지 않음
+    "CROP_MARGIN": 0.02,      # 자를 때 문서 영역 바깥으로 남길 여백 (긴 변 대비 비율)
+    "JPEG_QUALITY": 85,
+}
+
+# Pillow 형식 이름 → Clova OCR images[].format
+OCR_FORMATS = {"JPEG": "jpg", "PNG": "png", "TIFF": "tiff", "MPO": "jpg"}
+EXTENSION_FORMATS = {".jpg": "jpg", ".jpeg": "jpg", ".png": "png", ".tif": "tiff", ".tiff": "tiff", ".pdf": "pdf"}
+
+
+class PreparedImage(NamedTuple):
+    data: bytes
+    format: str          # Clova OCR에 알릴 형식 (jpg, png, tiff, pdf)
+    content_type: str
+    original_size: int   # 업로드 바이트 수
+    processed: bool      # 전처리 결과를 보내는지 (False면 원본 그대로)
+
+
+def _config():
+    return {**DEFAULT_OCR_IMAGE, **getattr(settings, "PRESCRIPTION_OCR_IMAGE", {})}
+
+
+def _guess_format(filename: str, content_type: str) -> str:
+    if content_type == "application/pdf":
+        return "pdf"
+    return EXTENSION_FORMATS.get(os.path.splitext(filename or "")[1].lower(), "jpg")
+
+
+def document_bounds(gray, config):
+    """밝은 종이 영역의 경계 상자 (left, upper, right, lower), 못 찾으면 None
+
+    작게 줄인 흑백 이미지에서 평균보다 밝은 픽셀을 종이로 보고, 잡음을 지운 뒤 그 경계를 구한다.
+    """
+    from PIL import ImageFilter, ImageStat
+
+    scale = max(gray.size) / 256
+    if scale <= 1:
+        return None
+    thumbnail = gray.resize((max(1, round(gray.width / scale)), max(1, round(gray.height / scale))))
+    stat = ImageStat.Stat(thumbnail)
+    threshold = stat.mean[0] + stat.stddev[0] * 0.25
+    mask = thumbnail.point(lambda value: 255 if value > threshold else 0).filter(ImageFilter.MedianFilter(5))
+    box = mask.getbbox()
+    if box is None:
+        return None
+
+    left, upper, right, lower = box
+    if (right - left) * (lower - upper) < config["CROP_MIN_AREA"] * thumbnail.width * thumbnail.height:
+        return None
+    margin = config["CROP_MARGIN"] * max(thumbnail.size)
+    return (
+        max(0, round((left - margin) * scale)),
+        max(0, round((upper - margin) * scale)),
+        min(gray.width, round((right + margin) * scale)),
+        min(gray.height, round((lower + margin) * scale)),
+    )
+
+
+def prepare_image(image: bytes, filename: str = "", content_type: str = "", config=None) -> PreparedImage:
+    """OCR 전송용 이미지 준비
+
+    EXIF 방향 보정 → 흑백 → 문서 영역 자르기 → 긴 변 MAX_SIDE로 축소 → JPEG 재인코딩.
+    PDF이거나 열 수 없는 파일, 또는 결과가 원본보다 크면 원본을 그대로 보낸다.
+    """
+    config = config or _config()
+    original = PreparedImage(image, _guess_format(filename, content_type), content_type or "image/jpeg",
+                             len(image), False)
+    if not config["ENABLED"] or original.format == "pdf":
+        return original
+
+    try:
+        from PIL import Image, ImageOps
+
+        with Image.open(io.BytesIO(image)) as source:
+            detected = OCR_FORMATS.get(source.format)
+            if detected is None:
+                return original
+            original = original._replace(format=detected, content_type=Image.MIME.get(source.format, "image/jpeg"))
+
+            picture = ImageOps.exif_transpose(source)
+            picture = picture.convert("L") if config["GRAYSCALE"] else picture.convert("RGB")
+
+        if config["CROP"]:
+            box = document_bounds(picture if picture.mode == "L" else picture.convert("L"), config)
+            if box is not None:
+                picture = picture.crop(box)
+
+        if max(picture.size) > config["MAX_SIDE"]:
+            picture.thumbnail((config["MAX_SIDE"], config["MAX_SIDE"]), Image.LANCZOS)
+
+        buffer = io.BytesIO()
+        picture.save(buffer, format="JPEG", quality=config["JPEG_QUALITY"], optimize=True)
+    except Exception as e:
+        logger.warning(f"이미지 전처리 실패, 원본 전송: {e}")
+        return original
+
+    data = buffer.getvalue()
+    if len(data) >= len(image):
+        return original
+    return PreparedImage(data, "jpg", "image/jpeg", len(image), True)
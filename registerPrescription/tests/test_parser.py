@@ -0,0 +1,108 @@
+from decimal import Decimal
+from unittest import TestCase
+
+from ..parser import parse_date, parse_decimal, parse_prescription
+
+
+def ocr_result(lines):
+    """줄 목록 → Clova OCR 응답 형식 (단어마다 boundingPoly, 줄 간격 40px)"""
+    fields = []
+    for row, line in enumerate(lines):
+        top = row * 40
+        for column, word in enumerate(line.split()):
+            left = column * 100
+            fields.append({
+                "inferText": word,
+                "boundingPoly": {"vertices": [
+                    {"x": left, "y": top}, {"x": left + 80, "y": top},
+                    {"x": left + 80, "y": top + 20}, {"x": left, "y": top + 20},
+                ]},
+            })
+    return {"images": [{"fields": fields}]}
+
+
+ENVELOPE = [
+    "상호 : 튼튼약국",
+    "조제일자 2025.03.14",
+    "약품명 투약량 투약횟수 총투약일수",
+    "타이레놀현탁액 2ml 3 5",
+    "코푸시럽 10 3 7",
+    "총수납금액 6,400원",
+]
+
+
+class ParsePrescriptionTests(TestCase):
+    """약봉투 규칙 기반 추출 (합성 OCR 결과)"""
+
+    def test_standard_envelope(self):
+        parsed = parse_prescription(ocr_result(ENVELOPE))
+        self.assertEqual(parsed.result["약국명"], "튼튼약국")
+        self.assertEqual(parsed.result["조제일자"], "2025-03-14")
+        self.assertEqual(parsed.result["총수납금액"], "6400")
+        self.assertEqual(
+            [(medicine["약품명"], medicine["투약량"], medicine["투약횟수"], medicine["투약일수"])
+             for medicine in parsed.result["약품목록"]],
+            [("타이레놀현탁액", "2", "3", "5"), ("코푸시럽", "10", "3", "7")],
+        )
+
+    def test_header_column_is_not_duration_label(self):
+        # "총투약일수" 열 이름 다음 줄(첫 약품 행)의 투약량을 투약일수로 읽지 않음
+        parsed = parse_prescription(ocr_result(ENVELOPE))
+        self.assertEqual(parsed.result["투약일수"], "7")
+
+    def test_duration_is_longest_medicine(self):
+        lines = ENVELOPE[:2] + ["총투약일수 3"] + ENVELOPE[2:]
+        self.assertEqual(parse_prescription(ocr_result(lines)).result["투약일수"], "7")
+
+    def test_duration_label_without_medicines(self):
+        parsed = parse_prescription(ocr_result(["튼튼약국", "조제일자 2025.03.14", "총투약일수", "3일"]))
+        self.assertEqual(parsed.result["투약일수"], "3")
+        self.assertEqual(parsed.confidence, 0.0)  # 약품 목록이 없으면 LLM으로 넘어감
+
+    def test_days_supply_without_medicines(self):
+        parsed = parse_prescription(ocr_result(["튼튼약국", "조제일자 2025.03.14", "5일분"]))
+        self.assertEqual(parsed.result["투약일수"], "5")
+
+    def test_invalid_date_lowers_confidence(self):
+        lines = ["상호 : 튼튼약국", "조제일자 2025.02.30"] + ENVELOPE[2:]
+        parsed = parse_prescription(ocr_result(lines))
+        self.assertIsNone(parsed.result["조제일자"])
+        self.assertIn("조제일자", parsed.missing)
+
+
+class ParseDateTests(TestCase):
+
+    def test_formats(self):
+        self.assertEqual(parse_date("2025.03.14"), "2025-03-14")
+        self.assertEqual(parse_date("2025년 3월 4일"), "2025-03-04")
+        self.assertEqual(parse_date("2024-02-29"), "2024-02-29")
+
+    def test_impossible_dates(self):
+        self.assertIsNone(parse_date("2025.02.30"))
+        self.assertIsNone(parse_date("2025.13.01"))
+
+
+class ParseDecimalTests(TestCase):
+    """투약량 (반 알 등 분수 포함)"""
+
+    def test_decimals(self):
+        self.assertEqual(parse_decimal("0.5"), Decimal("0.50"))
+        self.assertEqual(parse_decimal("2.5ml"), Decimal("2.50"))
+        self.assertEqual(parse_decimal(3), Decimal("3.00"))
+
+    def test_fractions(self):
+        self.assertEqual(parse_decimal("1/2"), Decimal("0.50"))
+        self.assertEqual(parse_decimal("1/2정"), Decimal("0.50"))
+        self.assertEqual(parse_decimal("½"), Decimal("0.50"))
+        self.assertEqual(parse_decimal("1½"), Decimal("1.50"))
+        self.assertEqual(parse_decimal("1 1/2"), Decimal("1.50"))
+
+    def test_unreadable_is_missing(self):
+        for value in (None, "", "반알", "1/0"):
+            with self.subTest(value=value):
+                self.assertIsNone(parse_decimal(value))
+
+    def test_fraction_in_medicine_row(self):
+        lines = ENVELOPE[:4] + ["부루펜정 1/2 3 5"] + ENVELOPE[4:]
+        medicines = parse_prescription(ocr_result(lines)).result["약품목록"]
+        self.assertEqual((medicines[1]["약품명"], medicines[1]["투약량"]), ("부루펜정", "0.5"))
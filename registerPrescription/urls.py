@@ -1,18 +1,27 @@
 from django.urls import path
 from .views import (
     ClovaOCRAPIView,
+    PrescriptionBatchOCRView,
+    PrescriptionActiveView,
+    PrescriptionSpendingView,
+    OcrJobStatusView,
+    OcrJobEventsView,
     PrescriptionListView,
-    PrescriptionListByDateView,
     PrescriptionDeleteView,
     PrescriptionDetailView,
 )
 
 urlpatterns = [
     path("ocr/", ClovaOCRAPIView.as_view(), name="clova-ocr"),
+    path("ocr/batch/", PrescriptionBatchOCRView.as_view(), name="prescription-ocr-batch"),
+    path("ocr/jobs/<uuid:job_id>/", OcrJobStatusView.as_view(), name="prescription-ocr-job"),
+    path("ocr/jobs/<uuid:job_id>/events/", OcrJobEventsView.as_view(), name="prescription-ocr-job-events"),
     path("list/", PrescriptionListView.as_view(), name="prescription-list"),
+    path("active/", PrescriptionActiveView.as_view(), name="prescription-active"),
+    path("spending/", PrescriptionSpendingView.as_view(), name="prescription-spending"),
     path(
         "by-date/",
-        PrescriptionListByDateView.as_view(),
+        PrescriptionListView.as_view(default_sort="date"),
         name="prescription-list-by-date",
     ),
     path(
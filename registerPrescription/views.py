@@ -6,11 +6,23 @@ import logging
 import base64
 import json
 import pandas as pd
+from collections import defaultdict
+from concurrent.futures import as_completed
 import openai  # GPT API 호출용
 from openai import ChatCompletion  # 새 인터페이스 사용
 from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.urls import reverse
+from django.utils import timezone
+from chat.streaming import sse_event
 from children.models import Children
-from .models import Prescription, Medicine
+from .dedup import find_cached, find_same_prescription, image_hashes, remember
+from .jobs import (
+    QueueFull, TransientOcrError, expire_stale, get_batch_executor, get_ocr_queue, ocr_queue_config, recognize,
+)
+from .models import OcrJob, Prescription, Medicine, medication_end_date
+from .parser import parse_date, parse_decimal, parse_int, parse_prescription, parser_config
+from .preprocess import prepare_image
 
 from rest_framework.views import APIView
 from rest_framework.response import Response
@@ -18,12 +30,13 @@ from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.authentication import TokenAuthentication
 from rest_framework import status
-from django.db.models import F
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncMonth
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from django.db import connection
 from dotenv import load_dotenv
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 
 logger = logging.getLogger(__name__)
 
@@ -39,78 +52,143 @@ openai.api_key = OPENAI_API_KEY
 
 # APIGW에서 제공하는 실제 Invoke URL (NCP 콘솔에서 확인한 URL로 교체)
 OCR_API_URL = "https://3ja254nf6l.apigw.ntruss.com/custom/v1/38065/f6e2a7f6d39340c1a967762f8265e55ed0cf9e441f30ee185ba6a26df73d34db/general"
+OCR_TIMEOUT = 30  # 초
+
+# 작업 상태 SSE: DB 확인 간격(초)과 최대 연결 시간(초)
+JOB_EVENTS_POLL_INTERVAL = 0.5
+JOB_EVENTS_TIMEOUT = 120
+
+# OCR 숫자 상한 (넘으면 숫자를 이어 읽은 오인식으로 보고 저장하지 않음)
+MAX_TOTAL_AMOUNT = 10_000_000  # 원
+MAX_DURATION_DAYS = 365
+MAX_DAILY_FREQUENCY = 24
 
 
 class ClovaOCRAPIView(APIView):
     permission_classes = [IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser]  # multipart/form-data 요청을 처리
 
+    @swagger_auto_schema(
+        operation_description=(
+            "처방전 이미지를 등록합니다. OCR/추출/저장은 백그라운드에서 처리되며, "
+            "응답의 job_id로 상태를 조회(ocr/jobs/<job_id>/)하거나 SSE(ocr/jobs/<job_id>/events/)로 받을 수 있습니다."
+        ),
+        responses={
+            200: openapi.Response(description="이미 등록한 사진입니다. 기존 처방전을 돌려줍니다 (deduplicated: true)."),
+            202: openapi.Response(description="작업이 등록되었습니다."),
+            400: openapi.Response(description="이미지 파일이 필요합니다."),
+            429: openapi.Response(description="대기 중인 작업이 많습니다. 잠시 후 다시 시도해주세요."),
+        },
+    )
     def post(self, request):
-        try:
-            if 'image' not in request.FILES:
-                return Response({
-                    "success": False,
-                    "error": "이미지 파일이 필요합니다."
-                }, status=status.HTTP_400_BAD_REQUEST)
-
-            image_file = request.FILES['image']
-            
-            # OCR API 요청 데이터 구성
-            request_json = {
-                "version": "V2",
-                "requestId": str(uuid.uuid4()),
-                "timestamp": int(round(time.time() * 1000)),
-                "lang": "ko",
-                "images": [
-                    {
-                        "format": "jpg",
-                        "name": "ocr_image"
-                    }
-                ]
-            }
-
-            # 멀티파트 폼 데이터 구성
-            files = {
-                'message': (None, json.dumps(request_json), 'application/json'),
-                'file': (image_file.name, image_file, image_file.content_type or "image/jpeg")
-            }
-
-            headers = {
-                "X-OCR-SECRET": CLOVA_OCR_SECRET
-            }
+        if 'image' not in request.FILES:
+            return Response({
+                "success": False,
+                "error": "이미지 파일이 필요합니다."
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        image_file = request.FILES['image']
+        image = image_file.read()
+        child_name = request.data.get('child_name') or ''
+
+        # 이미 등록한 사진(같은 파일 재업로드)이면 OCR 없이 기존 처방전을 돌려줌
+        hashes = image_hashes(image)
+        cached = find_cached(request.user, hashes)
+        if cached is not None and cached.prescription is not None:
+            job = OcrJob.objects.create(
+                user=request.user, child_name=child_name, status=OcrJob.STATUS_SUCCEEDED, deduplicated=True,
+                prescription=cached.prescription, result=prescription_payload(cached.prescription),
+                started_at=timezone.now(), finished_at=timezone.now(),
+            )
+            return Response({"success": True, **job_payload(job)}, status=status.HTTP_200_OK)
 
-            # OCR API 호출
-            response = requests.post(OCR_API_URL, headers=headers, files=files)
-            
-            if response.status_code != 200:
-                return Response({
-                    "success": False,
-                    "error": f"OCR API 오류: {response.text}"
-                }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-            # OCR 결과 처리
-            ocr_result = response.json()
-            
-            # fields에서 텍스트 추출
-            extracted_text = [
-                field["inferText"] 
-                for field in ocr_result["images"][0]["fields"] 
-                if "inferText" in field
+        job = OcrJob.objects.create(user=request.user, child_name=child_name)
+        try:
+            get_ocr_queue().submit(job, image, image_file.name, image_file.content_type or "image/jpeg", hashes)
+        except QueueFull:
+            job.delete()
+            response = Response({
+                "success": False,
+                "error": "대기 중인 처방전 등록이 많습니다. 잠시 후 다시 시도해주세요."
+            }, status=status.HTTP_429_TOO_MANY_REQUESTS)
+            response["Retry-After"] = "10"
+            return response
+
+        return Response({"success": True, **job_payload(job)}, status=status.HTTP_202_ACCEPTED)
+
+    def run_ocr(self, image, filename, content_type, image_format="jpg"):
+        """Clova OCR 호출 (네트워크 오류/5xx/429는 TransientOcrError)"""
+        # OCR API 요청 데이터 구성
+        request_json = {
+            "version": "V2",
+            "requestId": str(uuid.uuid4()),
+            "timestamp": int(round(time.time() * 1000)),
+            "lang": "ko",
+            "enableTableDetection": bool(parser_config()["TABLE_DETECTION"]),
+            "images": [
+                {
+                    "format": image_format,
+                    "name": "ocr_image"
+                }
             ]
+        }
 
-            # GPT 처리를 위한 테이블 생성
-            table_df = pd.DataFrame([" ".join(extracted_text)])
-            
-            # 나머지 처리 계속...
-            final_result = self.process_extracted_table(table_df, request.data.get('child_name'))
-            
-            return self._save_prescription_data(request, final_result)
+        # 멀티파트 폼 데이터 구성
+        files = {
+            'message': (None, json.dumps(request_json), 'application/json'),
+            'file': (filename, image, content_type)
+        }
 
-        except Exception as e:
-            logger.exception("Error in prescription processing")
-            return Response({
-                'error': f'처방전 처리 중 오류가 발생했습니다: {str(e)}'
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        headers = {
+            "X-OCR-SECRET": CLOVA_OCR_SECRET
+        }
+
+        try:
+            response = requests.post(OCR_API_URL, headers=headers, files=files, timeout=OCR_TIMEOUT)
+        except requests.RequestException as e:
+            raise TransientOcrError(f"OCR API 연결 오류: {e}") from e
+
+        if response.status_code == 429 or response.status_code >= 500:
+            raise TransientOcrError(f"OCR API 오류({response.status_code}): {response.text}")
+        if response.status_code != 200:
+            raise ValueError(f"OCR API 오류: {response.text}")
+        return response.json()
+
+    def read_image(self, image, filename, content_type):
+        """이미지 → 전처리 → OCR 결과"""
+        prepared = prepare_image(image, filename, content_type)
+        if prepared.processed:
+            logger.info(f"OCR 이미지 전처리: {prepared.original_size} → {len(prepared.data)} bytes")
+        return self.run_ocr(prepared.data, filename, prepared.content_type, prepared.format)
+
+    def extract(self, ocr_result, child_name):
+        """OCR 결과 → 처방전 정보(dict)"""
+        # 약봉투 표준 양식이면 OCR 위치/항목 이름만으로 추출하고 LLM 호출을 건너뜀
+        config = parser_config()
+        if config["ENABLED"]:
+            table_rows = None
+            if any(page.get("tables") for page in ocr_result.get("images", [])):
+                table_rows = self.extract_table_from_ocr(ocr_result).fillna("").values.tolist()
+            parsed = parse_prescription(ocr_result, table_rows)
+            if parsed.confidence >= config["MIN_CONFIDENCE"]:
+                logger.info(f"규칙 기반 추출 사용 (신뢰도 {parsed.confidence})")
+                return parsed.result
+            logger.info(f"규칙 기반 추출 신뢰도 낮음 ({parsed.confidence}, 누락: {parsed.missing}), GPT로 추출")
+
+        # fields에서 텍스트 추출
+        extracted_text = [
+            field["inferText"]
+            for field in ocr_result["images"][0]["fields"]
+            if "inferText" in field
+        ]
+
+        # GPT 처리를 위한 테이블 생성
+        table_df = pd.DataFrame([" ".join(extracted_text)])
+        try:
+            return self.process_extracted_table(table_df, child_name)
+        except (openai.APIConnectionError, openai.APITimeoutError, openai.RateLimitError,
+                openai.InternalServerError) as e:
+            raise TransientOcrError(f"GPT API 오류: {e}") from e
 
     def extract_table_from_ocr(self, ocr_result):
         """
@@ -247,162 +325,571 @@ class ClovaOCRAPIView(APIView):
             raise
 
     @transaction.atomic
-    def _save_prescription_data(self, request, final_result):
-        try:
-            # 자녀 정보 조회 또는 생성
-            child, created = Children.objects.get_or_create(
-                user=request.user,
-                child_name=request.data.get('child_name'),
-                defaults={'user': request.user}
-            )
+    def _save_prescription_data(self, user, child_name, final_result):
+        """추출 결과 저장, (처방전, 응답 data) 반환"""
+        # 자녀 정보 조회 또는 생성
+        child, created = Children.objects.get_or_create(
+            user=user,
+            child_name=child_name,
+            defaults={'user': user}
+        )
+
+        # Prescription 저장
+        prescription = self._build_prescription(child, final_result)
+        prescription.save()
+
+        # Medicine 테이블에 약품 목록 저장 - bulk_create 사용
+        medicines_to_create = self._build_medicines(prescription, final_result)
+        if medicines_to_create:
+            Medicine.objects.bulk_create(medicines_to_create)
+
+        return prescription, prescription_payload(prescription)
+
+    def _build_checked(self, final_result):
+        """추출 결과 → 저장 전 (처방전, 약품 목록), 저장할 수 없는 결과면 ValueError
+
+        조제일자가 없거나 잘못됐거나, 문자열이 컬럼 길이를 넘는 경우 (여러 장 등록에서 이미지별로 미리 확인)
+        """
+        prescription = self._build_prescription(None, final_result)
+        medicines = self._build_medicines(prescription, final_result)
+        for instance in [prescription, *medicines]:
+            check_lengths(instance)
+        return prescription, medicines
 
-            # Prescription 저장
-            prescription = Prescription.objects.create(
-                child=child,
-                pharmacy_name=final_result.get('약국명', ''),
-                prescription_number=final_result.get('처방전번호'),
-                prescription_date=final_result.get('조제일자'),
-                pharmacy_address=final_result.get('약국주소', ''),
-                total_amount=final_result.get('총수납금액', '0'),
-                duration=final_result.get('투약일수', '0')
+    @transaction.atomic
+    def _save_prescriptions_bulk(self, user, child_name, built):
+        """_build_checked 결과들을 한 트랜잭션에서 저장 (처방전/약품 각각 bulk insert), 순서대로 처방전 목록 반환"""
+        child, created = Children.objects.get_or_create(
+            user=user,
+            child_name=child_name,
+            defaults={'user': user}
+        )
+
+        # MySQL은 bulk_create 후 AutoField 값을 돌려주지 않으므로 처방전 번호로 다시 조회해 약품과 연결
+        prescriptions = []
+        for prescription, _ in built:
+            prescription.child = child
+            prescription.prescription_number = f"RX-{str(uuid.uuid4())[:8]}"
+            prescriptions.append(prescription)
+        Prescription.objects.bulk_create(prescriptions)
+        saved = {
+            p.prescription_number: p
+            for p in Prescription.objects.filter(
+                child=child, prescription_number__in=[p.prescription_number for p in prescriptions]
             )
+        }
 
-            # Medicine 테이블에 약품 목록 저장 - bulk_create 사용
-            medicines_to_create = [
-                Medicine(
-                    prescription=prescription,
-                    name=med.get('약품명', ''),
-                    dosage=med.get('투약량', 1),
-                    frequency=med.get('투약횟수', 1),
-                    duration=med.get('투약일수', 1)
-                ) for med in final_result.get('약품목록', [])
-            ]
-            
-            if medicines_to_create:
-                Medicine.objects.bulk_create(medicines_to_create)
+        medicines_to_create = []
+        for prescription, medicines in built:
+            prescription.prescription_id = saved[prescription.prescription_number].prescription_id
+            for medicine in medicines:
+                medicine.prescription = prescription  # 저장 전에 연결해 둔 prescription_id(None) 갱신
+            medicines_to_create.extend(medicines)
+        if medicines_to_create:
+            Medicine.objects.bulk_create(medicines_to_create)
+
+        by_id = Prescription.objects.select_related("child").prefetch_related("medicines").in_bulk(
+            [prescription.prescription_id for prescription in prescriptions]
+        )
+        return [by_id[prescription.prescription_id] for prescription in prescriptions]
+
+    def _build_prescription(self, child, final_result):
+        """추출 결과 → Prescription (OCR 문자열 정리: "6,400원" → 6400, "2025.03.14" → 2025-03-14)"""
+        prescription_date = final_result.get('조제일자')
+        if not isinstance(prescription_date, date):
+            parsed_date = parse_date(str(prescription_date or ''))
+            if parsed_date is None:
+                raise ValueError(f"조제일자 형식 오류: {prescription_date}")
+            prescription_date = date.fromisoformat(parsed_date)
+        duration = parse_int(final_result.get('투약일수'), maximum=MAX_DURATION_DAYS)
+
+        return Prescription(
+            child=child,
+            pharmacy_name=final_result.get('약국명', ''),
+            prescription_number=final_result.get('처방전번호'),
+            prescription_date=prescription_date,
+            pharmacy_address=final_result.get('약국주소', ''),
+            total_amount=parse_int(final_result.get('총수납금액'), maximum=MAX_TOTAL_AMOUNT),
+            duration=duration,
+            end_date=medication_end_date(prescription_date, duration),
+        )
+
+    def _build_medicines(self, prescription, final_result):
+        return [
+            Medicine(
+                prescription=prescription,
+                name=med.get('약품명', ''),
+                dosage=parse_decimal(med.get('투약량')),
+                frequency=parse_int(med.get('투약횟수'), 1, maximum=MAX_DAILY_FREQUENCY),
+                duration=parse_int(med.get('투약일수'), 1, maximum=MAX_DURATION_DAYS)
+            ) for med in final_result.get('약품목록', [])
+        ]
+
+
+def check_lengths(instance):
+    """문자열 값이 컬럼 길이(max_length)를 넘으면 ValueError (MySQL strict 모드의 DataError를 저장 전에 확인)"""
+    for field in instance._meta.fields:
+        value = getattr(instance, field.attname)
+        if field.max_length and isinstance(value, str) and len(value) > field.max_length:
+            raise ValueError(f"{field.verbose_name} 길이 초과 ({len(value)}자 > {field.max_length}자)")
+
+
+def dosage_value(dosage):
+    """투약량 응답 값 (정수면 1, 소수면 0.5, 읽지 못했으면 None)"""
+    if dosage is None:
+        return None
+    return int(dosage) if dosage == int(dosage) else float(dosage)
+
+
+def prescription_payload(prescription):
+    """등록된 처방전 응답 data"""
+    return {
+        "prescription_id": prescription.prescription_id,
+        "pharmacy_info": {
+            "name": prescription.pharmacy_name,
+            "address": prescription.pharmacy_address
+        },
+        "prescription_number": prescription.prescription_number,
+        "prescription_date": prescription.prescription_date,
+        "total_amount": prescription.total_amount,
+        "duration": prescription.duration,
+        "medicines": [
+            {
+                "medicine_name": med.name,
+                "dosage": dosage_value(med.dosage),
+                "frequency": med.frequency,
+                "duration": med.duration,
+                "total_count": med.frequency * med.duration
+            } for med in prescription.medicines.all()
+        ],
+        "child_name": prescription.child.child_name,
+        "created_at": prescription.created_at
+    }
+
+
+def job_payload(job):
+    """OCR 작업 상태 응답 (완료되면 data에 등록된 처방전 정보)"""
+    return {
+        "job_id": str(job.job_id),
+        "status": job.status,
+        "attempts": job.attempts,
+        "deduplicated": job.deduplicated,
+        "error": job.error or None,
+        "data": job.result,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+        "status_url": reverse("prescription-ocr-job", kwargs={"job_id": job.job_id}),
+        "events_url": reverse("prescription-ocr-job-events", kwargs={"job_id": job.job_id}),
+    }
+
+
+class OcrJobStatusView(APIView):
+    permission_classes = [IsAuthenticated]
 
-            return Response({
-                "success": True,
-                "data": {
-                    "prescription_id": prescription.prescription_id,
-                    "pharmacy_info": {
-                        "name": prescription.pharmacy_name,
-                        "address": prescription.pharmacy_address
-                    },
-                    "prescription_number": prescription.prescription_number,
-                    "prescription_date": prescription.prescription_date,
-                    "total_amount": prescription.total_amount,
-                    "duration": prescription.duration,
-                    "medicines": [
-                        {
-                            "medicine_name": med.name,
-                            "dosage": med.dosage,
-                            "frequency": med.frequency,
-                            "duration": med.duration,
-                            "total_count": med.frequency * med.duration
-                        } for med in prescription.medicines.all()
-                    ],
-                    "child_name": child.child_name,
-                    "created_at": prescription.created_at
-                }
-            }, status=status.HTTP_201_CREATED)
+    @swagger_auto_schema(
+        operation_description="처방전 등록(OCR) 작업 상태를 조회합니다. status: queued, running, succeeded, failed",
+        responses={
+            200: openapi.Response(description="작업 상태 (succeeded이면 data에 처방전 정보)"),
+            404: openapi.Response(description="해당 작업을 찾을 수 없습니다."),
+        },
+    )
+    def get(self, request, job_id):
+        try:
+            job = expire_stale(OcrJob.objects.get(job_id=job_id, user=request.user))
+        except OcrJob.DoesNotExist:
+            return Response({"success": False, "error": "해당 작업을 찾을 수 없습니다."},
+                            status=status.HTTP_404_NOT_FOUND)
 
-        except Exception as e:
-            logger.exception("처방전 저장 중 오류 발생")
-            return Response({
-                "success": False,
-                "error": f"처방전 저장 중 오류가 발생했습니다: {str(e)}"
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        response = Response({"success": job.status != OcrJob.STATUS_FAILED, **job_payload(job)},
+                            status=status.HTTP_200_OK)
+        if job.status not in OcrJob.FINISHED_STATUSES:
+            response["Retry-After"] = "1"  # 폴링 간격
+        return response
 
 
-class PrescriptionListView(APIView):
-    authentication_classes = [TokenAuthentication]
+class OcrJobEventsView(APIView):
+    """작업 상태가 바뀔 때마다 status 이벤트를, 끝나면 done 이벤트를 보내는 SSE"""
     permission_classes = [IsAuthenticated]
 
-    def get(self, request):
+    def get(self, request, job_id):
+        if not OcrJob.objects.filter(job_id=job_id, user=request.user).exists():
+            return Response({"success": False, "error": "해당 작업을 찾을 수 없습니다."},
+                            status=status.HTTP_404_NOT_FOUND)
+
+        response = StreamingHttpResponse(self.stream_events(job_id), content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"  # nginx 버퍼링 비활성화
+        return response
+
+    def stream_events(self, job_id):
+        last_state = None
+        deadline = time.monotonic() + JOB_EVENTS_TIMEOUT
+        while time.monotonic() < deadline:
+            job = expire_stale(OcrJob.objects.get(job_id=job_id))
+            state = (job.status, job.attempts)
+            if state != last_state:
+                last_state = state
+                yield sse_event("status", job_payload(job))
+            if job.status in OcrJob.FINISHED_STATUSES:
+                yield sse_event("done", {"job_id": str(job_id), "status": job.status})
+                return
+            time.sleep(JOB_EVENTS_POLL_INTERVAL)
+        yield sse_event("timeout", {"job_id": str(job_id), "status": last_state[0] if last_state else None})
+
+
+class PrescriptionBatchOCRView(APIView):
+    """처방전 여러 장 등록: 이미지별 OCR/추출을 동시에 처리하고 끝나는 대로 SSE로 결과를 보냄
+
+    이벤트: image(이미지별 추출 결과, index는 업로드 순서) → saved(등록된 처방전, 한 트랜잭션) → done
+    조제일자가 없는 등 저장할 수 없는 이미지는 image 이벤트(status: failed)로 알리고 나머지만 저장한다.
+    """
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser, FormParser]
+
+    @swagger_auto_schema(
+        operation_description=(
+            "처방전 이미지 여러 장(images)을 한 번에 등록합니다. 응답은 text/event-stream이며, "
+            "이미지마다 처리가 끝나는 대로 image 이벤트, 모두 저장되면 saved 이벤트, 마지막에 done 이벤트를 보냅니다."
+        ),
+        manual_parameters=[
+            openapi.Parameter('images', openapi.IN_FORM, type=openapi.TYPE_FILE, required=True,
+                              description='처방전 이미지 (여러 개)'),
+            openapi.Parameter('child_name', openapi.IN_FORM, type=openapi.TYPE_STRING, description='아동 이름'),
+        ],
+        responses={
+            200: openapi.Response(description="이미지별 결과 스트림 (text/event-stream)"),
+            400: openapi.Response(description="이미지 파일이 없거나 너무 많습니다."),
+            429: openapi.Response(description="대기 중인 작업이 많습니다. 잠시 후 다시 시도해주세요."),
+        },
+    )
+    def post(self, request):
+        files = request.FILES.getlist('images')
+        max_images = ocr_queue_config()["BATCH_MAX_IMAGES"]
+        if not files:
+            return Response({"success": False, "error": "이미지 파일이 필요합니다."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if len(files) > max_images:
+            return Response({"success": False, "error": f"한 번에 최대 {max_images}장까지 등록할 수 있습니다."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        child_name = request.data.get('child_name') or ''
+        uploads = []
+        for f in files:
+            image = f.read()
+            hashes = image_hashes(image)
+            uploads.append((f.name, f.content_type or "image/jpeg", image, hashes, find_cached(request.user, hashes)))
+
+        # OCR/추출이 필요한 이미지는 단건 등록과 같은 대기 수 제한(MAX_PENDING)을 받고, 응답 전에 작업을 넣어 둠
+        # (스트림을 읽지 않고 연결이 끊겨도 작업이 끝나면 확보한 대기 수가 반환됨)
+        queue = get_ocr_queue()
+        needs_ocr = [index for index, upload in enumerate(uploads)
+                     if upload[4] is None or (upload[4].prescription is None and not upload[4].extracted)]
         try:
-            prescriptions = (
-                Prescription.objects.filter(child__user=request.user)
-                .select_related("child")
-                .order_by("-created_at")
+            queue.reserve(len(needs_ocr))
+        except QueueFull:
+            response = Response({
+                "success": False,
+                "error": "대기 중인 처방전 등록이 많습니다. 잠시 후 다시 시도해주세요."
+            }, status=status.HTTP_429_TOO_MANY_REQUESTS)
+            response["Retry-After"] = "10"
+            return response
+
+        view = ClovaOCRAPIView()
+        config = ocr_queue_config()
+        futures = {}
+        for index in needs_ocr:
+            filename, content_type, image, hashes, cached = uploads[index]
+            future = get_batch_executor().submit(
+                recognize, view, image, filename, content_type, child_name, config,
+                ocr_result=cached.ocr_result if cached else None,
             )
+            future.add_done_callback(queue.release)
+            futures[future] = index
+
+        response = StreamingHttpResponse(
+            self.stream_results(request.user, child_name, uploads, futures),
+            content_type="text/event-stream",
+        )
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"  # nginx 버퍼링 비활성화
+        return response
+
+    def stream_results(self, user, child_name, uploads, futures):
+        view = ClovaOCRAPIView()
+        built = {}  # index → (저장 전 처방전, 약품 목록, 추출 결과, 해시)
+        counts = {"deduplicated": 0, "failed": 0}
+
+        def check(index, filename, final_result, hashes, deduplicated):
+            """저장할 수 있는 결과면 built에 넣고 extracted, 아니면 failed 이벤트"""
+            try:
+                prescription, medicines = view._build_checked(final_result)
+            except ValueError as e:
+                logger.warning(f"처방전 여러 장 등록 중 {filename} 저장 불가: {e}")
+                counts["failed"] += 1
+                return sse_event("image", {"index": index, "filename": filename, "status": "failed",
+                                           "error": str(e), "data": final_result})
+            built[index] = (prescription, medicines, final_result, hashes)
+            return sse_event("image", {"index": index, "filename": filename, "status": "extracted",
+                                       "deduplicated": deduplicated, "data": final_result})
+
+        for index, (filename, content_type, image, hashes, cached) in enumerate(uploads):
+            if cached is not None and cached.prescription is not None:
+                counts["deduplicated"] += 1
+                yield sse_event("image", {"index": index, "filename": filename, "status": "deduplicated",
+                                          "deduplicated": True, "data": prescription_payload(cached.prescription)})
+            elif cached is not None and cached.extracted:
+                yield check(index, filename, cached.extracted, hashes, True)
+
+        for future in as_completed(futures):
+            index = futures[future]
+            filename, content_type, image, hashes, cached = uploads[index]
+            try:
+                ocr_result, final_result = future.result()
+            except Exception as e:
+                logger.error(f"처방전 여러 장 등록 중 {filename} 처리 실패: {e}")
+                counts["failed"] += 1
+                yield sse_event("image", {"index": index, "filename": filename, "status": "failed", "error": str(e)})
+                continue
+            remember(user, hashes, ocr_result=ocr_result)
+            same = find_same_prescription(user, hashes, final_result)
+            if same is not None:
+                # 이미 등록한 약봉투를 다시 찍은 사진 (새로 추출한 결과가 같음)
+                remember(user, hashes, extracted=final_result, prescription=same.prescription)
+                counts["deduplicated"] += 1
+                yield sse_event("image", {"index": index, "filename": filename, "status": "deduplicated",
+                                          "deduplicated": True, "data": prescription_payload(same.prescription)})
+                continue
+            yield check(index, filename, final_result, hashes, cached is not None)
+
+        saved = []
+        if built:
+            indexes = sorted(built)
+            try:
+                prescriptions = view._save_prescriptions_bulk(
+                    user, child_name, [built[index][:2] for index in indexes]
+                )
+            except Exception as e:
+                logger.error(f"처방전 여러 장 저장 실패: {e}")
+                yield sse_event("error", {"message": "처방전 저장 중 오류가 발생했습니다.", "detail": str(e)})
+                yield sse_event("done", {"total": len(uploads), "saved": 0, **counts})
+                return
+            for index, prescription in zip(indexes, prescriptions):
+                _, _, final_result, hashes = built[index]
+                remember(user, hashes, extracted=final_result, prescription=prescription)
+                saved.append({"index": index, **prescription_payload(prescription)})
+            yield sse_event("saved", {"prescriptions": saved})
+
+        yield sse_event("done", {"total": len(uploads), "saved": len(saved), **counts})
 
-            prescription_list = []
-            for prescription in prescriptions:
-                # 투약 종료일 계산
-                start_date = prescription.prescription_date
-                duration_days = int(prescription.duration or 0)
-                end_date = start_date + timedelta(days=duration_days) if start_date else None
 
-                prescription_data = {
-                    "prescription_id": prescription.prescription_id,
-                    "child_name": prescription.child.child_name,
-                    "pharmacy_name": prescription.pharmacy_name,
-                    "prescription_number": prescription.prescription_number,
-                    "prescription_date": prescription.prescription_date,
-                    "pharmacy_address": prescription.pharmacy_address,
-                    "total_amount": prescription.total_amount,
-                    "duration": prescription.duration,  # 투약일수 추가
-                    "end_date": end_date,  # 투약 종료일 추가
-                    "created_at": prescription.created_at,
-                }
-                prescription_list.append(prescription_data)
+class PrescriptionListView(APIView):
+    """처방전 목록 (최신 등록순 또는 처방일순), 커서(keyset) 페이지네이션
 
-            return Response(
-                {"count": len(prescription_list), "results": prescription_list},
-                status=status.HTTP_200_OK,
-            )
+    다음 페이지는 응답의 next_cursor를 cursor로 넘겨 조회하며, 등록한 처방전 수와 관계없이
+    (child_id, created_at) / (child_id, prescription_date) 인덱스에서 limit개만 읽는다.
+    """
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [IsAuthenticated]
+    default_sort = "created"
 
-        except Exception as e:
-            return Response(
-                {"error": f"처방전 조회 중 오류가 발생했습니다: {str(e)}"},
-                status=status.HTTP_400_BAD_REQUEST,
+    # sort → 정렬 기준 컬럼 (동일 값은 prescription_id로 구분)
+    SORT_FIELDS = {"created": "created_at", "date": "prescription_date"}
+    LIST_FIELDS = (
+        "prescription_id", "child__child_name", "pharmacy_name", "prescription_number", "prescription_date",
+        "pharmacy_address", "total_amount", "duration", "end_date", "created_at",
+    )
+    DEFAULT_LIMIT = 20
+    MAX_LIMIT = 100
+
+    @swagger_auto_schema(
+        operation_description="처방전 목록을 조회합니다. next_cursor가 있으면 cursor로 넘겨 다음 페이지를 조회합니다.",
+        manual_parameters=[
+            openapi.Parameter('sort', openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=["created", "date"],
+                              description='created: 최신 등록순 (list/ 기본값), date: 최신 처방일순 (by-date/ 기본값)'),
+            openapi.Parameter('limit', openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+                              description='페이지 크기 (기본 20, 최대 100)'),
+            openapi.Parameter('cursor', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                              description='이전 응답의 next_cursor'),
+        ],
+    )
+    def get(self, request):
+        sort = request.query_params.get("sort") or self.default_sort
+        if sort not in self.SORT_FIELDS:
+            return Response({"error": f"sort는 {', '.join(self.SORT_FIELDS)} 중 하나여야 합니다."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        field = self.SORT_FIELDS[sort]
+
+        try:
+            limit = min(max(int(request.query_params.get("limit", self.DEFAULT_LIMIT)), 1), self.MAX_LIMIT)
+            cursor = request.query_params.get("cursor")
+            after = decode_cursor(cursor, sort) if cursor else None
+        except (TypeError, ValueError):
+            return Response({"error": "잘못된 limit 또는 cursor입니다."}, status=status.HTTP_400_BAD_REQUEST)
+
+        prescriptions = Prescription.objects.filter(child__in=Children.objects.filter(user=request.user))
+        if after is not None:
+            value, prescription_id = after
+            prescriptions = prescriptions.filter(
+                Q(**{f"{field}__lt": value}) | Q(**{field: value, "prescription_id__lt": prescription_id})
             )
+        rows = list(
+            prescriptions.order_by(f"-{field}", "-prescription_id").values(*self.LIST_FIELDS)[:limit + 1]
+        )
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1][field], rows[-1]["prescription_id"])
+
+        prescription_list = [
+            {
+                "prescription_id": row["prescription_id"],
+                "child_name": row["child__child_name"],
+                "pharmacy_name": row["pharmacy_name"],
+                "prescription_number": row["prescription_number"],
+                "prescription_date": row["prescription_date"],
+                "pharmacy_address": row["pharmacy_address"],
+                "total_amount": row["total_amount"],
+                "duration": row["duration"],  # 투약일수 추가
+                "end_date": row["end_date"],  # 투약 종료일 추가
+                "created_at": row["created_at"],
+            }
+            for row in rows
+        ]
 
+        return Response(
+            {"count": len(prescription_list), "results": prescription_list, "next_cursor": next_cursor},
+            status=status.HTTP_200_OK,
+        )
 
-class PrescriptionListByDateView(APIView):
-    authentication_classes = [TokenAuthentication]
+
+class PrescriptionActiveView(APIView):
+    """기준일(기본 오늘)에 복용 중인 처방전과 약품 (처방일 <= 기준일 < 투약 종료일)"""
     permission_classes = [IsAuthenticated]
 
+    @swagger_auto_schema(
+        operation_description="오늘(또는 date) 복용 중인 처방전과 약품 목록을 조회합니다.",
+        manual_parameters=[
+            openapi.Parameter('date', openapi.IN_QUERY, type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE,
+                              description='기준일 (YYYY-MM-DD, 기본값: 오늘)'),
+        ],
+    )
     def get(self, request):
         try:
-            prescriptions = (
-                Prescription.objects.filter(child__user=request.user)
-                .select_related("child")
-                .order_by("-prescription_date")
+            day = parse_query_date(request.query_params.get("date"), timezone.localdate())
+        except ValueError:
+            return Response({"error": "date는 YYYY-MM-DD 형식이어야 합니다."}, status=status.HTTP_400_BAD_REQUEST)
+
+        rows = list(
+            Prescription.objects.filter(
+                child__in=Children.objects.filter(user=request.user),
+                end_date__gt=day,
+                prescription_date__lte=day,
             )
+            .order_by("end_date", "prescription_id")
+            .values(*PrescriptionListView.LIST_FIELDS)
+        )
+        medicines = defaultdict(list)
+        for medicine in Medicine.objects.filter(
+            prescription_id__in=[row["prescription_id"] for row in rows]
+        ).values("prescription_id", "name", "dosage", "frequency", "duration"):
+            medicine["dosage"] = dosage_value(medicine["dosage"])
+            medicines[medicine.pop("prescription_id")].append(medicine)
+
+        results = [
+            {
+                "prescription_id": row["prescription_id"],
+                "child_name": row["child__child_name"],
+                "pharmacy_name": row["pharmacy_name"],
+                "prescription_date": row["prescription_date"],
+                "duration": row["duration"],
+                "end_date": row["end_date"],
+                "days_left": (row["end_date"] - day).days,
+                "medicines": medicines[row["prescription_id"]],
+            }
+            for row in rows
+        ]
+        return Response({"date": day, "count": len(results), "results": results}, status=status.HTTP_200_OK)
 
-            prescription_list = []
-            for prescription in prescriptions:
-                # 투약 종료일 계산
-                start_date = prescription.prescription_date
-                duration_days = int(prescription.duration or 0)
-                end_date = start_date + timedelta(days=duration_days) if start_date else None
-
-                prescription_data = {
-                    "prescription_id": prescription.prescription_id,
-                    "child_name": prescription.child.child_name,
-                    "pharmacy_name": prescription.pharmacy_name,
-                    "prescription_number": prescription.prescription_number,
-                    "prescription_date": prescription.prescription_date,
-                    "pharmacy_address": prescription.pharmacy_address,
-                    "total_amount": prescription.total_amount,
-                    "duration": prescription.duration,  # 투약일수 추가
-                    "end_date": end_date,  # 투약 종료일 추가
-                    "created_at": prescription.created_at,
-                }
-                prescription_list.append(prescription_data)
 
-            return Response(
-                {"count": len(prescription_list), "results": prescription_list},
-                status=status.HTTP_200_OK,
-            )
+class PrescriptionSpendingView(APIView):
+    """기간(기본 이번 달) 처방전 수납 금액 합계, 월별/아이별 합계 (집계는 모두 DB에서)"""
+    permission_classes = [IsAuthenticated]
 
-        except Exception as e:
-            return Response(
-                {"error": f"처방전 조회 중 오류가 발생했습니다: {str(e)}"},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
+    @swagger_auto_schema(
+        operation_description="기간 내 처방전 수납 금액 합계와 월별, 아이별 합계를 조회합니다. 처방일 기준입니다.",
+        manual_parameters=[
+            openapi.Parameter('start', openapi.IN_QUERY, type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE,
+                              description='시작일 (YYYY-MM-DD, 기본값: 이번 달 1일)'),
+            openapi.Parameter('end', openapi.IN_QUERY, type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE,
+                              description='종료일 (YYYY-MM-DD, 포함, 기본값: 오늘)'),
+        ],
+    )
+    def get(self, request):
+        today = timezone.localdate()
+        try:
+            start = parse_query_date(request.query_params.get("start"), today.replace(day=1))
+            end = parse_query_date(request.query_params.get("end"), today)
+        except ValueError:
+            return Response({"error": "start, end는 YYYY-MM-DD 형식이어야 합니다."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if start > end:
+            return Response({"error": "start는 end보다 늦을 수 없습니다."}, status=status.HTTP_400_BAD_REQUEST)
+
+        prescriptions = Prescription.objects.filter(
+            child__in=Children.objects.filter(user=request.user),
+            prescription_date__gte=start,
+            prescription_date__lte=end,
+        )
+        totals = prescriptions.aggregate(total_amount=Sum("total_amount"), count=Count("prescription_id"))
+        by_month = (
+            prescriptions.annotate(month=TruncMonth("prescription_date"))
+            .values("month")
+            .annotate(total_amount=Sum("total_amount"), count=Count("prescription_id"))
+            .order_by("month")
+        )
+        by_child = (
+            prescriptions.values("child_id", "child__child_name")
+            .annotate(total_amount=Sum("total_amount"), count=Count("prescription_id"))
+            .order_by("-total_amount")
+        )
+
+        return Response({
+            "start": start,
+            "end": end,
+            "total_amount": totals["total_amount"] or 0,
+            "count": totals["count"],
+            "by_month": [
+                {"month": row["month"].strftime("%Y-%m"), "total_amount": row["total_amount"], "count": row["count"]}
+                for row in by_month
+            ],
+            "by_child": [
+                {"child_name": row["child__child_name"], "total_amount": row["total_amount"], "count": row["count"]}
+                for row in by_child
+            ],
+        }, status=status.HTTP_200_OK)
+
+
+def parse_query_date(value, default):
+    """쿼리 파라미터 날짜 (YYYY-MM-DD), 없으면 default"""
+    return date.fromisoformat(value) if value else default
+
+
+def encode_cursor(value, prescription_id):
+    """마지막 행의 (정렬 값, prescription_id) → URL에 넣을 수 있는 커서 문자열"""
+    raw = json.dumps([value.isoformat(), prescription_id])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor, sort):
+    """encode_cursor의 역변환, 형식이 맞지 않으면 ValueError"""
+    try:
+        value, prescription_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError) as e:
+        raise ValueError("invalid cursor") from e
+    parse = datetime.fromisoformat if sort == "created" else date.fromisoformat
+    return parse(value), int(prescription_id)
 
 
 class PrescriptionDeleteView(APIView):
@@ -471,11 +958,11 @@ class PrescriptionDetailView(APIView):
                                 "address": "서울시 도봉구 마들로13길61"
                             },
                             "prescription_date": "2025-02-17",
-                            "total_amount": "6400",
+                            "total_amount": 6400,
                             "medicines": [
                                 {
                                     "name": "타이레놀",
-                                    "dosage": "1",
+                                    "dosage": 0.5,
                                     "frequency": 3,
                                     "duration": 3
                                 }
@@ -511,7 +998,7 @@ class PrescriptionDetailView(APIView):
                     "medicines": [
                         {
                             "name": medicine.name,
-                            "dosage": medicine.dosage,
+                            "dosage": dosage_value(medicine.dosage),
                             "frequency": medicine.frequency,
                             "duration": medicine.duration
                         } for medicine in medicines
@@ -7,6 +7,7 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, List
 from django.db import transaction
 from searchHospital.models import Hospital
+from chat.search_cache import bump_dataset_version
 from searchHospital.data_processor import (
     process_treatment_hours,
     process_reception_hours,
@@ -278,6 +279,9 @@ class Command(BaseCommand):
             # DB 저장
             self.stdout.write("\nDB 저장 시작...")
             created, updated = self.save_to_db(all_hospitals)
+
+            # 채팅 검색 캐시 무효화
+            bump_dataset_version("hospital")
             
             self.stdout.write(
                 self.style.SUCCESS(
@@ -0,0 +1,224 @@
+"""증상/키워드 → 진료과목(hospital_type) 로컬 인덱스
+
+사용자가 증상으로 말할 때("아이가 귀가 아파요") LLM 없이 진료과목을 찾기 위한 사전.
+모든 키워드를 하나의 Aho-Corasick 자동자로 미리 만들어 두고, 입력을 한 번 훑어서 찾는다.
+띄어쓰기 차이("귀가아파"/"귀가 아파")를 무시하기 위해 공백을 제거하고 비교하되, 키워드는 어절이 시작하는
+위치에서 시작할 때만 인정한다 ("아이가 아파요"의 "이가아파"는 어절 중간에서 시작하므로 치과가 아님).
+"""
+import re
+from collections import defaultdict, deque
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+
+# 진료과목(DB hospital_type 값) → 증상/키워드 (키워드: 가중치)
+SYMPTOM_LEXICON: Dict[str, Dict[str, float]] = {
+    "이비인후과": {
+        "귀가아파": 2, "귀아파": 2, "귀통증": 2, "귀가먹먹": 2, "귀에서": 1.5, "귀를만지": 1.5, "귀지": 1.5,
+        "중이염": 3, "외이도염": 3, "이명": 2, "코막힘": 2, "코가막혀": 2, "코가막": 2, "콧물": 1.5, "비염": 3,
+        "축농증": 3, "부비동염": 3, "코피": 2, "목이아파": 2, "목아파": 1.5, "인후통": 3, "편도": 2.5,
+        "목이부었": 2, "목이부어": 2, "목소리가": 1.5, "쉰목소리": 2, "삼키기": 1.5, "코골이": 2,
+    },
+    "안과": {
+        "눈이아파": 2, "눈아파": 2, "충혈": 2, "눈이빨개": 2, "눈곱": 2.5, "결막염": 3, "다래끼": 3,
+        "눈이가려": 2, "눈을비벼": 1.5, "시력": 2, "눈이침침": 2, "사시": 2.5, "안구건조": 3, "눈에뭐가": 2,
+        "눈물이계속": 2,
+    },
+    "피부과": {
+        "두드러기": 3, "발진": 2, "아토피": 3, "습진": 3, "여드름": 3, "가려움": 1.5, "가려워": 1.5,
+        "피부": 1.5, "물집": 2, "수포": 2, "무좀": 3, "사마귀": 3, "땀띠": 3, "기저귀발진": 3, "두피": 2,
+        "탈모": 3, "벌레물": 2, "모기물": 2, "각질": 2, "점빼": 2, "피부가빨개": 2,
+    },
+    "치과": {
+        "이가아파": 2.5, "이빨": 2.5, "치아": 2.5, "치통": 3, "충치": 3, "잇몸": 3, "사랑니": 3,
+        "이가흔들": 3, "이가시려": 3, "이가깨": 3, "유치가": 2, "유치를": 2, "영구치": 3, "치열": 2, "교정": 1.5,
+        "스케일링": 3, "불소": 2.5,
+    },
+    "정형외과": {
+        "발목": 2, "손목": 2, "무릎": 2, "허리": 1.5, "어깨": 1.5, "팔꿈치": 2, "골절": 3, "뼈": 2,
+        "뼈가부러": 3, "금이갔": 2.5, "삐었": 3, "접질": 3, "인대": 3, "관절": 2, "타박상": 2.5, "멍이": 1.5,
+        "넘어져": 1.5, "넘어졌": 1.5, "척추": 2, "측만": 3, "평발": 3, "성장통": 3, "다리를절": 2.5,
+    },
+    "내과": {
+        "배가아파": 2, "배아파": 2, "복통": 2, "설사": 2, "구토": 2, "토해": 2, "토했": 2, "토를": 2,
+        "소화": 1.5, "체했": 2, "속이안좋": 2, "위염": 3, "장염": 3, "변비": 2, "열이": 1.5, "발열": 1.5,
+        "고열": 2, "미열": 1.5, "기침": 1.5, "가래": 1.5, "감기": 1.5, "몸살": 2, "독감": 2.5, "오한": 2,
+        "혈압": 2.5, "당뇨": 3, "숨이차": 2, "식중독": 3, "빈혈": 2.5,
+    },
+    "소아청소년과": {
+        "예방접종": 3, "접종": 2, "영유아검진": 3, "영유아건강검진": 3, "성장": 1.5, "키가안": 2, "수족구": 3,
+        "수두": 3, "홍역": 3, "로타": 3, "모세기관지염": 3, "폐렴": 2, "신생아": 2.5, "황달": 2.5,
+        "분유": 1.5, "이유식": 1.5, "배앓이": 2.5, "영아산통": 3, "구내염": 2,
+    },
+    "가정의학과": {
+        "건강검진": 2.5, "피곤": 1.5, "피로": 1.5, "비만": 2, "금연": 2.5,
+    },
+    "산부인과": {
+        "생리통": 3, "생리": 2, "월경": 3, "임신": 3, "질염": 3, "냉이": 2, "산전검사": 3, "자궁": 3,
+        "유방": 2.5, "초경": 3, "성조숙": 2,
+    },
+    "정신건강의학과": {
+        "우울": 3, "불안": 2, "불면": 2.5, "잠을못": 2, "공황": 3, "스트레스": 1.5, "adhd": 3, "주의력": 2.5,
+        "산만": 2, "틱": 2.5, "자폐": 3, "발달지연": 3, "언어지연": 2.5, "말이늦": 2.5, "분리불안": 3,
+    },
+    "신경외과": {
+        "디스크": 3, "저림": 2, "저려": 2, "마비": 2.5, "머리를부딪": 3, "머리를다쳤": 3, "머리를박": 3,
+        "두통이심": 2,
+    },
+    "성형외과": {
+        "흉터": 2.5, "봉합": 3, "찢어졌": 2.5, "찢어져": 2.5, "꿰매": 3, "화상": 2.5, "데었": 2.5,
+    },
+    "한방병원": {
+        "한약": 3, "침맞": 3, "추나": 3, "뜸": 2, "보약": 3,
+    },
+}
+
+# 바로 큰 병원(응급실)으로 안내해야 하는 증상
+EMERGENCY_KEYWORDS = {
+    "의식이없": 5, "의식을잃": 5, "경련": 5, "열성경련": 5, "호흡곤란": 5, "숨을못쉬": 5, "숨을안쉬": 5,
+    "입술이파래": 5, "피가멈추지": 5, "삼켰": 4, "삼킨것같": 4, "축처져": 4, "깨지않": 4,
+}
+EMERGENCY_SPECIALTY = "종합병원"
+
+# 아이 관련 표현 - 일반 내과 증상은 소아청소년과로 안내
+CHILD_KEYWORDS = ("아이", "아기", "애기", "우리애", "아들", "딸", "유아", "신생아", "개월", "초등")
+GENERAL_SPECIALTIES = ("내과", "가정의학과")
+PEDIATRICS = "소아청소년과"
+
+_WHITESPACE = re.compile(r"\s+")
+# "아프다고", "아픈데", "아팠어" 등 활용형을 사전 키워드("귀가아파")에 맞춤
+_PAIN = re.compile(r"아프|아픈|아퍼|아팠")
+
+
+def normalize(text: str) -> str:
+    return _PAIN.sub("아파", _WHITESPACE.sub("", text or "").lower())
+
+
+def tokenize(text: str) -> Tuple[str, FrozenSet[int]]:
+    """공백을 제거한 문장과, 그 안에서 각 어절이 시작하는 위치"""
+    tokens = [normalize(token) for token in (text or "").split()]
+    starts, position = set(), 0
+    for token in tokens:
+        starts.add(position)
+        position += len(token)
+    return "".join(tokens), frozenset(starts)
+
+
+class AhoCorasick:
+    """여러 키워드를 입력 한 번 훑기로 찾는 자동자 (빌드 후에는 읽기 전용이라 스레드 간 공유 가능)"""
+
+    def __init__(self, keywords):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+        for keyword in keywords:
+            self._add(keyword)
+        self._build()
+
+    def _add(self, keyword):
+        state = 0
+        for char in keyword:
+            if char not in self.goto[state]:
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+                self.goto[state][char] = len(self.goto) - 1
+            state = self.goto[state][char]
+        self.output[state].append(keyword)
+
+    def _build(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(char, 0)
+                self.output[next_state] = self.output[next_state] + self.output[self.fail[next_state]]
+
+    def find(self, text):
+        """(시작 위치, 키워드) 목록"""
+        matches = []
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+            for keyword in self.output[state]:
+                matches.append((index - len(keyword) + 1, keyword))
+        return matches
+
+
+class SpecialtyMatch(NamedTuple):
+    hospital_type: str
+    score: float
+    keywords: List[str]
+    emergency: bool = False
+
+
+def _build_index():
+    weights = defaultdict(list)  # keyword -> [(specialty, weight)]
+    for specialty, keywords in SYMPTOM_LEXICON.items():
+        for keyword, weight in keywords.items():
+            weights[normalize(keyword)].append((specialty, weight))
+    return AhoCorasick(weights), dict(weights)
+
+
+_automaton, _weights = _build_index()
+_emergency_automaton = AhoCorasick(normalize(keyword) for keyword in EMERGENCY_KEYWORDS)
+_emergency_weights = {normalize(keyword): weight for keyword, weight in EMERGENCY_KEYWORDS.items()}
+
+
+def _find_at_word_starts(automaton, normalized, starts):
+    return [(start, keyword) for start, keyword in automaton.find(normalized) if start in starts]
+
+
+def _longest_non_overlapping(matches):
+    """겹치는 키워드는 더 긴 것만 사용 ("손목아파" → "손목", "목아파" 제외)"""
+    selected, end = [], -1
+    for start, keyword in sorted(matches, key=lambda m: (m[0], -len(m[1]))):
+        if start > end:
+            selected.append(keyword)
+            end = start + len(keyword) - 1
+    return selected
+
+
+def resolve_specialties(text: str, child: bool = False) -> List[SpecialtyMatch]:
+    """증상 문장에서 진료과목 후보를 점수 순으로 반환 (없으면 빈 목록)
+
+    child=True면 아이 진료로 보고 내과/가정의학과 증상을 소아청소년과로 안내한다.
+    False면 문장에 아이 관련 표현(CHILD_KEYWORDS)이 있을 때만 그렇게 한다.
+    """
+    normalized, starts = tokenize(text)
+    scores = defaultdict(float)
+    matched = defaultdict(list)
+
+    # 응급 증상은 다른 키워드와 겹쳐도 버리지 않도록 따로 찾음
+    for keyword in _longest_non_overlapping(_find_at_word_starts(_emergency_automaton, normalized, starts)):
+        scores[EMERGENCY_SPECIALTY] += _emergency_weights[keyword]
+        matched[EMERGENCY_SPECIALTY].append(keyword)
+
+    for keyword in _longest_non_overlapping(_find_at_word_starts(_automaton, normalized, starts)):
+        for specialty, weight in _weights[keyword]:
+            scores[specialty] += weight
+            matched[specialty].append(keyword)
+    if not scores:
+        return []
+
+    if child or any(word in normalized for word in CHILD_KEYWORDS):
+        for general in GENERAL_SPECIALTIES:
+            if general in scores:
+                scores[PEDIATRICS] += scores.pop(general)
+                matched[PEDIATRICS].extend(matched.pop(general))
+
+    return sorted(
+        (SpecialtyMatch(specialty, score, matched[specialty], specialty == EMERGENCY_SPECIALTY)
+         for specialty, score in scores.items()),
+        key=lambda match: (match.emergency, match.score),
+        reverse=True,
+    )
+
+
+def best_specialty(text: str, child: bool = False) -> Optional[SpecialtyMatch]:
+    matches = resolve_specialties(text, child=child)
+    return matches[0] if matches else None
@@ -0,0 +1,37 @@
+from unittest import TestCase
+
+from ..symptoms import EMERGENCY_SPECIALTY, PEDIATRICS, best_specialty, resolve_specialties
+
+
+class ResolveSpecialtiesTests(TestCase):
+    """증상 사전 회귀 테스트 (띄어쓰기 제거로 "아이가"가 치과 키워드에 걸리던 문제 등)"""
+
+    def specialties(self, text, child=False):
+        return [match.hospital_type for match in resolve_specialties(text, child=child)]
+
+    def test_child_subject_is_not_dental(self):
+        self.assertNotIn("치과", self.specialties("아이가 아파요"))
+
+    def test_emergency_is_not_suppressed_by_overlapping_keyword(self):
+        match = best_specialty("아이가 깨지 않아요")
+        self.assertEqual(match.hospital_type, EMERGENCY_SPECIALTY)
+        self.assertTrue(match.emergency)
+
+    def test_kindergarten_is_not_primary_tooth(self):
+        specialties = self.specialties("아이가 유치원에서 열이 나요")
+        self.assertNotIn("치과", specialties)
+        self.assertEqual(specialties[0], PEDIATRICS)
+
+    def test_dental_keywords_at_word_start(self):
+        self.assertEqual(best_specialty("이가 아파요").hospital_type, "치과")
+        self.assertEqual(best_specialty("유치가 흔들려요").hospital_type, "치과")
+
+    def test_adult_internal_medicine_stays(self):
+        self.assertEqual(best_specialty("혈압이 높아요").hospital_type, "내과")
+
+    def test_child_flag_moves_general_to_pediatrics(self):
+        self.assertEqual(best_specialty("혈압이 높아요", child=True).hospital_type, PEDIATRICS)
+
+    def test_spacing_and_inflection(self):
+        self.assertEqual(best_specialty("아이가 귀가 아픈데").hospital_type, "이비인후과")
+        self.assertEqual(best_specialty("아이가 귀가아파요").hospital_type, "이비인후과")
@@ -0,0 +1,48 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from users.models import UserProfile
+
+from ..models import Hospital
+from ..views import HospitalBySymptomView, NearbyHospitalAPIView
+
+
+class NearbyHospitalAPIViewTests(TestCase):
+    """GET /hospital/nearby/ (반경 파라미터 검증 포함)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="parent", password="password")
+        UserProfile.objects.create(user=cls.user, latitude="37.5665", longitude="126.9780")
+        Hospital.objects.create(ykiho="near", name="가까운소아과의원", address="서울 중구", phone="02-000-0000",
+                                department="소아청소년과", latitude=37.5670, longitude=126.9785,
+                                hospital_type="소아청소년과")
+        Hospital.objects.create(ykiho="far", name="먼소아과의원", address="경기 수원시", phone="031-000-0000",
+                                department="소아청소년과", latitude=37.2636, longitude=127.0286,
+                                hospital_type="소아청소년과")
+
+    def get(self, view, path, params=None):
+        request = APIRequestFactory().get(path, params or {})
+        force_authenticate(request, user=self.user)
+        return view.as_view()(request)
+
+    def test_default_radius(self):
+        response = self.get(NearbyHospitalAPIView, "/hospital/nearby/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([hospital["name"] for hospital in response.data["results"]], ["가까운소아과의원"])
+
+    def test_radius_parameter(self):
+        response = self.get(NearbyHospitalAPIView, "/hospital/nearby/", {"radius": "50"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["count"], 2)
+
+    def test_invalid_radius(self):
+        for radius in ("abc", "0", "-1", "51"):
+            with self.subTest(radius=radius):
+                response = self.get(NearbyHospitalAPIView, "/hospital/nearby/", {"radius": radius})
+                self.assertEqual(response.status_code, 400)
+
+    def test_by_symptom_invalid_radius(self):
+        response = self.get(HospitalBySymptomView, "/hospital/by-symptom/", {"q": "귀가 아파요", "radius": "abc"})
+        self.assertEqual(response.status_code, 400)
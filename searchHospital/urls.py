@@ -1,9 +1,10 @@
 from django.urls import path
-from .views import HospitalSearchView, OpenHospitalSearchView, NearbyHospitalAPIView
+from .views import HospitalSearchView, OpenHospitalSearchView, NearbyHospitalAPIView, HospitalBySymptomView
 
 urlpatterns = [
     # 병원 검색 API
     path('search/', HospitalSearchView.as_view(), name='hospital-search'),
     path('open/', OpenHospitalSearchView.as_view(), name='open-hospital-search'),
     path('nearby/', NearbyHospitalAPIView.as_view(), name='nearby-hospitals'),
+    path('by-symptom/', HospitalBySymptomView.as_view(), name='hospital-by-symptom'),
 ]
@@ -15,6 +15,7 @@ from django.utils.timezone import localtime
 from django.contrib.auth.hashers import make_password
 
 from .models import Hospital
+from .symptoms import resolve_specialties
 from rest_framework.permissions import IsAuthenticated
 from rest_framework import status
 from drf_yasg.utils import swagger_auto_schema
@@ -254,6 +255,19 @@ class OpenHospitalSearchView(HospitalSearchView):
         return Response({'count': len(results), 'results': results})
 
 
+MAX_RADIUS_KM = 50
+RADIUS_ERROR = {"error": f"radius는 0보다 크고 {MAX_RADIUS_KM} 이하인 숫자(km)여야 합니다."}
+
+
+def parse_radius(request, default=3):
+    """검색 반경(km) 쿼리 파라미터, 숫자가 아니거나 범위(0 < radius ≤ 50)를 벗어나면 None"""
+    try:
+        radius = float(request.GET.get('radius', default))
+    except ValueError:
+        return None
+    return radius if 0 < radius <= MAX_RADIUS_KM else None
+
+
 class NearbyHospitalAPIView(APIView):
     """사용자 위치 기반 근처 병원 목록 (상세 정보 포함)"""
     permission_classes = [IsAuthenticated]
@@ -262,11 +276,15 @@ class NearbyHospitalAPIView(APIView):
         operation_summary="근처 병원 목록 조회",
         operation_description="사용자 위치 기반으로 근처 병원 목록을 반환합니다. (상세 정보 포함)",
         tags=['hospital'],
+        manual_parameters=[
+            openapi.Parameter('radius', openapi.IN_QUERY, description="검색 반경(km), 기본 3, 최대 50",
+                              type=openapi.TYPE_NUMBER),
+        ],
         responses={
             200: openapi.Response(
                 description="성공적으로 병원 목록을 반환",
             ),
-            400: "사용자의 위치 정보가 없습니다."
+            400: "사용자의 위치 정보가 없거나 radius가 올바르지 않습니다."
         },
         operation_id='nearby_hospital_list'
     )
@@ -279,7 +297,9 @@ class NearbyHospitalAPIView(APIView):
         # 검색 파라미터
         user_lat = float(user_profile.latitude)
         user_lon = float(user_profile.longitude)
-        radius = float(request.GET.get('radius', 3))  # km 단위
+        radius = parse_radius(request)
+        if radius is None:
+            return Response(RADIUS_ERROR, status=status.HTTP_400_BAD_REQUEST)
         current_time = datetime.now()
         
         # 병원 조회 및 거리 계산
@@ -329,3 +349,94 @@ class NearbyHospitalAPIView(APIView):
             results.append(hospital_data)
         
         return Response({'count': len(results), 'results': results})
+
+
+class HospitalBySymptomView(APIView):
+    """증상 문장으로 진료과목을 찾고, 해당 과목의 근처 병원을 반환 (LLM 없이 로컬 증상 사전 사용)"""
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_summary="증상으로 병원 찾기",
+        operation_description="증상 문장(q)에서 진료과목을 추정하고, 가장 알맞은 과목의 근처 병원 목록을 반환합니다.",
+        tags=['hospital'],
+        manual_parameters=[
+            openapi.Parameter('q', openapi.IN_QUERY, description="증상 (예: 아이가 귀가 아파요)",
+                              type=openapi.TYPE_STRING, required=True),
+            openapi.Parameter('radius', openapi.IN_QUERY, description="검색 반경(km), 기본 3, 최대 50",
+                              type=openapi.TYPE_NUMBER),
+            openapi.Parameter('child', openapi.IN_QUERY,
+                              description="아이 진료 여부 (true면 내과/가정의학과 증상을 소아청소년과로 안내, "
+                                          "기본값은 문장에 아이 관련 표현이 있을 때만)",
+                              type=openapi.TYPE_BOOLEAN),
+        ],
+        responses={
+            200: openapi.Response(
+                description="추정한 진료과목과 근처 병원 목록",
+            ),
+            400: "증상이 없거나 사용자의 위치 정보가 없습니다."
+        },
+        operation_id='hospital_by_symptom'
+    )
+    def get(self, request):
+        query = request.GET.get('q', '').strip()
+        if not query:
+            return Response({"error": "증상을 입력해주세요."}, status=status.HTTP_400_BAD_REQUEST)
+
+        user_profile = request.user.profile
+        if not (user_profile.latitude and user_profile.longitude):
+            return Response({"error": "사용자의 위치 정보가 없습니다."}, status=status.HTTP_400_BAD_REQUEST)
+
+        radius = parse_radius(request)
+        if radius is None:
+            return Response(RADIUS_ERROR, status=status.HTTP_400_BAD_REQUEST)
+
+        child = request.GET.get('child', '').lower() in ('1', 'true', 'yes')
+        specialties = resolve_specialties(query, child=child)
+        response = {
+            'query': query,
+            'specialties': [
+                {'hospital_type': match.hospital_type, 'score': match.score,
+                 'keywords': match.keywords, 'emergency': match.emergency}
+                for match in specialties
+            ],
+            'count': 0,
+            'results': [],
+        }
+        if not specialties:
+            return Response(response)
+
+        user_lat = float(user_profile.latitude)
+        user_lon = float(user_profile.longitude)
+        current_time = datetime.now()
+
+        hospitals = Hospital.objects.annotate(
+            distance=ACos(
+                Cos(Radians(user_lat)) *
+                Cos(Radians(F('latitude'))) *
+                Cos(Radians(F('longitude')) - Radians(user_lon)) +
+                Sin(Radians(user_lat)) *
+                Sin(Radians(F('latitude')))
+            ) * 6371
+        ).filter(
+            distance__lte=radius,
+            hospital_type__icontains=specialties[0].hospital_type,
+        ).order_by('distance')[:20]
+
+        base_view = HospitalSearchView()
+        results = [
+            {
+                'id': hospital.id,
+                'name': hospital.name,
+                'address': hospital.address,
+                'phone': hospital.phone,
+                'department': hospital.department,
+                'latitude': float(hospital.latitude),
+                'longitude': float(hospital.longitude),
+                'distance': float(hospital.distance),
+                'hospital_type': hospital.hospital_type,
+                'state': base_view.get_hospital_state(hospital, current_time),
+            }
+            for hospital in hospitals
+        ]
+        response.update({'count': len(results), 'results': results})
+        return Response(response)
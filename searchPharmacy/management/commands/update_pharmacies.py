@@ -2,6 +2,7 @@ from django.core.management.base import BaseCommand
 from django.db import transaction
 from searchPharmacy.models import Pharmacy
 from searchPharmacy.pharmacy_updater import fetch_all_pharmacies
+from chat.search_cache import bump_dataset_version
 
 class Command(BaseCommand):
     help = '공공 API에서 약국 정보를 가져와 DB를 업데이트합니다'
@@ -53,6 +54,9 @@ class Command(BaseCommand):
                 
                 # 벌크 생성
                 Pharmacy.objects.bulk_create(pharmacy_objects)
+
+                # 커밋 후 채팅 검색 캐시 무효화
+                transaction.on_commit(lambda: bump_dataset_version("pharmacy"))
                 
                 self.stdout.write(
                     self.style.SUCCESS(f'성공적으로 {len(pharmacy_objects)}개의 약국 정보를 업데이트했습니다')